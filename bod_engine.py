@@ -0,0 +1,432 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+from functools import partial
+from multiprocessing import shared_memory
+
+import numpy as np
+import pandas as pd
+
+from storage import DATA_FOLDER, load_dataset
+
+# =============================
+# VECTORIZED BUY-ON-DIP ENGINE
+#  - broadcasts Previous_Close / Low for every symbol against the level vector
+#  - emits fills as columnar arrays (no per-row Python loop)
+#  - cumulative Shares / Invested / Value come from one cumsum per symbol
+#  - dip days (data/bod_dip_days.csv): one row per symbol and day with a fill, keeping only
+#    Previous_Close, Low, Close and the deepest filled level; the event rows are an
+#    expansion of these (expand_dip_days here, js/dip-days.js in the pages)
+#  - build_bod_tables / build_history_bod_events can fan symbol partitions out to a process
+#    pool: the price columns go into shared memory once and every worker reads its symbols'
+#    rows from there (nothing but (lo, hi) bounds is pickled); results come back in symbol
+#    order, so the output does not depend on the worker count
+# =============================
+BOD_WORKERS = os.cpu_count() or 1
+PARALLEL_MIN_ROWS = 200_000  # smaller tables are done before a pool has started
+
+# column order of the event rows written to {SYM}-data-bod.csv / all_buy_on_dip.csv
+BOD_COLUMNS = [
+    "Date",
+    "Date_add",
+    "Weekday",
+    "Symbol",
+    "Strategy",
+    "Buy_Level",
+    "Buy_Price",
+    "Buy Price",
+    "Executed",
+    "Executed_Price",
+    "Shares_Purchased",
+    "Shares Purchased",
+    "Dollars_Invested",
+    "Dollars Invested",
+    "Cumulative Shares",
+    "Cumulative Invested",
+    "Cumulative Value",
+    "Close",
+    "Previous_Close",
+]
+
+# column order of the compact dip-day rows
+DIP_DAY_COLUMNS = ["Date", "Symbol", "Previous_Close", "Low", "Close", "Max_Level"]
+
+
+def dip_levels(dip_max, step=1):
+    """Percent levels 1..dip_max (inclusive) as an int array."""
+    return np.arange(1, dip_max + 1, step)
+
+
+def round4(values):
+    """Round to 4 decimals with Python's round() so output matches etlv2.round2 exactly.
+
+    np.round scales by 10**4 and can land on the other side of a tie, which would
+    change the CSV bytes; only filled events go through here so the cost is small.
+    """
+    return np.array([round(v, 4) for v in np.asarray(values, dtype=float).tolist()], dtype=float)
+
+
+def fill_matrix(prev_close, low, levels):
+    """Return (fills, limits) for every row x level.
+
+    limits[i, j] is the limit price prev_close[i] * (1 - levels[j] / 100) and
+    fills[i, j] is True when that day's Low reached it. Rows without a usable
+    previous close (NaN or 0) or without a Low never fill.
+    """
+    prev_close = np.asarray(prev_close, dtype=float)
+    low = np.asarray(low, dtype=float)
+    limits = prev_close[:, None] * (1 - (levels / 100.0))
+    valid = ~np.isnan(prev_close) & (prev_close != 0) & ~np.isnan(low)
+    with np.errstate(invalid="ignore"):
+        fills = low[:, None] <= limits
+    fills &= valid[:, None]
+    return fills, limits
+
+
+def build_dip_days(proc_df, symbols, dip_max=30, step=1, date_col="Date"):
+    """One row per (symbol, day) with at least one fill, in `symbols` then date order.
+
+    A fill at level k implies fills at every shallower level (the limit prices fall
+    as k grows), so the deepest filled level is enough to recover the day's fills.
+    """
+    df, _ = _symbol_partitions(proc_df, symbols, date_col)
+    prices = _price_arrays(df)
+    levels = dip_levels(dip_max, step)
+    fills, _ = fill_matrix(prices["prev"], prices["low"], levels)
+    filled = fills.sum(axis=1)
+    days = np.flatnonzero(filled)
+    return _dip_days_frame(df, prices, days, levels[filled[days] - 1], date_col)
+
+
+def _symbol_partitions(proc_df, symbols, date_col):
+    """proc_df rows of `symbols` sorted by symbol (in that order) then date, and the row
+    bounds of each symbol (symbol i is rows bounds[i]:bounds[i + 1])."""
+    df = proc_df[proc_df["Symbol"].isin(symbols)]
+    codes = pd.Categorical(df["Symbol"], categories=list(symbols))
+    df = df.assign(_sym=codes).sort_values(["_sym", date_col], kind="stable")
+    bounds = np.searchsorted(df["_sym"].cat.codes.to_numpy(), np.arange(len(symbols) + 1))
+    return df, bounds
+
+
+def _price_arrays(df):
+    return {
+        col: pd.to_numeric(df[name], errors="coerce").to_numpy(dtype=float)
+        for col, name in (("prev", "Previous_Close"), ("low", "Low"), ("close", "Close"))
+    }
+
+
+def _dip_days_frame(df, prices, days, max_level, date_col):
+    return pd.DataFrame(
+        {
+            "Date": df[date_col].to_numpy(dtype=object)[days],
+            "Symbol": df["Symbol"].to_numpy(dtype=object)[days],
+            "Previous_Close": prices["prev"][days],
+            "Low": prices["low"][days],
+            "Close": prices["close"][days],
+            "Max_Level": np.asarray(max_level).astype(np.int64),
+        },
+        columns=DIP_DAY_COLUMNS,
+    )
+
+
+def _expand_symbol(prev, close, max_level, step):
+    """Numeric event columns for one symbol's dip days; "rows" indexes the dip day of each event."""
+    # levels 1, 1 + step, ... up to each day's Max_Level, day by day
+    per_day = (max_level - 1) // step + 1
+    rows = np.repeat(np.arange(len(prev)), per_day)
+    first = np.repeat(np.cumsum(per_day) - per_day, per_day)
+    level = 1 + (np.arange(len(rows)) - first) * step
+
+    # same expression as fill_matrix so the limit prices match bit for bit
+    executed = round4(prev[rows] * (1 - (level / 100.0)))
+    cum_shares = np.cumsum(np.ones(len(rows), dtype=np.int64))
+    event_close = close[rows]
+    return {
+        "rows": rows,
+        "level": level.astype(np.int64),
+        "executed": executed,
+        "cum_shares": cum_shares,
+        "cum_invested": round4(np.cumsum(executed)),
+        "cum_value": round4(cum_shares * event_close),
+        "close": round4(event_close),
+        "prev": round4(prev[rows]),
+    }
+
+
+def _join_parts(parts, offsets):
+    """Concatenate per-symbol _expand_symbol results, shifting "rows" by each part's offset."""
+    if not parts:
+        return _expand_symbol(np.empty(0), np.empty(0), np.empty(0, dtype=np.int64), 1)
+    out = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+    out["rows"] = np.concatenate([p["rows"] + off for p, off in zip(parts, offsets)])
+    return out
+
+
+def _events_frame(dip_days, ev, symbols):
+    rows = ev["rows"]
+    dates = dip_days["Date"].to_numpy(dtype=object)
+    weekday = pd.to_datetime(pd.Series(dates), errors="coerce").dt.day_name().to_numpy(dtype=object)
+    executed = ev["executed"]
+    shares = np.ones(len(rows), dtype=np.int64)
+    events_df = pd.DataFrame(
+        {
+            "Date": dates[rows],
+            "Date_add": dates[rows],
+            "Weekday": weekday[rows],
+            "Symbol": dip_days["Symbol"].to_numpy(dtype=object)[rows],
+            "Strategy": "Buy_on_Dip",
+            "Buy_Level": ev["level"],
+            "Buy_Price": executed,
+            "Buy Price": executed,
+            "Executed": True,
+            "Executed_Price": executed,
+            "Shares_Purchased": shares,
+            "Shares Purchased": shares,
+            # 1 share per fill, so dollars invested equals the (already rounded) executed price
+            "Dollars_Invested": executed,
+            "Dollars Invested": executed,
+            "Cumulative Shares": ev["cum_shares"],
+            "Cumulative Invested": ev["cum_invested"],
+            "Cumulative Value": ev["cum_value"],
+            "Close": ev["close"],
+            "Previous_Close": ev["prev"],
+        },
+        columns=BOD_COLUMNS,
+    )
+    # events are grouped by symbol already; split at symbol boundaries
+    codes = pd.Categorical(dip_days["Symbol"], categories=list(symbols)).codes[rows]
+    bounds = np.searchsorted(codes, np.arange(len(symbols) + 1))
+    per_symbol = {sym: events_df.iloc[bounds[i]:bounds[i + 1]] for i, sym in enumerate(symbols)}
+    return events_df, per_symbol
+
+
+def expand_dip_days(dip_days, step=1, symbols=None):
+    """Expand dip days back into one event row per filled level.
+
+    Returns (events_df, per_symbol) exactly as build_bod_events would for the same
+    days; cumulative columns start at the first dip day passed in.
+    """
+    if symbols is None:
+        symbols = list(pd.unique(dip_days["Symbol"]))
+    prev = dip_days["Previous_Close"].to_numpy(dtype=float)
+    close = dip_days["Close"].to_numpy(dtype=float)
+    max_level = dip_days["Max_Level"].to_numpy(dtype=np.int64)
+    bounds = np.searchsorted(pd.Categorical(dip_days["Symbol"], categories=list(symbols)).codes, np.arange(len(symbols) + 1))
+    parts = [_expand_symbol(prev[lo:hi], close[lo:hi], max_level[lo:hi], step) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    return _events_frame(dip_days, _join_parts(parts, bounds[:-1]), symbols)
+
+
+def build_bod_events(proc_df, symbols, dip_max=30, step=1):
+    """Generate buy-on-dip fills for all symbols in one broadcast.
+
+    Returns (events_df, per_symbol) where events_df holds every fill in
+    `symbols` order (date ascending, level ascending within a day) and
+    per_symbol maps each symbol to its slice of events_df.
+    """
+    return expand_dip_days(build_dip_days(proc_df, symbols, dip_max, step), step, symbols)
+
+
+def iter_bod_events(symbols=None, start=None, end=None, step=1, folder=DATA_FOLDER):
+    """Yield (symbol, events_df) from the stored dip days, expanding one symbol at a time.
+
+    start/end (inclusive YYYY-MM-DD) are applied to the dip days before expansion,
+    so the cumulative columns run from the first fill inside the range.
+    """
+    dip_days = load_dataset("dipdays", folder, symbols=symbols, start=start, end=end)
+    for sym, group in dip_days.groupby("Symbol", sort=False):
+        yield sym, expand_dip_days(group, step)[0]
+
+
+def load_bod_events(symbols=None, start=None, end=None, step=1, folder=DATA_FOLDER):
+    """All fill rows for `symbols` in start..end, expanded from the stored dip days."""
+    dip_days = load_dataset("dipdays", folder, symbols=symbols, start=start, end=end)
+    return expand_dip_days(dip_days, step)[0]
+
+
+# =============================
+# PROCESS-POOL SYMBOL PARTITIONS
+# =============================
+# name -> array for the partition functions: shared-memory views inside a worker,
+# the caller's own arrays when map_partitions runs in-process
+_PARTITION_ARRAYS = {}
+_ATTACHED = []
+
+
+def _attach_arrays(spec):
+    """Pool initializer: map the parent's shared-memory blocks into this worker."""
+    for name, (block, shape, dtype) in spec.items():
+        # pool workers share the parent's resource tracker, so the parent's unlink is the only cleanup
+        shm = shared_memory.SharedMemory(name=block)
+        _ATTACHED.append(shm)
+        _PARTITION_ARRAYS[name] = np.ndarray(shape, dtype=dtype, buffer=shm.buf)
+
+
+def map_partitions(func, arrays, bounds, workers=BOD_WORKERS):
+    """[func(lo, hi) for consecutive bounds], run over `arrays` (name -> 1-d numeric array).
+
+    With workers > 1 the arrays are copied into shared memory once and the
+    partitions go to a process pool (largest first); func must be a module-level
+    function (or a partial of one) that reads _PARTITION_ARRAYS. Results come back
+    in bounds order either way.
+    """
+    pairs = [(int(lo), int(hi)) for lo, hi in zip(bounds[:-1], bounds[1:])]
+    if workers <= 1 or len(pairs) < 2:
+        _PARTITION_ARRAYS.update(arrays)
+        try:
+            return [func(lo, hi) for lo, hi in pairs]
+        finally:
+            _PARTITION_ARRAYS.clear()
+
+    blocks, spec = [], {}
+    try:
+        for name, values in arrays.items():
+            values = np.ascontiguousarray(values)
+            shm = shared_memory.SharedMemory(create=True, size=max(values.nbytes, 1))
+            blocks.append(shm)
+            np.ndarray(values.shape, dtype=values.dtype, buffer=shm.buf)[...] = values
+            spec[name] = (shm.name, values.shape, values.dtype.str)
+        order = sorted(range(len(pairs)), key=lambda i: pairs[i][0] - pairs[i][1])
+        with ProcessPoolExecutor(max_workers=min(workers, len(pairs)), initializer=_attach_arrays, initargs=(spec,)) as pool:
+            futures = {i: pool.submit(func, *pairs[i]) for i in order}
+            return [futures[i].result() for i in range(len(pairs))]
+    finally:
+        for shm in blocks:
+            shm.close()
+            shm.unlink()
+
+
+def _bod_partition(dip_max, step, lo, hi):
+    """Dip days and numeric event columns for the rows lo:hi (one symbol)."""
+    prev = _PARTITION_ARRAYS["prev"][lo:hi]
+    close = _PARTITION_ARRAYS["close"][lo:hi]
+    levels = dip_levels(dip_max, step)
+    fills, _ = fill_matrix(prev, _PARTITION_ARRAYS["low"][lo:hi], levels)
+    filled = fills.sum(axis=1)
+    days = np.flatnonzero(filled)
+    max_level = levels[filled[days] - 1].astype(np.int64)
+    return days + lo, max_level, _expand_symbol(prev[days], close[days], max_level, step)
+
+
+def build_bod_tables(proc_df, symbols, dip_max=30, step=1, date_col="Date", workers=BOD_WORKERS):
+    """(dip_days, events_df, per_symbol), the same as build_dip_days + expand_dip_days.
+
+    Each symbol is one partition; with workers > 1 and at least PARALLEL_MIN_ROWS
+    rows the partitions run on a process pool over shared-memory price arrays.
+    """
+    df, bounds = _symbol_partitions(proc_df, symbols, date_col)
+    prices = _price_arrays(df)
+    parts = map_partitions(partial(_bod_partition, dip_max, step), prices, bounds, workers if len(df) >= PARALLEL_MIN_ROWS else 1)
+
+    days = np.concatenate([p[0] for p in parts]) if parts else np.empty(0, dtype=np.int64)
+    max_level = np.concatenate([p[1] for p in parts]) if parts else np.empty(0, dtype=np.int64)
+    dip_days = _dip_days_frame(df, prices, days, max_level, date_col)
+    offsets = np.cumsum([0] + [len(p[0]) for p in parts])[:-1]
+    events_df, per_symbol = _events_frame(dip_days, _join_parts([p[2] for p in parts], offsets), symbols)
+    return dip_days, events_df, per_symbol
+
+
+# =============================
+# ETL-MARKET-DATA FORMAT (all_buy_on_dip.csv from history_tickers.csv)
+#  - Buy_Level "k%", limit prices rounded to 6 decimals, Executed_Level in percent
+#  - levels step, 2*step, ... dip_max (the original loop's range(step, dip_max + 1, step))
+#  - symbols in order of first appearance; symbols without a fill are left out
+#  - the CSV is written through round_history_bod: 5 decimals for shares, 2 for dollars
+#    and Executed_Level (the pages and summary_cube read these rounded values)
+# =============================
+HISTORY_BOD_COLUMNS = [
+    "Date_add",
+    "Weekday",
+    "Symbol",
+    "Strategy",
+    "Buy_Price",
+    "Buy_Level",
+    "Executed_Price",
+    "Executed_Level",
+    "Shares Purchased",
+    "Dollars Invested",
+    "Cumulative Shares",
+    "Cumulative Invested",
+    "Cumulative Value",
+    "Close",
+    "Previous_Close",
+]
+
+
+def _history_bod_partition(dip_max, step, lo, hi):
+    """Fills for the rows lo:hi (one symbol), day by day and shallowest level first."""
+    prev = _PARTITION_ARRAYS["prev"][lo:hi]
+    close = _PARTITION_ARRAYS["close"][lo:hi]
+    levels = np.arange(step, dip_max + 1, step)
+    fills, limits = fill_matrix(prev, _PARTITION_ARRAYS["low"][lo:hi], levels)
+    rows, cols = np.nonzero(fills)
+    target = limits[rows, cols].tolist()
+    # Python round() on each fill, as the per-row loop did, so the CSV bytes do not move
+    buy = np.array([round(t, 6) for t in target], dtype=float)
+    executed_level = np.array([round((1.0 - (t / p)) * 100, 2) for t, p in zip(target, prev[rows].tolist())], dtype=float)
+    cum_shares = np.cumsum(np.ones(len(rows), dtype=np.int64))
+    return {
+        "rows": rows + lo,
+        "level": levels[cols],
+        "buy": buy,
+        "executed_level": executed_level,
+        "cum_shares": cum_shares,
+        "cum_invested": np.cumsum(buy),
+        "cum_value": np.round(cum_shares * close[rows], 2),
+    }
+
+
+def build_history_bod_events(history_df, dip_max=30, step=1, date_col="Date_add", workers=BOD_WORKERS):
+    """Buy-on-dip fills in the etl-market-data format (HISTORY_BOD_COLUMNS), one symbol per partition."""
+    symbols = list(pd.unique(history_df["Symbol"].dropna()))
+    df, bounds = _symbol_partitions(history_df, symbols, date_col)
+    prices = _price_arrays(df)
+    parts = map_partitions(partial(_history_bod_partition, dip_max, step), prices, bounds, workers if len(df) >= PARALLEL_MIN_ROWS else 1)
+    parts = [p for p in parts if len(p["rows"])]
+    if not parts:
+        return pd.DataFrame()
+
+    ev = {key: np.concatenate([p[key] for p in parts]) for key in parts[0]}
+    rows = ev["rows"]
+    shares = np.ones(len(rows), dtype=np.int64)
+    return pd.DataFrame(
+        {
+            "Date_add": df[date_col].to_numpy(dtype=object)[rows],
+            "Weekday": df["Weekday"].to_numpy(dtype=object)[rows],
+            "Symbol": df["Symbol"].to_numpy(dtype=object)[rows],
+            "Strategy": "Buy_on_Dip",
+            "Buy_Price": ev["buy"],
+            "Buy_Level": [f"{k}%" for k in ev["level"].tolist()],
+            "Executed_Price": ev["buy"],
+            "Executed_Level": ev["executed_level"],
+            "Shares Purchased": shares,
+            "Dollars Invested": ev["buy"],
+            "Cumulative Shares": ev["cum_shares"],
+            "Cumulative Invested": ev["cum_invested"],
+            "Cumulative Value": ev["cum_value"],
+            "Close": prices["close"][rows],
+            "Previous_Close": prices["prev"][rows],
+        },
+        columns=HISTORY_BOD_COLUMNS,
+    )
+
+
+# decimals of the written all_buy_on_dip.csv columns (etl-market-data format)
+HISTORY_BOD_ROUNDING = {
+    "Shares Purchased": 5,
+    "Cumulative Shares": 5,
+    "Buy_Price": 2,
+    "Dollars Invested": 2,
+    "Cumulative Invested": 2,
+    "Cumulative Value": 2,
+    "Close": 2,
+    "Previous_Close": 2,
+    "Executed_Price": 2,
+    "Executed_Level": 2,
+}
+
+
+def round_history_bod(df):
+    """Round the event columns as all_buy_on_dip.csv stores them (in place; returns df)."""
+    for col, places in HISTORY_BOD_ROUNDING.items():
+        if col in df.columns:
+            df[col] = pd.to_numeric(df[col], errors="coerce").round(places)
+    return df
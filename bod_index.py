@@ -0,0 +1,224 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from bod_engine import fill_matrix
+from price_bundles import encode_bundle, epoch_days
+
+# =============================
+# BUY-ON-DIP PREFIX-SUM INDEX
+#  - per symbol: the days with at least one fill plus, per dip level, running totals of
+#    fills and dollars invested, so any date range x level-weight query is two binary
+#    searches and O(levels) arithmetic instead of a filter/sort/re-accumulate pass
+#  - only levels 1..BOD_INDEX_LEVELS are stored (the pages' dip ladder stops at 10%);
+#    a day that fills a deeper level also fills level 1, so no event day is lost
+#  - data/bod-index/<SYMBOL>.<hash>.bin, little-endian (n event days, L levels):
+#      int32[n]              event days as days since 1970-01-01, ascending
+#      zero padding          up to the next multiple of 8 bytes
+#      float64[n]            Close of each event day
+#      float64[n]            Previous_Close of each event day
+#      float64[(n+1) x L]    invested prefix: row j = dollars per share filled at each level before day j
+#      int32[(n+1) x L]      fill-count prefix, same layout (row 0 is all zeros)
+#  - data/bod-index/index.json lists every symbol with its file, n and L;
+#    js/bod-index.js reads the same files for pages/bod-strat.html
+# =============================
+BOD_INDEX_FOLDER = os.path.join("data", "bod-index")
+BOD_INDEX_FILE = "index.json"
+BOD_INDEX_VERSION = 2
+BOD_INDEX_LEVELS = 10
+
+
+def _day(value):
+    """YYYY-MM-DD / datetime / epoch day -> epoch day."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+class BodPrefixIndex:
+    """Prefix sums of one symbol's buy-on-dip fills.
+
+    days[j] is the j-th event day; counts[j, k - 1] / invested[j, k - 1] hold the fills
+    and the dollars invested (one share per fill) at level k on days[0 .. j - 1].
+    """
+
+    def __init__(self, symbol, days, close, prev_close, counts, invested):
+        self.symbol = symbol
+        self.days = np.asarray(days, dtype=np.int64)
+        self.close = np.asarray(close, dtype=float)
+        self.prev_close = np.asarray(prev_close, dtype=float)
+        self.counts = np.asarray(counts, dtype=np.int64)
+        self.invested = np.asarray(invested, dtype=float)
+
+    @property
+    def levels(self):
+        return self.counts.shape[1]
+
+    def span(self, start, end):
+        """Event-day positions [a, b) falling inside start..end (inclusive dates)."""
+        a = int(np.searchsorted(self.days, _day(start), side="left"))
+        b = int(np.searchsorted(self.days, _day(end), side="right"))
+        return a, max(a, b)
+
+    def weight_vector(self, weights=None):
+        """Shares bought per fill at each level: {level: shares}, a sequence for levels 1.., or 1 everywhere."""
+        w = np.zeros(self.levels)
+        if weights is None:
+            w[:] = 1
+        elif isinstance(weights, dict):
+            for level, shares in weights.items():
+                if 1 <= int(level) <= self.levels:
+                    w[int(level) - 1] = shares
+        else:
+            values = np.asarray(weights, dtype=float)[: self.levels]
+            w[: len(values)] = values
+        return w
+
+    def query(self, start, end, weights=None):
+        """Fills, shares, invested and value for start..end with `weights` shares per fill."""
+        a, b = self.span(start, end)
+        w = self.weight_vector(weights)
+        fills = self.counts[b] - self.counts[a]
+        dollars = self.invested[b] - self.invested[a]
+        used = (w != 0) & (fills > 0)
+        shares = float(fills @ w)
+        invested = float(dollars @ w)
+        if not used.any():
+            return {"events": 0, "shares": 0.0, "invested": 0.0, "value": 0.0, "last_date": None}
+        # last day a weighted level filled: where its running count last stepped up
+        last = max(int(np.searchsorted(self.counts[:, k], self.counts[b, k], side="left")) - 1 for k in np.flatnonzero(used))
+        return {
+            "events": int(fills[used].sum()),
+            "shares": shares,
+            "invested": invested,
+            "value": shares * self.close[last],
+            "last_date": str(np.datetime64(int(self.days[last]), "D")),
+        }
+
+
+def events_from_history(history_df, dip_max=5, date_col="Date_add"):
+    """Fill rows from price history, one per (day, level), limit base = the previous row's Close.
+
+    Mirrors the pages' day-by-day simulation (and scripts/run_bod_tests.simulate_events):
+    the limit is the previous row's Close (its Previous_Close when Close is missing) and
+    fills execute at the unrounded limit price.
+    """
+    levels = np.arange(1, dip_max + 1)
+    frames = []
+    for sym, g in history_df.groupby("Symbol", sort=True):
+        g = g.sort_values(date_col, kind="stable")
+        close = pd.to_numeric(g["Close"], errors="coerce").to_numpy(dtype=float)
+        prior = pd.to_numeric(g["Previous_Close"], errors="coerce").to_numpy(dtype=float)
+        prev = np.r_[np.nan, np.where(np.isnan(close), prior, close)[:-1]]
+        fills, limits = fill_matrix(prev, pd.to_numeric(g["Low"], errors="coerce").to_numpy(dtype=float), levels)
+        row, col = np.nonzero(fills)
+        frames.append(
+            pd.DataFrame(
+                {
+                    "Symbol": sym,
+                    "Date_add": g[date_col].to_numpy()[row],
+                    "Buy_Level": levels[col],
+                    "Executed_Price": limits[row, col],
+                    "Close": close[row],
+                    "Previous_Close": prev[row],
+                }
+            )
+        )
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame()
+
+
+def build_prefix_indexes(events_df, date_col="Date_add", levels=BOD_INDEX_LEVELS):
+    """{symbol: BodPrefixIndex} of levels 1..levels from fill rows (all_buy_on_dip.csv or events_from_history)."""
+    price_col = "Executed_Price" if "Executed_Price" in events_df.columns else "Buy_Price"
+    dates = pd.to_datetime(events_df[date_col], errors="coerce")
+    df = pd.DataFrame(
+        {
+            "Symbol": events_df["Symbol"].astype(str).to_numpy(),
+            "dated": dates.notna().to_numpy(),
+            "day": epoch_days(dates.fillna(pd.Timestamp(0))).astype(np.int64),
+            "level": pd.to_numeric(events_df["Buy_Level"].astype(str).str.rstrip("%"), errors="coerce").to_numpy(),
+            "price": pd.to_numeric(events_df[price_col], errors="coerce").to_numpy(dtype=float),
+            "close": pd.to_numeric(events_df["Close"], errors="coerce").to_numpy(dtype=float),
+            "prev_close": pd.to_numeric(events_df["Previous_Close"], errors="coerce").to_numpy(dtype=float),
+        }
+    )
+    df = df[df["dated"] & (df["level"] >= 1) & (df["level"] <= levels)]
+    df = df.sort_values(["Symbol", "day", "level"], kind="stable")
+    out = {}
+    for sym, g in df.groupby("Symbol", sort=True):
+        days, first, pos = np.unique(g["day"].to_numpy(), return_index=True, return_inverse=True)
+        level = g["level"].to_numpy().astype(np.int64) - 1
+        count = np.zeros((len(days), int(level.max()) + 1), dtype=np.int64)
+        dollars = np.zeros(count.shape)
+        np.add.at(count, (pos, level), 1)
+        np.add.at(dollars, (pos, level), np.nan_to_num(g["price"].to_numpy()))
+        out[sym] = BodPrefixIndex(
+            sym,
+            days,
+            g["close"].to_numpy()[first],
+            g["prev_close"].to_numpy()[first],
+            np.vstack([np.zeros((1, count.shape[1]), dtype=np.int64), count.cumsum(axis=0)]),
+            np.vstack([np.zeros((1, count.shape[1])), dollars.cumsum(axis=0)]),
+        )
+    return out
+
+
+def encode_index(index):
+    data = encode_bundle(index.days, [index.close, index.prev_close, index.invested.ravel()])
+    return data + np.ascontiguousarray(index.counts, dtype="<i4").tobytes()
+
+
+def write_bod_index(indexes, folder=BOD_INDEX_FOLDER):
+    """Write one file per symbol plus index.json; unchanged files are kept, stale ones removed."""
+    os.makedirs(folder, exist_ok=True)
+    entries = []
+    for sym in sorted(indexes):
+        index = indexes[sym]
+        data = encode_index(index)
+        name = f"{sym}.{hashlib.sha256(data).hexdigest()[:12]}.bin"
+        path = os.path.join(folder, name)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        entries.append(
+            {
+                "symbol": str(sym),
+                "file": name,
+                "days": int(len(index.days)),
+                "levels": int(index.levels),
+                "bytes": len(data),
+                "first_date": str(np.datetime64(int(index.days[0]), "D")),
+                "last_date": str(np.datetime64(int(index.days[-1]), "D")),
+            }
+        )
+
+    manifest = {"version": BOD_INDEX_VERSION, "symbols": entries}
+    with open(os.path.join(folder, BOD_INDEX_FILE), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    keep = {e["file"] for e in entries}
+    for name in os.listdir(folder):
+        if name.endswith(".bin") and name not in keep:
+            os.remove(os.path.join(folder, name))
+    return manifest
+
+
+def read_bod_index(symbol, folder=BOD_INDEX_FOLDER):
+    """Decode one symbol's file back into a BodPrefixIndex; mirrors the JS reader."""
+    with open(os.path.join(folder, BOD_INDEX_FILE)) as f:
+        manifest = json.load(f)
+    entry = next(e for e in manifest["symbols"] if e["symbol"] == symbol)
+    with open(os.path.join(folder, entry["file"]), "rb") as f:
+        data = f.read()
+    n, levels = entry["days"], entry["levels"]
+    days = np.frombuffer(data, dtype="<i4", count=n)
+    offset = n * 4 + (-(n * 4) % 8)
+    close = np.frombuffer(data, dtype="<f8", count=n, offset=offset)
+    prev_close = np.frombuffer(data, dtype="<f8", count=n, offset=offset + n * 8)
+    size = (n + 1) * levels
+    invested = np.frombuffer(data, dtype="<f8", count=size, offset=offset + 2 * n * 8)
+    counts = np.frombuffer(data, dtype="<i4", count=size, offset=offset + 2 * n * 8 + size * 8)
+    return BodPrefixIndex(symbol, days, close, prev_close, counts.reshape(n + 1, levels), invested.reshape(n + 1, levels))
@@ -0,0 +1,180 @@
+import argparse
+import itertools
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from bod_engine import fill_matrix
+from market_calendar import PERIODS, period_start
+from storage import DATA_FOLDER, load_dataset
+
+# =============================
+# BUY-ON-DIP LADDER SWEEP (data/bod-leaderboard.json)
+#  - a ladder is pages/bod-strat.html's declineSettings as a vector: ladder[k - 1] shares
+#    are bought when the day's Low reaches Previous_Close * (1 - k%), at that limit price
+#    rounded to cents (the page's limit-order fill)
+#  - the fill matrix of each symbol x period collapses to three vectors over the levels:
+#    fill counts, summed limit prices and fill counts x the period's last Close. Shares,
+#    invested and value of every ladder in every cell are then one matrix product each
+#    (ladders x levels @ levels x cells), a batch of ladders at a time
+#  - cells are every symbol x period (market_calendar.period_start, ending at the latest
+#    date in the table like summary_cube.py) plus an ALL symbol per period: the same
+#    ladder run on every ticker at once
+#  - ranked by return on invested capital; a ladder needs MIN_FILLS fills in a cell to be
+#    ranked there (one lucky -10% fill is not a strategy), and ladders with shares on a
+#    level that never filled in the cell are left out (they tie with the same ladder
+#    without that level)
+#  - the default grid is every 0/1/2-share ladder over -1%..-10% whose share counts have no
+#    common factor (scaling every level by the same factor leaves the return unchanged)
+# =============================
+LEADERBOARD_JSON = os.path.join(DATA_FOLDER, "bod-leaderboard.json")
+LEADERBOARD_VERSION = 1
+SWEEP_LEVELS = 10  # bod-strat.html's -1% .. -10% inputs
+SWEEP_SHARES = (0, 1, 2)
+MIN_FILLS = 5
+TOP_N = 10
+LADDER_BATCH = 8192  # ladders per matrix product
+ALL = "ALL"
+LEADERBOARD_COLUMNS = ["symbol", "period", "rank", "ladder", "roi_pct", "fills", "shares", "invested", "value"]
+
+
+def ladder_grid(levels=SWEEP_LEVELS, choices=SWEEP_SHARES):
+    """Every ladder with shares from `choices` at each level, minus the empty ladder and
+    multiples of a smaller ladder. int64 array, one row per ladder."""
+    grid = np.array(list(itertools.product(choices, repeat=levels)), dtype=np.int64)
+    grid = grid[grid.any(axis=1)]
+    return grid[np.gcd.reduce(grid, axis=1) == 1]
+
+
+def fill_cells(proc_df, levels=SWEEP_LEVELS, periods=PERIODS):
+    """Per-cell level vectors: (cells, counts, prices, values, end_date).
+
+    cells lists (symbol, period); counts / prices / values are (cells x levels):
+    fills at each level, their summed limit prices and fills x the period's last Close.
+    """
+    level_pct = np.arange(1, levels + 1)
+    dates = pd.to_datetime(proc_df["Date"], errors="coerce")
+    end = dates.max()
+    starts = {p: period_start(end, p) for p in periods}
+
+    cells, counts, prices, values = [], [], [], []
+    totals = {p: np.zeros((3, levels)) for p in periods}
+    frame = proc_df.assign(_date=dates).dropna(subset=["_date"])
+    for sym, g in frame.groupby("Symbol", sort=True, observed=True):
+        g = g.sort_values("_date", kind="stable")
+        day = g["_date"].to_numpy()
+        close = pd.to_numeric(g["Close"], errors="coerce").to_numpy(dtype=float)
+        fills, limits = fill_matrix(
+            pd.to_numeric(g["Previous_Close"], errors="coerce").to_numpy(dtype=float),
+            pd.to_numeric(g["Low"], errors="coerce").to_numpy(dtype=float),
+            level_pct,
+        )
+        paid = np.where(fills, np.round(limits, 2), 0.0)
+        for p in periods:
+            inside = (day >= np.datetime64(starts[p])) & (day <= np.datetime64(end))
+            priced = np.flatnonzero(inside & ~np.isnan(close))
+            if len(priced) == 0:
+                continue
+            n = fills[inside].sum(axis=0).astype(float)
+            cell = np.stack([n, paid[inside].sum(axis=0), n * close[priced[-1]]])
+            cells.append((str(sym), p))
+            counts.append(cell[0])
+            prices.append(cell[1])
+            values.append(cell[2])
+            totals[p] += cell
+    for p in periods:
+        cells.append((ALL, p))
+        counts.append(totals[p][0])
+        prices.append(totals[p][1])
+        values.append(totals[p][2])
+    return cells, np.array(counts), np.array(prices), np.array(values), end.strftime("%Y-%m-%d")
+
+
+def sweep(ladders, counts, prices, values, min_fills=MIN_FILLS, top_n=TOP_N, batch=LADDER_BATCH):
+    """Best `top_n` ladders per cell by return on invested capital.
+
+    Returns {field: (cells x top_n) array} for "ladder" (row index into ladders, -1
+    where fewer ladders qualified), "roi", "fills", "shares", "invested" and "value".
+    """
+    n_cells = len(counts)
+    best = {key: np.full((n_cells, 0), np.nan) for key in ("roi", "ladder", "fills", "shares", "invested", "value")}
+    weights = ladders.astype(float)
+    used = (ladders > 0).astype(float)
+    for lo in range(0, len(ladders), batch):
+        w = weights[lo:lo + batch]
+        # (ladders x levels) @ (levels x cells): every ladder in every cell at once
+        shares, invested, value = w @ counts.T, w @ prices.T, w @ values.T
+        fills = used[lo:lo + batch] @ counts.T
+        idle = used[lo:lo + batch] @ (counts == 0).T
+        with np.errstate(invalid="ignore", divide="ignore"):
+            roi = np.where((invested > 0) & (fills >= min_fills) & (idle == 0), value / invested - 1, np.nan)
+        ids = np.broadcast_to(np.arange(lo, lo + len(w))[:, None], roi.shape)
+        merged = {
+            "roi": np.hstack([best["roi"], roi.T]),
+            "ladder": np.hstack([best["ladder"], ids.T]),
+            "fills": np.hstack([best["fills"], fills.T]),
+            "shares": np.hstack([best["shares"], shares.T]),
+            "invested": np.hstack([best["invested"], invested.T]),
+            "value": np.hstack([best["value"], value.T]),
+        }
+        # highest return first, ties to the smaller ladder index; NaN (not ranked) last
+        order = np.lexsort((merged["ladder"], -np.nan_to_num(merged["roi"], nan=-np.inf)), axis=1)[:, :top_n]
+        best = {key: np.take_along_axis(arr, order, axis=1) for key, arr in merged.items()}
+    ladder = np.where(np.isnan(best["roi"]), -1, best["ladder"]).astype(np.int64)
+    return {**best, "ladder": ladder}
+
+
+def build_leaderboard(proc_df, ladders=None, levels=SWEEP_LEVELS, periods=PERIODS, min_fills=MIN_FILLS, top_n=TOP_N):
+    if ladders is None:
+        ladders = ladder_grid(levels)
+    cells, counts, prices, values, end_date = fill_cells(proc_df, ladders.shape[1], periods)
+    best = sweep(ladders, counts, prices, values, min_fills, top_n)
+
+    rows = []
+    for c, (sym, period) in enumerate(cells):
+        for rank in range(best["ladder"].shape[1]):
+            i = best["ladder"][c, rank]
+            if i < 0:
+                break
+            rows.append([
+                sym,
+                period,
+                rank + 1,
+                ladders[i].tolist(),
+                round(float(best["roi"][c, rank]) * 100, 2),
+                int(best["fills"][c, rank]),
+                int(best["shares"][c, rank]),
+                round(float(best["invested"][c, rank]), 2),
+                round(float(best["value"][c, rank]), 2),
+            ])
+    return {
+        "version": LEADERBOARD_VERSION,
+        "end_date": end_date,
+        "periods": list(periods),
+        "levels": list(range(1, ladders.shape[1] + 1)),
+        "ladders_evaluated": int(len(ladders)),
+        "min_fills": min_fills,
+        "columns": LEADERBOARD_COLUMNS,
+        "rows": rows,
+    }
+
+
+def write_leaderboard(proc_df, path=LEADERBOARD_JSON, **kwargs):
+    board = build_leaderboard(proc_df, **kwargs)
+    with open(path, "w") as f:
+        json.dump(board, f, separators=(",", ":"))
+    return board
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Rank buy-on-dip share ladders by return on invested capital")
+    parser.add_argument("--levels", type=int, default=SWEEP_LEVELS, help="deepest level in the grid (percent)")
+    parser.add_argument("--shares", type=int, nargs="+", default=list(SWEEP_SHARES), help="share counts tried at every level")
+    parser.add_argument("--min-fills", type=int, default=MIN_FILLS)
+    parser.add_argument("--top", type=int, default=TOP_N)
+    args = parser.parse_args()
+    grid = ladder_grid(args.levels, tuple(args.shares))
+    board = write_leaderboard(load_dataset("proc"), ladders=grid, min_fills=args.min_fills, top_n=args.top)
+    print(f"Ranked {board['ladders_evaluated']} ladders over {len(board['rows'])} leaderboard rows -> {LEADERBOARD_JSON}")
@@ -0,0 +1,57 @@
+import hashlib
+import json
+import os
+
+from storage import DATA_FOLDER, DATASETS
+
+# =============================
+# DATA MANIFEST (data/data-manifest.json, for the browser cache)
+#  - content hash and size of every CSV the pages parse themselves (price history, buy-on-dip
+#    events, dip days); js/data-store.js keeps the decoded datasets in IndexedDB under
+#    these hashes, so a page only downloads and parses a file again after the ETL changed it
+#  - "build" hashes all entries together: one value that moves whenever any file does
+#  - written last by etl-market-data.py, etlv2.py and the pipeline; files that do not
+#    exist are left out (the pages then fetch them uncached), and an unchanged manifest
+#    is not rewritten
+# =============================
+DATA_MANIFEST = os.path.join(DATA_FOLDER, "data-manifest.json")
+DATA_MANIFEST_VERSION = 1
+MANIFEST_DATASETS = ("history", "bod", "dipdays")  # storage.DATASETS names
+HASH_CHARS = 16
+
+
+def file_hash(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()[:HASH_CHARS]
+
+
+def build_data_manifest(folder=DATA_FOLDER, datasets=MANIFEST_DATASETS):
+    files = {}
+    for name in datasets:
+        path = os.path.join(folder, DATASETS[name])
+        if os.path.exists(path):
+            files[DATASETS[name]] = {"hash": file_hash(path), "bytes": os.path.getsize(path)}
+    build = hashlib.sha256(json.dumps(files, sort_keys=True).encode()).hexdigest()[:HASH_CHARS]
+    return {"version": DATA_MANIFEST_VERSION, "build": build, "files": files}
+
+
+def write_data_manifest(folder=DATA_FOLDER, datasets=MANIFEST_DATASETS):
+    """Write data-manifest.json into `folder`; returns the manifest."""
+    manifest = build_data_manifest(folder, datasets)
+    path = os.path.join(folder, os.path.basename(DATA_MANIFEST))
+    if os.path.exists(path):
+        with open(path) as f:
+            if json.load(f) == manifest:
+                return manifest
+    with open(path + ".tmp", "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+    return manifest
+
+
+if __name__ == "__main__":
+    manifest = write_data_manifest()
+    print(f"Build {manifest['build']}: {len(manifest['files'])} files -> {DATA_MANIFEST}")
@@ -0,0 +1,168 @@
+import numpy as np
+import pandas as pd
+
+# =============================
+# WEEKLY DCA
+#  - same rule as pages/dca.html: a fixed amount every Monday, bought at the
+#    avg_daily_price of the trading day nearest that Monday (the earlier day on a tie),
+#    i.e. the W-MON schedule of build_dca_schedules below
+#  - computed for every symbol at once; running totals come from a per-symbol cumsum
+# =============================
+
+WEEKLY_INVESTMENT = 25.0
+DCA_WEEKLY_SCHEDULE = "W-MON"
+
+# column order of {SYM}-data-dca.csv
+DCA_COLUMNS = [
+    "Date",
+    "Date_add",
+    "Weekday",
+    "Symbol",
+    "Strategy",
+    "Buy_Level",
+    "Buy_Price",
+    "Shares Purchased",
+    "Dollars Invested",
+    "Cumulative Shares",
+    "Cumulative Invested",
+    "Cumulative Value",
+    "Close",
+]
+
+
+def build_dca_purchases(proc_df, weekly_investment=WEEKLY_INVESTMENT):
+    """Weekly DCA buys for every symbol in proc_df (etl-data-proc.csv rows).
+
+    Days without a usable avg_daily_price are never bought; a Monday whose nearest
+    priced day is also nearest the next Monday (a long gap) buys it twice, as the page
+    does. Output is sorted by symbol, then date.
+    """
+    cadence, weekday = DCA_WEEKLY_SCHEDULE.split("-")
+    days, schedule = build_dca_schedules(proc_df, cadences=(cadence,), weekdays=(weekday,))
+    first_row = pd.Series(np.arange(len(days)), index=days["Symbol"].to_numpy()).groupby(level=0).min()
+    buys = days.iloc[first_row.reindex(schedule["Symbol"].to_numpy()).to_numpy(dtype=np.int64) + schedule["Row"].to_numpy(dtype=np.int64)]
+    buys = buys.reset_index(drop=True)
+    dates = pd.Series(np.datetime_as_string(buys["Day"].to_numpy().astype("datetime64[D]")), dtype=object)
+
+    shares = np.round(weekly_investment / buys["Buy_Price"].to_numpy(dtype=float), 6)
+    cum_shares = pd.Series(shares).groupby(buys["Symbol"], sort=False).cumsum().to_numpy()
+    cum_invested = weekly_investment * (buys.groupby("Symbol", sort=False).cumcount().to_numpy() + 1)
+    close = buys["Close"].to_numpy(dtype=float)
+
+    return pd.DataFrame(
+        {
+            "Date": dates.to_numpy(),
+            "Date_add": dates.to_numpy(),
+            "Weekday": pd.to_datetime(dates).dt.day_name().to_numpy(dtype=object),
+            "Symbol": buys["Symbol"].to_numpy(dtype=object),
+            "Strategy": "DCA_Weekly",
+            "Buy_Level": "DCA",
+            "Buy_Price": np.round(buys["Buy_Price"].to_numpy(dtype=float), 4),
+            "Shares Purchased": shares,
+            "Dollars Invested": weekly_investment,
+            "Cumulative Shares": np.round(cum_shares, 6),
+            "Cumulative Invested": np.round(cum_invested, 2),
+            "Cumulative Value": np.round(cum_shares * close, 4),
+            "Close": np.round(close, 4),
+        },
+        columns=DCA_COLUMNS,
+    )
+
+
+# =============================
+# DCA SCHEDULES (every symbol x cadence x target weekday in one pass)
+#  - same rule as pages/dca-strat.html: a target date per week (W) or per month (M, the
+#    first such weekday of the month) on the chosen weekday, bought at the nearest trading
+#    day's avg_daily_price (the earlier day on a tie)
+#  - targets run from DCA_TARGET_SLACK days before a symbol's first priced day to as many
+#    after its last; days without a usable avg_daily_price are never bought
+#  - all symbols share one sorted (symbol, day) key array, so the nearest trading day of
+#    every target is a single searchsorted instead of a date walk per ticker
+# =============================
+DCA_CADENCES = ("W", "M")
+DCA_WEEKDAYS = ("MON", "TUE", "WED", "THU", "FRI")
+DCA_TARGET_SLACK = 3  # days; a Monday target still buys the Friday before / after a gap
+
+
+def schedule_keys(cadences=DCA_CADENCES, weekdays=DCA_WEEKDAYS):
+    """'W-MON', 'W-TUE', ..., 'M-FRI' (pandas-style cadence-weekday names)."""
+    return [f"{c}-{d}" for c in cadences for d in weekdays]
+
+
+def target_days(first, last, cadence, weekday):
+    """Epoch days on `weekday` (0 = Monday) between first and last: every week ("W")
+    or the first one of each month ("M")."""
+    if cadence == "W":
+        start = first + (weekday - (first + 3)) % 7  # 1970-01-01 was a Thursday (weekday 3)
+        return np.arange(start, last + 1, 7, dtype=np.int64)
+    if cadence == "M":
+        months = np.arange(np.datetime64(int(first), "D").astype("datetime64[M]"), np.datetime64(int(last), "D").astype("datetime64[M]") + 1)
+        month_first = months.astype("datetime64[D]").astype(np.int64)
+        days = month_first + (weekday - (month_first + 3)) % 7
+        return days[(days >= first) & (days <= last)]
+    raise ValueError(f"unknown DCA cadence {cadence!r}")
+
+
+def priced_days(proc_df, date_col="Date"):
+    """One row per symbol and trading day with a usable avg_daily_price, sorted by symbol
+    then day: Symbol, Day (epoch day), Buy_Price (avg_daily_price) and Close."""
+    dates = pd.to_datetime(proc_df[date_col], errors="coerce")
+    df = pd.DataFrame(
+        {
+            "Symbol": proc_df["Symbol"].astype(str).to_numpy(),
+            "Day": dates.to_numpy(dtype="datetime64[D]").astype(np.int64),
+            "Buy_Price": pd.to_numeric(proc_df["avg_daily_price"], errors="coerce").to_numpy(dtype=float),
+            "Close": pd.to_numeric(proc_df["Close"], errors="coerce").to_numpy(dtype=float),
+        }
+    )
+    df = df[dates.notna().to_numpy() & (df["Buy_Price"] > 0)]
+    df = df.sort_values(["Symbol", "Day"], kind="stable").drop_duplicates(["Symbol", "Day"])
+    return df.reset_index(drop=True)
+
+
+def build_dca_schedules(proc_df, cadences=DCA_CADENCES, weekdays=DCA_WEEKDAYS, date_col="Date"):
+    """Buy day of every DCA target for all symbols x schedules; returns (days, buys).
+
+    days is priced_days(proc_df). buys has one row per symbol x schedule x target, in
+    that order: Symbol, Schedule ('W-MON', ...), Target (epoch day) and Row, the
+    position of the bought day among the symbol's rows of `days`.
+    """
+    days = priced_days(proc_df, date_col)
+    columns = ["Symbol", "Schedule", "Target", "Row"]
+    if days.empty:
+        return days, pd.DataFrame(columns=columns)
+    sym = days["Symbol"].to_numpy()
+    day = days["Day"].to_numpy()
+    symbols, bounds = np.unique(sym, return_index=True)
+    bounds = np.r_[bounds, len(day)]
+    first, last = day[bounds[:-1]] - DCA_TARGET_SLACK, day[bounds[1:] - 1] + DCA_TARGET_SLACK
+
+    # (symbol, day) -> one sortable int64 key
+    base = int(first.min())
+    span = int(last.max()) - base + 1
+    code = np.repeat(np.arange(len(symbols)), np.diff(bounds))
+    keys = code * span + (day - base)
+
+    frames = []
+    for key in schedule_keys(cadences, weekdays):
+        cadence, weekday = key.split("-")
+        calendar = target_days(int(first.min()), int(last.max()), cadence, DCA_WEEKDAYS.index(weekday))
+        # every symbol x every calendar target, then keep each symbol's own date range
+        t_code = np.repeat(np.arange(len(symbols)), len(calendar))
+        target = np.tile(calendar, len(symbols))
+        keep = (target >= first[t_code]) & (target <= last[t_code])
+        t_code, target = t_code[keep], target[keep]
+
+        lo, hi = bounds[t_code], bounds[t_code + 1]
+        after = np.clip(np.searchsorted(keys, t_code * span + (target - base), side="left"), lo, hi)
+        before = after - 1
+        has_before, has_after = before >= lo, after < hi
+        gap_before = np.where(has_before, target - day[np.maximum(before, 0)], np.iinfo(np.int64).max)
+        gap_after = np.where(has_after, day[np.minimum(after, len(day) - 1)] - target, np.iinfo(np.int64).max)
+        chosen = np.where(gap_before <= gap_after, before, after)
+        frames.append(pd.DataFrame({"Symbol": symbols[t_code], "Schedule": key, "Target": target, "Row": chosen - lo, "_code": t_code}))
+
+    buys = pd.concat(frames, ignore_index=True)
+    # symbol-major, schedules in schedule_keys order, targets ascending
+    buys = buys.sort_values("_code", kind="stable")[columns].reset_index(drop=True)
+    return days, buys
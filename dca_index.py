@@ -0,0 +1,274 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dca_engine import DCA_TARGET_SLACK, DCA_WEEKDAYS, build_dca_schedules, schedule_keys
+from price_bundles import encode_bundle
+
+# =============================
+# DCA SCHEDULE INDEX (data/dca-index/, read by js/dca-index.js)
+#  - per symbol: the priced trading days and, for every schedule (see
+#    dca_engine.build_dca_schedules), the row each target buys plus a running sum of
+#    shares per invested dollar, so any date range x amount is a range lookup on the
+#    trading days and O(1) arithmetic
+#  - weekly schedules form one (weeks x 5) grid, a column per target weekday: cell [k, w]
+#    is the target on weekday w of week k, so a date range maps to the same week span in
+#    every column and all five weekdays are answered at once (the weekday picker)
+#  - data/dca-index/<SYMBOL>.<hash>.bin, little-endian (n days, K weeks, m_s targets of
+#    monthly schedule s):
+#      int32[n]              trading days as days since 1970-01-01, ascending
+#      int32[K x 5]          weekly grid: row bought by each target, -1 where there is none
+#      int32[m_s], int32[m_s] target days, then bought rows, for each monthly schedule
+#      zero padding          up to the next multiple of 8 bytes
+#      float64[n]            avg_daily_price (the buy price) of each day
+#      float64[n]            Close of each day
+#      float64[(K+1) x 5]    weekly shares-per-dollar prefix (row k = weeks 0 .. k - 1)
+#      float64[m_s + 1]      shares-per-dollar prefix for each monthly schedule
+#  - data/dca-index/index.json lists the weekdays and monthly schedules and every symbol
+#    with its file, n, K, the Monday of week 0 and m_s. A window's buys are the targets
+#    inside it, each at its nearest trading day inside the window (the pages'
+#    findClosestTradingDay over the filtered rows)
+# =============================
+DCA_INDEX_FOLDER = os.path.join("data", "dca-index")
+DCA_INDEX_FILE = "index.json"
+DCA_INDEX_VERSION = 2
+MONTHLY_SCHEDULES = schedule_keys(("M",))
+
+
+def _day(value):
+    """YYYY-MM-DD / datetime / epoch day -> epoch day."""
+    if isinstance(value, (int, np.integer)):
+        return int(value)
+    return int(np.datetime64(pd.Timestamp(value).date(), "D").astype(np.int64))
+
+
+def _empty_result():
+    return {"buys": 0, "shares": 0.0, "invested": 0.0, "value": 0.0, "last_date": None}
+
+
+class DcaIndex:
+    """One symbol's DCA schedules.
+
+    Weekly: week_rows[k, w] is the row (position in days / price / close) bought for the
+    target on weekday w of the week starting week0 + 7k, -1 outside the symbol's range;
+    week_prefix[k, w] is the sum of 1 / price over weeks 0 .. k - 1.
+    Monthly: targets[s][j] / rows[s][j] per schedule, per_dollar[s] the same running sum.
+    """
+
+    def __init__(self, symbol, days, price, close, week0, week_rows, targets, rows):
+        self.symbol = symbol
+        self.days = np.asarray(days, dtype=np.int64)
+        self.price = np.asarray(price, dtype=float)
+        self.close = np.asarray(close, dtype=float)
+        self.week0 = int(week0)
+        self.week_rows = np.asarray(week_rows, dtype=np.int64).reshape(-1, len(DCA_WEEKDAYS))
+        bought = self.week_rows >= 0
+        per_dollar = np.where(bought, 1.0 / self.price[np.maximum(self.week_rows, 0)], 0.0) if bought.any() else np.zeros(self.week_rows.shape)
+        self.week_prefix = np.vstack([np.zeros((1, len(DCA_WEEKDAYS))), np.cumsum(per_dollar, axis=0)])
+        # every column's targets are one contiguous run of weeks [first_week, last_week]
+        weeks = len(self.week_rows)
+        self.first_week = np.where(bought.any(axis=0), bought.argmax(axis=0), weeks)
+        self.last_week = np.where(bought.any(axis=0), weeks - 1 - bought[::-1].argmax(axis=0), -1)
+        self.targets = {s: np.asarray(t, dtype=np.int64) for s, t in targets.items()}
+        self.rows = {s: np.asarray(r, dtype=np.int64) for s, r in rows.items()}
+        self.per_dollar = {s: np.r_[0.0, np.cumsum(1.0 / self.price[r])] for s, r in self.rows.items()}
+
+    @property
+    def schedules(self):
+        return schedule_keys(("W",)) + list(self.targets)
+
+    def trading_span(self, start, end):
+        """Rows [lo, hi] of the trading days inside start..end (hi < lo when there are none)."""
+        lo = int(np.searchsorted(self.days, _day(start), side="left"))
+        hi = int(np.searchsorted(self.days, _day(end), side="right")) - 1
+        return lo, hi
+
+    def _edge_fix(self, rows, a, b, lo, hi):
+        """Shares-per-dollar correction for targets at the window's edges whose nearest day is outside it."""
+        fix = 0.0
+        j = a
+        while j < b and rows[j] < lo:
+            fix += 1.0 / self.price[lo] - 1.0 / self.price[rows[j]]
+            j += 1
+        j = b - 1
+        while j >= a and rows[j] > hi:
+            fix += 1.0 / self.price[hi] - 1.0 / self.price[rows[j]]
+            j -= 1
+        return fix
+
+    def _result(self, buys, per_dollar, last, amount):
+        shares = float(amount * per_dollar)
+        return {
+            "buys": int(buys),
+            "shares": shares,
+            "invested": amount * int(buys),
+            "value": shares * float(self.close[last]),
+            "last_date": str(np.datetime64(int(self.days[last]), "D")),
+        }
+
+    def week_span(self, start, end):
+        """Per weekday, the weeks [a, b) whose target falls inside start..end."""
+        offset = self.week0 + np.arange(len(DCA_WEEKDAYS))
+        a = np.maximum(-((offset - _day(start)) // 7), self.first_week)
+        b = np.minimum((_day(end) - offset) // 7, self.last_week) + 1
+        return a, np.maximum(a, b)
+
+    def query_weekdays(self, start, end, amount=1.0):
+        """{'MON': result, ..., 'FRI': result} for weekly buys of `amount` inside start..end."""
+        lo, hi = self.trading_span(start, end)
+        a, b = self.week_span(start, end)
+        w = np.arange(len(DCA_WEEKDAYS))
+        per_dollar = self.week_prefix[b, w] - self.week_prefix[a, w]
+        out = {}
+        for i, name in enumerate(DCA_WEEKDAYS):
+            if b[i] == a[i] or hi < lo:
+                out[name] = _empty_result()
+                continue
+            col = self.week_rows[:, i]
+            fix = self._edge_fix(col, a[i], b[i], lo, hi)
+            out[name] = self._result(b[i] - a[i], per_dollar[i] + fix, min(max(col[b[i] - 1], lo), hi), amount)
+        return out
+
+    def schedule_arrays(self, schedule):
+        """(targets, rows, prefix) of one schedule, prefix[j] = shares per dollar of targets 0 .. j - 1."""
+        cadence, weekday = schedule.split("-")
+        if cadence == "M":
+            return self.targets[schedule], self.rows[schedule], self.per_dollar[schedule]
+        w = DCA_WEEKDAYS.index(weekday)
+        weeks = np.arange(self.first_week[w], self.last_week[w] + 1)
+        return self.week0 + 7 * weeks + w, self.week_rows[weeks, w], self.week_prefix[self.first_week[w]:self.last_week[w] + 2, w]
+
+    def query(self, schedule, start, end, amount=1.0):
+        """Buys, shares, invested and value for `amount` per target inside start..end."""
+        if schedule.startswith("W-"):
+            return self.query_weekdays(start, end, amount)[schedule[2:]]
+        targets, rows, prefix = self.schedule_arrays(schedule)
+        lo, hi = self.trading_span(start, end)
+        a = int(np.searchsorted(targets, _day(start), side="left"))
+        b = max(a, int(np.searchsorted(targets, _day(end), side="right")))
+        if b == a or hi < lo:
+            return _empty_result()
+        per_dollar = prefix[b] - prefix[a] + self._edge_fix(rows, a, b, lo, hi)
+        return self._result(b - a, per_dollar, min(max(rows[b - 1], lo), hi), amount)
+
+    def purchases(self, schedule, start, end, amount=1.0):
+        """One row per buy inside start..end with running totals (the pages' result rows)."""
+        targets, rows, _ = self.schedule_arrays(schedule)
+        lo, hi = self.trading_span(start, end)
+        a = int(np.searchsorted(targets, _day(start), side="left"))
+        b = max(a, int(np.searchsorted(targets, _day(end), side="right"))) if hi >= lo else a
+        row = np.clip(rows[a:b], lo, hi)
+        shares = amount / self.price[row]
+        cum_shares = np.cumsum(shares)
+        return pd.DataFrame(
+            {
+                "Target": targets[a:b].astype("datetime64[D]"),
+                "Date": self.days[row].astype("datetime64[D]"),
+                "Buy_Price": self.price[row],
+                "Shares Purchased": shares,
+                "Dollars Invested": float(amount),
+                "Cumulative Shares": cum_shares,
+                "Cumulative Invested": amount * np.arange(1, b - a + 1),
+                "Cumulative Value": cum_shares * self.close[row],
+                "Close": self.close[row],
+            }
+        )
+
+
+def build_dca_indexes(proc_df, date_col="Date"):
+    """{symbol: DcaIndex} for every symbol of proc_df, all schedules computed in one pass."""
+    days, buys = build_dca_schedules(proc_df, date_col=date_col)
+    cadence = buys["Schedule"].str[0].to_numpy()
+    weekday = buys["Schedule"].str[2:].map(DCA_WEEKDAYS.index).to_numpy()
+    weekly = buys[cadence == "W"].assign(_w=weekday[cadence == "W"])
+    monthly = dict(tuple(buys[cadence == "M"].groupby("Symbol", sort=False)))
+    weekly_by_symbol = dict(tuple(weekly.groupby("Symbol", sort=False)))
+    out = {}
+    for sym, g in days.groupby("Symbol", sort=True):
+        day = g["Day"].to_numpy()
+        first = int(day[0]) - DCA_TARGET_SLACK
+        week0 = first - (first + 3) % 7  # Monday on/before the first target (1970-01-01 was a Thursday)
+        w = weekly_by_symbol.get(sym, weekly.iloc[:0])
+        k = (w["Target"].to_numpy() - week0) // 7
+        grid = np.full((int(k.max()) + 1 if len(k) else 0, len(DCA_WEEKDAYS)), -1, dtype=np.int64)
+        grid[k, w["_w"].to_numpy()] = w["Row"].to_numpy()
+        m = monthly.get(sym, buys.iloc[:0])
+        per_schedule = dict(tuple(m.groupby("Schedule", sort=False)))
+        empty = m.iloc[:0]
+        out[sym] = DcaIndex(
+            sym,
+            day,
+            g["Buy_Price"].to_numpy(),
+            g["Close"].to_numpy(),
+            week0,
+            grid,
+            {s: per_schedule.get(s, empty)["Target"].to_numpy() for s in MONTHLY_SCHEDULES},
+            {s: per_schedule.get(s, empty)["Row"].to_numpy() for s in MONTHLY_SCHEDULES},
+        )
+    return out
+
+
+def encode_index(index):
+    ints = [index.days, index.week_rows.ravel()] + [part for s in MONTHLY_SCHEDULES for part in (index.targets[s], index.rows[s])]
+    floats = [index.price, index.close, index.week_prefix.ravel()] + [index.per_dollar[s] for s in MONTHLY_SCHEDULES]
+    return encode_bundle(np.concatenate(ints), floats)
+
+
+def write_dca_index(indexes, folder=DCA_INDEX_FOLDER):
+    """Write one file per symbol plus index.json; unchanged files are kept, stale ones removed."""
+    os.makedirs(folder, exist_ok=True)
+    entries = []
+    for sym in sorted(indexes):
+        index = indexes[sym]
+        data = encode_index(index)
+        name = f"{sym}.{hashlib.sha256(data).hexdigest()[:12]}.bin"
+        path = os.path.join(folder, name)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        entries.append(
+            {
+                "symbol": str(sym),
+                "file": name,
+                "days": int(len(index.days)),
+                "weeks": int(len(index.week_rows)),
+                "week0": str(np.datetime64(index.week0, "D")),
+                "targets": [int(len(index.targets[s])) for s in MONTHLY_SCHEDULES],
+                "bytes": len(data),
+                "first_date": str(np.datetime64(int(index.days[0]), "D")),
+                "last_date": str(np.datetime64(int(index.days[-1]), "D")),
+            }
+        )
+
+    manifest = {"version": DCA_INDEX_VERSION, "weekdays": list(DCA_WEEKDAYS), "monthly": MONTHLY_SCHEDULES, "symbols": entries}
+    with open(os.path.join(folder, DCA_INDEX_FILE), "w") as f:
+        json.dump(manifest, f, indent=1)
+
+    keep = {e["file"] for e in entries}
+    for name in os.listdir(folder):
+        if name.endswith(".bin") and name not in keep:
+            os.remove(os.path.join(folder, name))
+    return manifest
+
+
+def read_dca_index(symbol, folder=DCA_INDEX_FOLDER):
+    """Decode one symbol's file back into a DcaIndex; mirrors the JS reader."""
+    with open(os.path.join(folder, DCA_INDEX_FILE)) as f:
+        manifest = json.load(f)
+    entry = next(e for e in manifest["symbols"] if e["symbol"] == symbol)
+    with open(os.path.join(folder, entry["file"]), "rb") as f:
+        data = f.read()
+    n, weeks, counts = entry["days"], entry["weeks"], entry["targets"]
+    width = len(manifest["weekdays"])
+    ints = np.frombuffer(data, dtype="<i4", count=n + weeks * width + 2 * sum(counts))
+    offset = ints.nbytes + (-ints.nbytes % 8)
+    floats = np.frombuffer(data, dtype="<f8", count=2 * n, offset=offset)
+    targets, rows, pos = {}, {}, n + weeks * width
+    for s, m in zip(manifest["monthly"], counts):
+        targets[s], rows[s] = ints[pos:pos + m], ints[pos + m:pos + 2 * m]
+        pos += 2 * m
+    week_rows = ints[n:n + weeks * width].reshape(weeks, width)
+    return DcaIndex(symbol, ints[:n], floats[:n], floats[n:], _day(entry["week0"]), week_rows, targets, rows)
@@ -0,0 +1,63 @@
+import numpy as np
+import pandas as pd
+
+# =============================
+# DERIVED PRICE METRICS (shared by etlv2.py and etl-market-data.py)
+#  - Open / High / Low / Close / Previous_Close are turned into float arrays once and every
+#    metric is a single vectorized expression over them (no masked .loc passes)
+#  - Previous_Close missing or 0 -> NaN in every metric (never pd.NA object columns)
+#  - METRICS maps a column name to its expression; add a column by registering it here and
+#    naming it in `columns` (Gap / True_Range / True_Range_Pct are registered but not
+#    written by the ETLs yet)
+# =============================
+PRICE_COLUMNS = {"open": "Open", "high": "High", "low": "Low", "close": "Close", "prev": "Previous_Close"}
+
+
+def _pct(values, prev):
+    return np.round((values - prev) / prev * 100, 2)
+
+
+def _true_range(p):
+    return np.maximum(p["high"], p["prev"]) - np.minimum(p["low"], p["prev"])
+
+
+METRICS = {
+    "Daily_Gain_Loss_Pct": lambda p: _pct(p["close"], p["prev"]),
+    "Open_vs_PrevClose_Pct": lambda p: _pct(p["open"], p["prev"]),
+    "Low_vs_PrevClose_Pct": lambda p: _pct(p["low"], p["prev"]),
+    "Close_vs_PrevClose_Pct": lambda p: p["Daily_Gain_Loss_Pct"] if "Daily_Gain_Loss_Pct" in p else _pct(p["close"], p["prev"]),
+    # percent from the previous close down to the day's low
+    "mx_percent_decline": lambda p: np.round((p["prev"] - p["low"]) / p["prev"] * 100, 2),
+    # opening gap in price units
+    "Gap": lambda p: np.round(p["open"] - p["prev"], 4),
+    "True_Range": lambda p: np.round(_true_range(p), 4),
+    "True_Range_Pct": lambda p: np.round(_true_range(p) / p["prev"] * 100, 2),
+}
+
+# the columns both ETLs write, in output order
+PERCENT_COLUMNS = [
+    "Daily_Gain_Loss_Pct",
+    "Open_vs_PrevClose_Pct",
+    "Low_vs_PrevClose_Pct",
+    "Close_vs_PrevClose_Pct",
+    "mx_percent_decline",
+]
+
+
+def derive_metrics(df, columns=PERCENT_COLUMNS):
+    """{column: float64 array} for the requested METRICS over df's price columns."""
+    p = {key: pd.to_numeric(df[col], errors="coerce").to_numpy(dtype=float) for key, col in PRICE_COLUMNS.items()}
+    p["prev"] = np.where(p["prev"] != 0, p["prev"], np.nan)
+    out = {}
+    with np.errstate(invalid="ignore", divide="ignore"):
+        for name in columns:
+            # earlier results are visible to later expressions (Close_vs_PrevClose_Pct reuses the daily gain)
+            out[name] = p[name] = METRICS[name](p)
+    return out
+
+
+def add_metrics(df, columns=PERCENT_COLUMNS):
+    """Set the derived columns on df (in place) and return it."""
+    for name, values in derive_metrics(df, columns).items():
+        df[name] = values
+    return df
@@ -1,7 +1,20 @@
+import argparse
 import os
-import yfinance as yf
 import pandas as pd
-from datetime import datetime, timedelta
+
+from bod_engine import build_dip_days, build_history_bod_events, round_history_bod
+from bod_index import BOD_INDEX_FOLDER, build_prefix_indexes, write_bod_index
+from dca_index import DCA_INDEX_FOLDER, build_dca_indexes, write_dca_index
+from data_manifest import DATA_MANIFEST, write_data_manifest
+from derived_metrics import PERCENT_COLUMNS, add_metrics
+from excel_export import export_workbooks
+from incremental import fetch_deltas, merge_store
+from market_calendar import calendar_columns, date_strings
+from price_bundles import write_price_bundles
+from price_source import CachedPriceSource, YahooPriceSource, fetch_histories
+from storage import csv_path, dataset_exists, load_dataset, save_dataset
+from summary_cube import CUBE_JSON, write_summary_cube
+from weekly_metrics import WEEKLY_SUMMARY_JSON, write_weekly_summary
 
 # =============================
 # CONFIGURATION
@@ -11,11 +24,64 @@ os.makedirs(output_folder, exist_ok=True)
 
 etf_list = ["SPLG","XLG","TOPT","QQQ","VGT","QTOP","FBCG","MSFT","GOOGL","UPRO","TQQQ","QQUP","GGLL","MSFU","OEF","QQQJ","VTI","ALLY","HSBC","ARKK","FMAG","QQXL"]
 
+# Download settings: price source and bounded concurrency for the fetch phase
+PRICE_SOURCE = CachedPriceSource(YahooPriceSource())  # .cache/prices/, 12h TTL, stale after each market close
+FETCH_WORKERS = 8  # concurrent downloads
+FETCH_RETRIES = 3  # per-symbol retries on errors
+FETCH_BACKOFF_SEC = 1.0  # first retry delay; doubles on every attempt
+BOD_WORKERS = os.cpu_count() or 1  # processes for buy-on-dip generation (large tables only)
+
 # Buy-on-dip configuration: generate limit orders at 1% steps up to dip_max_pct.
 # This ensures very deep single-day declines will have additional limit orders recorded.
 dip_step_pct = 1  # step in percent (1% increments)
 dip_max_pct = 30  # generate orders from 1% down to dip_max_pct (e.g., 30% deep days)
 
+# Week numbering for the Week column: "financial" (52 weeks, Monday start), "iso", "us" or "simple"
+WEEK_CONVENTION = "financial"
+
+# Excel copies written by the opt-in export stage (--excel) after everything else (data/excel/, see excel_export.py)
+EXCEL_DATASETS = ["history", "bod"]  # history_tickers.xlsx, all_buy_on_dip.xlsx
+EXCEL_PER_SYMBOL = ["bod"]  # <sym>_bod.xlsx
+
+
+# =============================
+# PER-TICKER / DERIVED COLUMNS
+# =============================
+def prepare_ticker_history(ticker_symbol, data):
+    """Per-ticker columns (Date_add, Symbol, calendar fields, avg_daily_price) for one download."""
+    df = data.copy()
+    df.reset_index(inplace=True)
+    
+    df['Date_add'] = date_strings(df['Date'])
+    df['Symbol'] = ticker_symbol
+    
+    # Year / Month / Week / Weekday (52-week financial calendar, Monday start)
+    df[['Year', 'Month', 'Week', 'Weekday']] = calendar_columns(df['Date'], WEEK_CONVENTION)
+    
+    df['avg_daily_price'] = df[['Open', 'High', 'Low', 'Close']].mean(axis=1)
+    return df
+
+
+def add_derived_columns(combined_history):
+    """Previous_Close and percent metrics per symbol, yyyy-mm-dd Date, standard column order."""
+    # Sort by Symbol and Date to ensure proper order for previous close calculation
+    combined_history = combined_history.sort_values(['Symbol', 'Date']).reset_index(drop=True)
+    
+    # Add previous day's close price
+    combined_history['Previous_Close'] = combined_history.groupby('Symbol')['Close'].shift(1)
+    
+    # Percent metrics relative to previous close in one vectorized pass (NaN where it is missing or 0)
+    add_metrics(combined_history)
+    
+    # Normalize Date to 'yyyy-mm-dd'
+    combined_history['Date'] = date_strings(combined_history['Date'])
+    
+    # Reorder columns to start with key fields and group related metrics
+    leading = ['Date_add', 'Weekday', 'Symbol', 'Open', 'High', 'Low', 'Close', 'Previous_Close'] + PERCENT_COLUMNS
+    column_order = leading + [col for col in combined_history.columns if col not in leading]
+    combined_history = combined_history[column_order]
+    return combined_history
+
 
 # =============================
 # EXTRACT ALL HISTORICAL DATA FIRST
@@ -24,128 +90,113 @@ def extract_all_historical_data():
     """Download and consolidate all historical data first, then perform calculations."""
     print("Phase 1: Downloading all historical data...")
     all_history = []
-    
-    for ticker_symbol in etf_list:
-        print(f"Downloading data for {ticker_symbol}...")
-        ticker = yf.Ticker(ticker_symbol)
-        data = ticker.history(period="20y", interval="1d")
 
+    # Downloads run concurrently on a bounded thread pool; results keep etf_list order
+    downloads = fetch_histories(
+        PRICE_SOURCE,
+        etf_list,
+        max_workers=FETCH_WORKERS,
+        retries=FETCH_RETRIES,
+        backoff=FETCH_BACKOFF_SEC,
+        period="20y",
+        interval="1d",
+        auto_adjust=True,
+    )
+
+    for ticker_symbol, data in downloads:
+        if data is None:
+            print(f"Download failed for {ticker_symbol}, skipping...")
+            continue
         if data.empty:
             print(f"No data found for {ticker_symbol}, skipping...")
             continue
-
-        df = data.copy()
-        df.reset_index(inplace=True)
-        
-        # Use datetime library for more efficient date extraction
-        df['Date_add'] = df['Date'].apply(lambda x: x.strftime('%Y-%m-%d'))
-        df['Symbol'] = ticker_symbol
-        
-        # Extract date components using datetime methods (Financial Calendar approach)
-        def extract_date_components(date_val):
-            # Convert to naive datetime for comparison
-            if hasattr(date_val, 'to_pydatetime'):
-                dt = date_val.to_pydatetime()
-                if dt.tzinfo is not None:
-                    dt = dt.replace(tzinfo=None)  # Remove timezone for comparison
-            else:
-                dt = date_val
-            
-            # Calculate financial week (52 weeks max, Monday start)
-            jan_1 = datetime(dt.year, 1, 1)
-            # Find first Monday of the year
-            if jan_1.weekday() == 0:  # Jan 1 is Monday
-                first_monday = jan_1
-            else:  # Jan 1 is Tue-Sun, find next Monday
-                days_to_monday = 7 - jan_1.weekday()
-                first_monday = jan_1 + timedelta(days=days_to_monday)
-            
-            if dt >= first_monday:
-                financial_week = min(52, ((dt - first_monday).days // 7) + 1)
-            else:
-                # Before first Monday of year, belongs to week 1
-                financial_week = 1
-            
-            return {
-                'year': dt.year,
-                'month': dt.month, 
-                'week_of_year': financial_week,
-                'weekday': dt.strftime('%A')
-            }
-        
-        date_components = df['Date'].apply(extract_date_components)
-        df['Year'] = [comp['year'] for comp in date_components]
-        df['Month'] = [comp['month'] for comp in date_components]
-        df['Week'] = [comp['week_of_year'] for comp in date_components]
-        df['Weekday'] = [comp['weekday'] for comp in date_components]
-        
-        df['avg_daily_price'] = df[['Open', 'High', 'Low', 'Close']].mean(axis=1)
-        
-        all_history.append(df)
+        all_history.append(prepare_ticker_history(ticker_symbol, data))
     
     if not all_history:
         return pd.DataFrame()
     
     # Combine all historical data
     combined_history = pd.concat(all_history, ignore_index=True)
+    combined_history = add_derived_columns(combined_history)
     
-    # Sort by Symbol and Date to ensure proper order for previous close calculation
-    combined_history = combined_history.sort_values(['Symbol', 'Date']).reset_index(drop=True)
-    
-    # Add previous day's close price
-    combined_history['Previous_Close'] = combined_history.groupby('Symbol')['Close'].shift(1)
-    
-    # Compute percent metrics relative to previous close using vectorized operations
-    # Guard against missing or zero previous close
-    mask = combined_history['Previous_Close'].notna() & (combined_history['Previous_Close'] != 0)
-    # Initialize columns with NA
-    combined_history['Daily_Gain_Loss_Pct'] = pd.NA
-    combined_history['Open_vs_PrevClose_Pct'] = pd.NA
-    combined_history['Low_vs_PrevClose_Pct'] = pd.NA
-    combined_history['Close_vs_PrevClose_Pct'] = pd.NA
-    combined_history['mx_percent_decline'] = pd.NA
-
-    # Compute where valid
-    if mask.any():
-        prev = combined_history.loc[mask, 'Previous_Close']
-        combined_history.loc[mask, 'Daily_Gain_Loss_Pct'] = ((combined_history.loc[mask, 'Close'] - prev) / prev * 100).round(2)
-        combined_history.loc[mask, 'Open_vs_PrevClose_Pct'] = ((combined_history.loc[mask, 'Open'] - prev) / prev * 100).round(2)
-        combined_history.loc[mask, 'Low_vs_PrevClose_Pct'] = ((combined_history.loc[mask, 'Low'] - prev) / prev * 100).round(2)
-        combined_history.loc[mask, 'Close_vs_PrevClose_Pct'] = combined_history.loc[mask, 'Daily_Gain_Loss_Pct']
-        # mx_percent_decline: percent difference between previous close and the day's low
-        combined_history.loc[mask, 'mx_percent_decline'] = ((prev - combined_history.loc[mask, 'Low']) / prev * 100).round(2)
-    
-    # Apply date transformation using datetime to ensure 'yyyy-mm-dd' format
-    combined_history['Date'] = combined_history['Date'].apply(lambda x: x.strftime('%Y-%m-%d') if hasattr(x, 'strftime') else str(x))
-    
-    # Reorder columns to start with key fields and group related metrics
-    column_order = [
-        'Date_add', 'Weekday', 'Symbol', 'Open', 'High', 'Low', 'Close', 'Previous_Close',
-        'Daily_Gain_Loss_Pct', 'Open_vs_PrevClose_Pct', 'Low_vs_PrevClose_Pct', 
-        'Close_vs_PrevClose_Pct', 'mx_percent_decline'
-    ] + [col for col in combined_history.columns if col not in [
-        'Date_add', 'Weekday', 'Symbol', 'Open', 'High', 'Low', 'Close', 'Previous_Close',
-        'Daily_Gain_Loss_Pct', 'Open_vs_PrevClose_Pct', 'Low_vs_PrevClose_Pct', 
-        'Close_vs_PrevClose_Pct', 'mx_percent_decline'
-    ]]
-    combined_history = combined_history[column_order]
-    
-    # Save the consolidated historical data
+    # Save the consolidated historical data (parquet store + CSV export)
     combined_csv_path = os.path.join(output_folder, "history_tickers.csv")
-    combined_history.to_csv(combined_csv_path, index=False)
+    save_dataset(combined_history, "history", output_folder)
     print(f"Saved consolidated historical data → {combined_csv_path}")
     
     return combined_history
 
 def load_historical_data():
     """Load historical data from file if it exists."""
-    combined_csv_path = os.path.join(output_folder, "history_tickers.csv")
-    if os.path.exists(combined_csv_path):
+    if dataset_exists("history", output_folder):
         print("Loading existing historical data from file...")
-        return pd.read_csv(combined_csv_path)
+        return load_dataset("history", output_folder)
     return pd.DataFrame()
 
 
+def update_historical_data():
+    """Incremental Phase 1: fetch only bars newer than history_tickers.csv and append them.
+
+    Derived columns are recomputed for the new bars plus one boundary bar per
+    symbol; a symbol whose history was re-adjusted (split/dividend) is
+    refetched and recomputed in full.
+    """
+    stored = load_historical_data()
+    if stored.empty:
+        print("No stored history found, falling back to a full download...")
+        return extract_all_historical_data()
+
+    print("Phase 1: Fetching bars newer than the stored history...")
+    results = fetch_deltas(
+        PRICE_SOURCE,
+        stored,
+        etf_list,
+        date_col='Date_add',
+        max_workers=FETCH_WORKERS,
+        retries=FETCH_RETRIES,
+        backoff=FETCH_BACKOFF_SEC,
+        period="20y",
+        interval="1d",
+        auto_adjust=True,
+    )
+
+    updates = []
+    for ticker_symbol, data, boundary_date in results:
+        if data is None:
+            print(f"Download failed for {ticker_symbol}, keeping stored rows...")
+            updates.append((ticker_symbol, None, boundary_date))
+            continue
+        if data.empty:
+            if boundary_date is None:
+                print(f"No data found for {ticker_symbol}, skipping...")
+            updates.append((ticker_symbol, data, boundary_date))
+            continue
+        new_rows = prepare_ticker_history(ticker_symbol, data.set_index('Date'))
+        if boundary_date is None:
+            print(f"{ticker_symbol}: full history ({len(new_rows)} rows)")
+            updates.append((ticker_symbol, add_derived_columns(new_rows), None))
+            continue
+        # stored boundary bar supplies Previous_Close for the first new bar
+        new_rows['Date'] = new_rows['Date'].apply(lambda x: x.strftime('%Y-%m-%d'))
+        boundary = stored[(stored['Symbol'] == ticker_symbol) & (stored['Date_add'] == boundary_date)]
+        derived = add_derived_columns(pd.concat([boundary, new_rows], ignore_index=True))
+        derived = derived[derived['Date_add'] > boundary_date]
+        print(f"{ticker_symbol}: {len(derived)} new bar(s) after {boundary_date}")
+        updates.append((ticker_symbol, derived, boundary_date))
+
+    combined_history = merge_store(stored, updates, date_col='Date_add')
+    if combined_history.empty:
+        return combined_history
+    combined_history = combined_history.sort_values(['Symbol', 'Date_add'], kind='stable').reset_index(drop=True)
+    combined_history = combined_history[[c for c in stored.columns if c in combined_history.columns] +
+                                        [c for c in combined_history.columns if c not in stored.columns]]
+
+    combined_csv_path = os.path.join(output_folder, "history_tickers.csv")
+    save_dataset(combined_history, "history", output_folder)
+    print(f"Saved consolidated historical data → {combined_csv_path}")
+    return combined_history
+
+
 # (DCA transform removed - DCA calculations are performed client-side in JS)
 
 
@@ -153,116 +204,51 @@ def load_historical_data():
 # TRANSFORM (BUY-ON-DIP) - FROM HISTORICAL DATA
 # =============================
 def transform_buy_on_dip_from_historical(historical_data):
-    """Simulate Buy-on-Dip strategy from consolidated historical data."""
-    all_bod = []
-    
-    # Process each ticker separately
-    for ticker_symbol in historical_data['Symbol'].unique():
-        print(f"Processing buy-on-dip for {ticker_symbol}...")
-        ticker_data = historical_data[historical_data['Symbol'] == ticker_symbol].copy()
-        ticker_data = ticker_data.sort_values('Date_add')
-        
-        purchased_list = []
-
-        for _, row in ticker_data.iterrows():
-            open_price = row['Open']
-            close_price = row['Close']
-            low_price = row['Low']
-            previous_close = row['Previous_Close']
-            date = row['Date_add']
-            weekday = row['Weekday']
-            
-            # Skip first day of each ticker (no previous close)
-            if pd.isna(previous_close):
-                continue
-
-            # Generate percent levels from 1% to dip_max_pct (1%, 2%, ...)
-            for pct in range(dip_step_pct, dip_max_pct + 1, dip_step_pct):
-                # level multiplier e.g., for pct=1 -> 0.99
-                level = 1.0 - (pct / 100.0)
-                # Calculate target price based on PREVIOUS DAY'S CLOSE (limit order set previous night)
-                target_price = previous_close * level
-                # If the day's low reached or went below the limit price, the order would fill
-                if low_price <= target_price:
-                    # Simulate fills occurring at each limit level as the market moves down.
-                    # Use the level's target price as the executed price (limit orders fill at the limit or better).
-                    # Using the day's low for all fills caused every level to show the same executed price;
-                    # using target_price preserves distinct execution prices per level.
-                    executed_price = target_price
-                    # Executed level (percent decline from previous close to executed price)
-                    executed_level = round((1.0 - (executed_price / previous_close)) * 100, 2) if previous_close and previous_close != 0 else None
-                    purchased_list.append({
-                        'Date_add': date,
-                        'Weekday': weekday,
-                        'Symbol': row['Symbol'],
-                        'Strategy': 'Buy_on_Dip',
-                        # Buy_Price remains the limit price derived from previous close
-                        'Buy_Price': round(target_price, 6),
-                        'Buy_Level': f"{pct}%",
-                        'Executed_Price': round(executed_price, 6),
-                        'Executed_Level': executed_level,
-                        'Shares Purchased': 1,
-                        # Dollars invested should reflect the actual executed price
-                        'Dollars Invested': round(executed_price, 6),
-                        'Close': close_price,
-                        'Previous_Close': previous_close
-                    })
-
-        if not purchased_list:
-            continue
+    """Simulate Buy-on-Dip strategy from consolidated historical data.
 
-        df_bod = pd.DataFrame(purchased_list)
-        if df_bod.empty:
-            continue
-        # Within a day, sort fills by Buy_Price descending so higher-price fills (smaller dips)
-        # are recorded first as the market falls.
-        df_bod = df_bod.sort_values(['Date_add', 'Buy_Price'], ascending=[True, False]).reset_index(drop=True)
-        df_bod['Cumulative Shares'] = df_bod['Shares Purchased'].cumsum()
-        df_bod['Cumulative Invested'] = df_bod['Dollars Invested'].cumsum()
-        df_bod['Cumulative Value'] = (df_bod['Cumulative Shares'] * df_bod['Close']).round(2)
-        
-        # Include executed fields if present
-        cols = ['Date_add', 'Weekday', 'Symbol', 'Strategy', 'Buy_Price', 'Buy_Level']
-        if 'Executed_Price' in df_bod.columns:
-            cols += ['Executed_Price']
-        if 'Executed_Level' in df_bod.columns:
-            cols += ['Executed_Level']
-        cols += ['Shares Purchased', 'Dollars Invested', 'Cumulative Shares', 'Cumulative Invested', 'Cumulative Value', 'Close', 'Previous_Close']
-        result_df = df_bod[cols]
-        all_bod.append(result_df)
-    
-    if not all_bod:
-        return pd.DataFrame()
-    
-    return pd.concat(all_bod, ignore_index=True)
+    Night-before limit orders at Previous_Close * (1 - k%) for k = dip_step_pct..dip_max_pct;
+    a level fills when the day's Low reaches it and records its limit price. Each symbol is
+    one partition of bod_engine.build_history_bod_events (process pool for large tables).
+    """
+    bod_df = build_history_bod_events(historical_data, dip_max_pct, dip_step_pct, workers=BOD_WORKERS)
+    print(f"Buy-on-dip: {len(bod_df)} fills for {bod_df['Symbol'].nunique() if not bod_df.empty else 0} symbols")
+    return bod_df
 
 
 # =============================
 # LOAD
 # =============================
 def load_data(df, ticker_symbol, strategy):
-    """Save purchase history to CSV and Excel."""
+    """Save purchase history to CSV (an Excel copy only comes from the opt-in export stage, excel_export.py)."""
     if df.empty:
         return
     csv_name = os.path.join(output_folder, f"{ticker_symbol.lower()}_{strategy}.csv")
-    xlsx_name = os.path.join(output_folder, f"{ticker_symbol.lower()}_{strategy}.xlsx")
     df.to_csv(csv_name, index=False)
-    df.to_excel(xlsx_name, index=False)
-    print(f"Saved {strategy} history for {ticker_symbol} → {csv_name} and {xlsx_name}")
+    print(f"Saved {strategy} history for {ticker_symbol} → {csv_name}")
 
 
 # =============================
 # MAIN ETL PROCESS
 # =============================
-def main():
+def main(incremental=False, excel=False):
     """Main ETL process: Extract all historical data first, then calculate strategies."""
     
-    # Phase 1: Always extract all historical data and overwrite the consolidated CSV
-    print("Phase 1: Regenerating consolidated historical data (will overwrite existing file if present)...")
-    historical_data = extract_all_historical_data()
+    # Phase 1: extract all historical data (or only the new bars) and overwrite the consolidated CSV
+    if incremental:
+        historical_data = update_historical_data()
+    else:
+        print("Phase 1: Regenerating consolidated historical data (will overwrite existing file if present)...")
+        historical_data = extract_all_historical_data()
     if historical_data.empty:
         print("No historical data available after extraction. Exiting.")
         return
+
+    # Per-symbol binary price bundles for the pages (data/bundles/, see price_bundles.py)
+    index = write_price_bundles(historical_data)
+    print(f"Wrote price bundles for {len(index['symbols'])} symbols -> data/bundles/")
+    # Up/down, Monday->Friday and week-over-week stats per symbol and period (see weekly_metrics.py)
+    summary = write_weekly_summary(historical_data)
+    print(f"Wrote weekly metrics for {len(summary['symbols'])} symbols -> {WEEKLY_SUMMARY_JSON}")
     
     print(f"Phase 2: Processing strategies from {len(historical_data)} historical records...")
     
@@ -271,46 +257,60 @@ def main():
 
     # Phase 3: Save Buy-on-Dip results
     consolidations = [
-        (bod_df, 'all_buy_on_dip'),
+        (bod_df, 'bod'),  # data/all_buy_on_dip.csv + parquet store
     ]
 
-    def round_columns(df):
-        # 5 decimals for shares, 2 decimals for dollar columns
-        share_cols = ['Shares Purchased', 'Cumulative Shares']
-        dollar_cols = [
-            'Buy_Price', 'Dollars Invested', 'Cumulative Invested', 'Cumulative Value', 'Close', 'Previous_Close'
-        ]
-        # Add executed price/level to dollar and percent formatting
-        if 'Executed_Price' in df.columns:
-            dollar_cols.append('Executed_Price')
-        percent_cols = []
-        if 'Executed_Level' in df.columns:
-            percent_cols.append('Executed_Level')
-        for col in share_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').round(5)
-        for col in dollar_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
-        for col in percent_cols:
-            if col in df.columns:
-                df[col] = pd.to_numeric(df[col], errors='coerce').round(2)
-        return df
-
     for df, name in consolidations:
         if df is None or df.empty:
             print(f"No data for {name}, skipping...")
             continue
-        df = round_columns(df)
-        csv_name = os.path.join(output_folder, f'{name}.csv')
+        df = round_history_bod(df)  # 5 decimals for shares, 2 for dollar columns
+        if name == 'bod':
+            bod_df = df
+        csv_name = csv_path(name, output_folder)
         try:
-            df.to_csv(csv_name, index=False)
+            save_dataset(df, name, output_folder)
             print(f"Saved consolidated {name} to {csv_name}")
         except PermissionError:
             print(f"Permission denied writing {csv_name}, file may be open in another application")
             continue
 
+    # Compact dip days (one row per symbol/day, deepest filled level); the pages expand
+    # them into the same fills as all_buy_on_dip.csv (js/dip-days.js)
+    symbols = sorted(historical_data['Symbol'].dropna().unique())
+    dip_days = build_dip_days(historical_data, symbols, dip_max_pct, dip_step_pct, date_col='Date_add')
+    save_dataset(dip_days, 'dipdays', output_folder)
+    print(f"Saved {len(dip_days)} dip days to {csv_path('dipdays', output_folder)}")
+
+    # Phase 4: Summary cube for the pages' overview grids (see summary_cube.py); reuses the
+    # previous cube and only moves the period windows when earlier days are unchanged
+    cube, stats = write_summary_cube(historical_data, bod_df)
+    print(f"Wrote {len(cube['rows'])} summary cube rows -> {CUBE_JSON} "
+          f"({stats['incremental']} symbols updated incrementally, {stats['rebuilt']} rebuilt)")
+
+    # Prefix-sum index of the buy-on-dip fills for pages/bod-strat.html (see bod_index.py)
+    manifest = write_bod_index(build_prefix_indexes(bod_df))
+    print(f"Wrote BOD prefix index for {len(manifest['symbols'])} symbols -> {BOD_INDEX_FOLDER}/")
+
+    # Weekly / monthly DCA buys for every symbol x weekday, read by the DCA pages (see dca_index.py)
+    manifest = write_dca_index(build_dca_indexes(historical_data, date_col='Date_add'))
+    print(f"Wrote DCA schedule index for {len(manifest['symbols'])} symbols -> {DCA_INDEX_FOLDER}/")
+
+    # Content hashes of the CSVs the pages cache in IndexedDB (see data_manifest.py)
+    manifest = write_data_manifest(output_folder)
+    print(f"Wrote data manifest (build {manifest['build']}) -> {DATA_MANIFEST}")
+
+    # Phase 5: Excel copies on request (--excel), off the critical path (only workbooks whose rows changed)
+    if excel:
+        export_workbooks(EXCEL_DATASETS, EXCEL_PER_SYMBOL, output_folder, os.path.join(output_folder, "excel"))
+
     print("ETL process completed successfully!")
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Download market history and build the buy-on-dip dataset")
+    parser.add_argument("--incremental", action="store_true", help="only fetch bars newer than data/history_tickers.csv")
+    parser.add_argument("--offline", action="store_true", help="replay cached downloads only (no network)")
+    parser.add_argument("--excel", action="store_true", help="also write the Excel copies (data/excel/; off by default)")
+    args = parser.parse_args()
+    PRICE_SOURCE.offline = args.offline
+    main(incremental=args.incremental, excel=args.excel)
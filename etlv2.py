@@ -1,19 +1,22 @@
+import argparse
+import hashlib
+import json
 import os
-import yfinance as yf
-import pandas as pd
-from datetime import datetime, timedelta
+from concurrent.futures import ThreadPoolExecutor
 
-# =============================
-# CONFIGURATION
-# =============================
-output_folder = "data"
-etl_history_csv = "etl_history.csv"
-
-import os
-from datetime import datetime
-import yfinance as yf
 import pandas as pd
 
+from bod_engine import build_bod_tables
+from data_manifest import write_data_manifest
+from dca_engine import DCA_WEEKLY_SCHEDULE, build_dca_purchases
+from derived_metrics import add_metrics
+from excel_export import export_workbooks
+from incremental import fetch_deltas, merge_store
+from market_calendar import calendar_columns, date_strings
+from price_source import CachedPriceSource, YahooPriceSource, fetch_histories
+from schema import apply_schema
+from storage import CSV_CHUNK_ROWS, PartitionWriter, csv_path, dataset_exists, dataset_symbols, iter_dataset, load_dataset, save_dataset
+
 # =============================
 # CONFIG
 # =============================
@@ -21,6 +24,8 @@ OUTPUT_FOLDER = "data"
 RAW_COMBINED_CSV = os.path.join(OUTPUT_FOLDER, "etl-data-raw.csv")
 PROC_COMBINED_CSV = os.path.join(OUTPUT_FOLDER, "etl-data-proc.csv")
 ALL_BOD_CSV = os.path.join(OUTPUT_FOLDER, "all_buy_on_dip.csv")
+PER_TICKER_MANIFEST = os.path.join(OUTPUT_FOLDER, "per-ticker-manifest.json")
+EXCEL_DATASETS = ["proc", "bod"]  # etl-data-proc.xlsx, all_buy_on_dip.xlsx (data/excel/)
 
 os.makedirs(OUTPUT_FOLDER, exist_ok=True)
 
@@ -48,10 +53,21 @@ etf_list = [
     "UPRO"
 ]
 
+# Download settings: where prices come from and how the fetch stage is parallelized
+PRICE_SOURCE = CachedPriceSource(YahooPriceSource())  # .cache/prices/, 12h TTL, stale after each market close
+FETCH_WORKERS = 8  # concurrent downloads (bounded thread pool)
+FETCH_RETRIES = 3  # per-symbol retries on errors
+FETCH_BACKOFF_SEC = 1.0  # first retry delay; doubles on every attempt
+BOD_WORKERS = os.cpu_count() or 1  # processes for buy-on-dip generation (large tables only)
+WRITE_WORKERS = 8  # concurrent per-ticker file writes
+
 # Buy-on-dip configuration for ETL (we generate levels 1% .. dip_max_pct %)
 dip_step_pct = 1
 dip_max_pct = 30  # ETL will emit levels up to this percent (frontend may only allow 1..10)
 
+# Week numbering for the Week column (see market_calendar.WEEK_CONVENTIONS)
+WEEK_CONVENTION = "iso"
+
 
 # =============================
 # HELPERS
@@ -71,65 +87,133 @@ def round2(v):
         return v
 
 
+def to_raw_rows(sym, df):
+    """Shape one downloaded frame (index reset) into etl-data-raw.csv rows."""
+    df = df.copy()
+    df["Symbol"] = sym
+    # Keep only standard OHLCV columns if present
+    keep_cols = ["Date", "Open", "High", "Low", "Close", "Volume", "Symbol"]
+    for c in keep_cols:
+        if c not in df.columns:
+            df[c] = pd.NA
+    df = df[keep_cols]
+    # Normalize Date column to YYYY-MM-DD
+    df["Date"] = df["Date"].apply(safe_str_date)
+    return df
+
+
 # =============================
 # STEP 1: Fetch 20 years of history and write etl-data-raw.csv
 # =============================
-def fetch_all_history(tickers):
+def fetch_all_history(tickers, source=None):
+    source = source or PRICE_SOURCE
+    # downloads run concurrently; results come back in `tickers` order
+    downloads = fetch_histories(
+        source,
+        tickers,
+        max_workers=FETCH_WORKERS,
+        retries=FETCH_RETRIES,
+        backoff=FETCH_BACKOFF_SEC,
+        # 20y daily history
+        # Use adjusted prices so ETL v2 aligns with legacy adjusted data (avoids manual split handling)
+        period="20y",
+        interval="1d",
+        auto_adjust=True,
+    )
+
     rows = []
-    for sym in tickers:
-        print(f"[fetch] {sym}")
-        try:
-            t = yf.Ticker(sym)
-            # 20y daily history
-            # Use adjusted prices so ETL v2 aligns with legacy adjusted data (avoids manual split handling)
-            df = t.history(period="20y", interval="1d", auto_adjust=True)
-            if df is None or df.empty:
-                print(f"  no data for {sym}, skipping")
-                continue
-            df = df.reset_index()
-            df["Symbol"] = sym
-            # Keep only standard OHLCV columns if present
-            keep_cols = ["Date", "Open", "High", "Low", "Close", "Volume", "Symbol"]
-            for c in keep_cols:
-                if c not in df.columns:
-                    df[c] = pd.NA
-            df = df[keep_cols]
-            rows.append(df)
-        except Exception as e:
-            print(f"  error fetching {sym}: {e}")
+    for sym, df in downloads:
+        if df is None:
+            continue
+        if df.empty:
+            print(f"  no data for {sym}, skipping")
+            continue
+        rows.append(to_raw_rows(sym, df.reset_index()))
 
     if not rows:
         print("No data downloaded.")
         return pd.DataFrame()
 
     combined = pd.concat(rows, ignore_index=True)
-    # Normalize Date column to YYYY-MM-DD
-    combined["Date"] = combined["Date"].apply(safe_str_date)
-    combined.to_csv(RAW_COMBINED_CSV, index=False)
-    print(f"Wrote raw combined CSV -> {RAW_COMBINED_CSV}")
+    save_dataset(combined, "raw", OUTPUT_FOLDER)
+    print(f"Wrote raw combined dataset -> {RAW_COMBINED_CSV} (+ parquet store)")
     return combined
 
 
+# =============================
+# STEP 1b (incremental): append only bars newer than what etl-data-raw.csv holds
+#  - see incremental.py for the boundary check / re-adjustment fallback
+# =============================
+def update_raw_history(tickers, source=None):
+    """Delta-fetch every ticker into etl-data-raw.csv.
+
+    Returns (combined_raw, updates) where updates lists (symbol, new_rows,
+    boundary_date) for process_incremental().
+    """
+    source = source or PRICE_SOURCE
+    stored = load_dataset("raw", OUTPUT_FOLDER)
+    results = fetch_deltas(
+        source,
+        stored,
+        tickers,
+        max_workers=FETCH_WORKERS,
+        retries=FETCH_RETRIES,
+        backoff=FETCH_BACKOFF_SEC,
+        period="20y",
+        interval="1d",
+        auto_adjust=True,
+    )
+
+    updates = []
+    for sym, df, boundary_date in results:
+        if df is not None:
+            df = to_raw_rows(sym, df)
+            if boundary_date is not None:
+                mode = f"{len(df)} new bar(s) after {boundary_date}"
+            else:
+                mode = "full history" if not df.empty else "no data"
+            print(f"  {sym}: {mode}")
+        updates.append((sym, df, boundary_date))
+
+    combined = merge_store(stored, updates)
+    save_dataset(combined, "raw", OUTPUT_FOLDER)
+    print(f"Updated raw combined dataset -> {RAW_COMBINED_CSV} (+ parquet store)")
+    return combined, updates
+
+
 # =============================
 # STEP 2: Process combined data -> etl-data-proc.csv
 #  - add Year, Month, Week, Weekday
 #  - compute avg_daily_price
 #  - compute Previous_Close (per-symbol shift)
 #  - compute percent metrics and mx_percent_decline
+#  - columns get the compact dtypes declared in schema.py (categorical Symbol/Weekday,
+#    small-int calendar fields, float32 percents)
+#  - process_streaming does the same one symbol partition at a time, writing each
+#    straight to the store; only the last Close of a piece carries into the next
 # =============================
 def process_combined(raw_df=None):
     if raw_df is None:
-        if not os.path.exists(RAW_COMBINED_CSV):
+        if not dataset_exists("raw", OUTPUT_FOLDER):
             raise FileNotFoundError(f"{RAW_COMBINED_CSV} not found; run fetch_all_history() first")
-        raw_df = pd.read_csv(RAW_COMBINED_CSV)
+        raw_df = load_dataset("raw", OUTPUT_FOLDER)
 
+    df = derive_proc_columns(raw_df)
+    save_dataset(df, "proc", OUTPUT_FOLDER)
+    print(f"Wrote processed combined dataset -> {PROC_COMBINED_CSV} (+ parquet store)")
+    return df
+
+
+def derive_proc_columns(raw_df, carry=None):
+    """Add calendar, avg price, Previous_Close and percent columns to raw rows.
+
+    carry maps a symbol to the Close of the bar just before raw_df's first row for
+    it (streaming pieces); without it the first bar has no Previous_Close.
+    """
     df = raw_df.copy()
     # parse Date to datetime when possible
     df["Date_parsed"] = pd.to_datetime(df["Date"], errors="coerce")
-    df["Year"] = df["Date_parsed"].dt.year
-    df["Month"] = df["Date_parsed"].dt.month
-    df["Week"] = df["Date_parsed"].dt.isocalendar().week
-    df["Weekday"] = df["Date_parsed"].dt.day_name()
+    df[["Year", "Month", "Week", "Weekday"]] = calendar_columns(df["Date_parsed"], WEEK_CONVENTION)
 
     # average daily price (simple mean of OHLC where available)
     df[["Open", "High", "Low", "Close"]] = df[["Open", "High", "Low", "Close"]].apply(pd.to_numeric, errors="coerce")
@@ -138,137 +222,171 @@ def process_combined(raw_df=None):
     # previous close per symbol
     df = df.sort_values(["Symbol", "Date_parsed"])
     df["Previous_Close"] = df.groupby("Symbol")["Close"].shift(1)
+    if carry:
+        first = ~df["Symbol"].duplicated().to_numpy()
+        df.loc[first, "Previous_Close"] = df.loc[first, "Symbol"].map(carry).to_numpy(dtype=float)
 
-    # percent calculations relative to previous close (guard missing)
-    df["Daily_Gain_Loss_Pct"] = pd.NA
-    df["Open_vs_PrevClose_Pct"] = pd.NA
-    df["Low_vs_PrevClose_Pct"] = pd.NA
-    df["Close_vs_PrevClose_Pct"] = pd.NA
-    df["mx_percent_decline"] = pd.NA
-
-    mask = df["Previous_Close"].notna() & (df["Previous_Close"] != 0)
-    if mask.any():
-        prev = df.loc[mask, "Previous_Close"].astype(float)
-        df.loc[mask, "Daily_Gain_Loss_Pct"] = ((df.loc[mask, "Close"].astype(float) - prev) / prev * 100).round(2)
-        df.loc[mask, "Open_vs_PrevClose_Pct"] = ((df.loc[mask, "Open"].astype(float) - prev) / prev * 100).round(2)
-        df.loc[mask, "Low_vs_PrevClose_Pct"] = ((df.loc[mask, "Low"].astype(float) - prev) / prev * 100).round(2)
-        df.loc[mask, "Close_vs_PrevClose_Pct"] = df.loc[mask, "Daily_Gain_Loss_Pct"]
-        df.loc[mask, "mx_percent_decline"] = ((prev - df.loc[mask, "Low"].astype(float)) / prev * 100).round(2)
+    # percent calculations relative to previous close, one pass (NaN where it is missing or 0)
+    add_metrics(df)
 
     # final Date normalization
-    df["Date"] = df["Date_parsed"].apply(lambda x: x.strftime("%Y-%m-%d") if not pd.isna(x) else "")
-    # drop helper column
-    df = df.drop(columns=["Date_parsed"]) 
-
-    df.to_csv(PROC_COMBINED_CSV, index=False)
-    print(f"Wrote processed combined CSV -> {PROC_COMBINED_CSV}")
+    df["Date"] = date_strings(df["Date_parsed"]).fillna("")
+    # drop helper column; compact dtypes (schema.py)
+    return apply_schema(df.drop(columns=["Date_parsed"]))
+
+
+def process_streaming(chunk_rows=CSV_CHUNK_ROWS):
+    """process_combined over the stored raw dataset without loading it whole.
+
+    Each processed partition is written to the store as soon as it is derived, so
+    peak memory follows the largest symbol instead of the whole table. Symbols come
+    in sorted order like process_combined (file order from the CSV fallback).
+    Returns the symbols written.
+    """
+    if not dataset_exists("raw", OUTPUT_FOLDER):
+        raise FileNotFoundError(f"{RAW_COMBINED_CSV} not found; run fetch_all_history() first")
+    stored = dataset_symbols("raw", OUTPUT_FOLDER)
+    pieces = iter_dataset(
+        "raw",
+        OUTPUT_FOLDER,
+        symbols=sorted(stored) if stored is not None else None,
+        chunk_rows=chunk_rows,
+    )
+    carry = {}
+    with PartitionWriter("proc", OUTPUT_FOLDER) as out:
+        for sym, raw in pieces:
+            proc = derive_proc_columns(raw, carry)
+            # the next piece of this symbol (CSV chunks) continues from this Close
+            carry = {sym: proc["Close"].iloc[-1]}
+            out.write(proc)
+    print(f"Wrote processed combined dataset -> {PROC_COMBINED_CSV} (+ parquet store), streamed by symbol ({out.rows} rows)")
+    return out.symbols
+
+
+def process_incremental(raw_df, updates):
+    """Refresh etl-data-proc.csv after update_raw_history().
+
+    Derived columns are recomputed only for each symbol's new bars plus the
+    boundary bar (which supplies Previous_Close); fully refetched symbols are
+    reprocessed in full.
+    """
+    stored = load_dataset("proc", OUTPUT_FOLDER)
+    proc_updates = []
+    for sym, new_rows, boundary_date in updates:
+        if new_rows is None:
+            proc_updates.append((sym, None, boundary_date))
+            continue
+        sym_raw = raw_df[raw_df["Symbol"] == sym]
+        if boundary_date is None:
+            derived = derive_proc_columns(sym_raw)
+        else:
+            derived = derive_proc_columns(sym_raw[sym_raw["Date"] >= boundary_date])
+            derived = derived[derived["Date"] > boundary_date]
+        proc_updates.append((sym, derived, boundary_date))
+
+    df = apply_schema(merge_store(stored, proc_updates))
+    df = df.sort_values(["Symbol", "Date"], kind="stable").reset_index(drop=True)
+    save_dataset(df, "proc", OUTPUT_FOLDER)
+    print(f"Updated processed combined dataset -> {PROC_COMBINED_CSV} (+ parquet store)")
     return df
 
 
 # =============================
-# STEP 3: write per-ticker raw/proc files (ticker-data-raw.csv and ticker-data-dca.csv)
+# STEP 3: write per-ticker files ({SYM}-data-raw.csv processed slice, {SYM}-data-dca.csv weekly DCA)
+#  - one groupby pass over the processed frame; files are written on a thread pool
+#  - PER_TICKER_MANIFEST records each symbol's input hash and DCA schedule plus row
+#    count / sha256 of every file, so symbols whose slice did not change are not rewritten
 # =============================
-def write_per_ticker_files(proc_df=None):
-    if proc_df is None:
-        if not os.path.exists(PROC_COMBINED_CSV):
-            raise FileNotFoundError(f"{PROC_COMBINED_CSV} not found; run process_combined() first")
-        proc_df = pd.read_csv(PROC_COMBINED_CSV)
+def slice_hash(df):
+    """Stable content hash of a frame slice (values and column names, not the index)."""
+    h = hashlib.sha256(",".join(map(str, df.columns)).encode())
+    h.update(pd.util.hash_pandas_object(df, index=False).to_numpy().tobytes())
+    return h.hexdigest()
 
-    symbols = sorted(proc_df["Symbol"].dropna().unique())
-    for sym in symbols:
-        ticker_df = proc_df[proc_df["Symbol"] == sym].copy()
-        out_raw = os.path.join(OUTPUT_FOLDER, f"{sym}-data-raw.csv")
-        ticker_df.to_csv(out_raw, index=False)
-        print(f"Wrote {out_raw} ({len(ticker_df)} rows)")
 
-        # create a DCA placeholder file (same as raw processed for now)
-        out_dca = os.path.join(OUTPUT_FOLDER, f"{sym}-data-dca.csv")
-        ticker_df.to_csv(out_dca, index=False)
-    return symbols
+def load_per_ticker_manifest():
+    if not os.path.exists(PER_TICKER_MANIFEST):
+        return {}
+    with open(PER_TICKER_MANIFEST) as f:
+        return json.load(f)
+
+
+def write_csv_checked(df, path):
+    """Write df as CSV and return its manifest entry (rows + sha256 of the bytes)."""
+    data = df.to_csv(index=False).encode()
+    with open(path, "wb") as f:
+        f.write(data)
+    return {"rows": int(len(df)), "sha256": hashlib.sha256(data).hexdigest()}
+
+
+def write_ticker_outputs(sym, ticker_df):
+    """Write one symbol's processed slice and its weekly DCA buys."""
+    files = {f"{sym}-data-raw.csv": ticker_df, f"{sym}-data-dca.csv": build_dca_purchases(ticker_df)}
+    entries = {name: write_csv_checked(df, os.path.join(OUTPUT_FOLDER, name)) for name, df in files.items()}
+    print(f"Wrote {sym}-data-raw.csv / {sym}-data-dca.csv ({len(ticker_df)} rows, {entries[f'{sym}-data-dca.csv']['rows']} DCA buys)")
+    return entries
+
+
+def write_per_ticker_files(proc_df=None, force=False):
+    if proc_df is None:
+        if not dataset_exists("proc", OUTPUT_FOLDER):
+            raise FileNotFoundError(f"{PROC_COMBINED_CSV} not found; run process_combined() first")
+        proc_df = load_dataset("proc", OUTPUT_FOLDER)
+
+    previous = {} if force else load_per_ticker_manifest()
+    manifest = {}
+    pending = []
+    for sym, ticker_df in proc_df.groupby("Symbol", sort=True):
+        ticker_df = ticker_df.reset_index(drop=True)
+        digest = slice_hash(ticker_df)
+        old = previous.get(sym)
+        if (
+            old is not None
+            and old.get("input_sha256") == digest
+            and old.get("dca_schedule") == DCA_WEEKLY_SCHEDULE
+            and all(os.path.exists(os.path.join(OUTPUT_FOLDER, name)) for name in old.get("files", {}))
+        ):
+            manifest[sym] = old
+            continue
+        manifest[sym] = {"rows": int(len(ticker_df)), "input_sha256": digest, "dca_schedule": DCA_WEEKLY_SCHEDULE}
+        pending.append((sym, ticker_df))
+
+    with ThreadPoolExecutor(max_workers=max(1, min(WRITE_WORKERS, len(pending)))) as pool:
+        written = list(pool.map(lambda item: write_ticker_outputs(*item), pending))
+    for (sym, _), files in zip(pending, written):
+        manifest[sym]["files"] = files
+
+    with open(PER_TICKER_MANIFEST, "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"Per-ticker files: {len(pending)} written, {len(manifest) - len(pending)} unchanged")
+    return list(manifest)
 
 
 # =============================
 # STEP 4: Generate per-ticker buy-on-dip events and consolidated all_buy_on_dip.csv
 #  - For each day, create limit orders based on previous close for levels 1..dip_max_pct
 #  - If day's Low <= limit_price, emit an event row with Executed_Price and Buy_Level
+#  - fills are computed by bod_engine one symbol partition at a time (one broadcast over
+#    the levels each), on a process pool over shared-memory prices for large tables
+#  - the compact dip days (one row per symbol/day, deepest level only) are saved alongside
 # =============================
 def generate_bod_events(proc_df=None, symbols=None, dip_max=dip_max_pct, step=dip_step_pct):
     if proc_df is None:
-        if not os.path.exists(PROC_COMBINED_CSV):
+        if not dataset_exists("proc", OUTPUT_FOLDER):
             raise FileNotFoundError(f"{PROC_COMBINED_CSV} not found; run process_combined() first")
-        proc_df = pd.read_csv(PROC_COMBINED_CSV)
+        proc_df = load_dataset("proc", OUTPUT_FOLDER)
 
     if symbols is None:
         symbols = sorted(proc_df["Symbol"].dropna().unique())
 
-    event_rows = []
+    dip_days, events_df, per_symbol = build_bod_tables(proc_df, symbols, dip_max=dip_max, step=step, workers=BOD_WORKERS)
     for sym in symbols:
-        ticker_df = proc_df[proc_df["Symbol"] == sym].sort_values("Date")
-        # ensure numeric types for price columns
-        ticker_df["Previous_Close"] = pd.to_numeric(ticker_df["Previous_Close"], errors="coerce")
-        ticker_df["Low"] = pd.to_numeric(ticker_df["Low"], errors="coerce")
-        ticker_df["Close"] = pd.to_numeric(ticker_df["Close"], errors="coerce")
-        bod_rows = []
-        cumulative_shares = 0
-        cumulative_invested = 0.0
-
-        for _, row in ticker_df.iterrows():
-            prev_close = row.get("Previous_Close")
-            if pd.isna(prev_close) or prev_close == 0:
-                continue
-            day_low = row.get("Low")
-            day_date = row.get("Date")
-            day_close = row.get("Close")
-            # weekday string when available
-            try:
-                weekday = pd.to_datetime(day_date).day_name()
-            except Exception:
-                weekday = ''
-
-            # generate levels 1..dip_max inclusive
-            for level in range(1, dip_max + 1, step):
-                limit_price = prev_close * (1 - (level / 100.0))
-                if pd.isna(day_low):
-                    continue
-                if day_low <= limit_price:
-                    executed_price = round2(limit_price)
-                    shares = 1
-                    cost = round2(executed_price * shares)
-
-                    cumulative_shares += shares
-                    cumulative_invested += cost
-                    cumulative_value = round2((cumulative_shares * day_close) if not pd.isna(day_close) else None)
-
-                    # emit event with multiple field variants front-end expects
-                    event = {
-                        "Date": day_date,
-                        "Date_add": day_date,
-                        "Weekday": weekday,
-                        "Symbol": sym,
-                        "Strategy": "Buy_on_Dip",
-                        "Buy_Level": level,
-                        "Buy_Price": round2(limit_price),
-                        "Buy Price": round2(limit_price),
-                        "Executed": True,
-                        "Executed_Price": executed_price,
-                        "Shares_Purchased": shares,
-                        "Shares Purchased": shares,
-                        "Dollars_Invested": cost,
-                        "Dollars Invested": cost,
-                        "Cumulative Shares": cumulative_shares,
-                        "Cumulative Invested": round2(cumulative_invested),
-                        "Cumulative Value": cumulative_value,
-                        "Close": round2(day_close) if not pd.isna(day_close) else None,
-                        "Previous_Close": round2(prev_close) if not pd.isna(prev_close) else None,
-                    }
-
-                    bod_rows.append(event)
-                    event_rows.append(event)
+        bod_rows = per_symbol[sym]
 
         # save per-ticker bod csv
         out_bod = os.path.join(OUTPUT_FOLDER, f"{sym}-data-bod.csv")
-        if bod_rows:
-            pd.DataFrame(bod_rows).to_csv(out_bod, index=False)
+        if not bod_rows.empty:
+            bod_rows.to_csv(out_bod, index=False)
             print(f"Wrote BOD events for {sym} -> {out_bod} ({len(bod_rows)} rows)")
         else:
             # create empty file with headers expected by frontend
@@ -298,31 +416,56 @@ def generate_bod_events(proc_df=None, symbols=None, dip_max=dip_max_pct, step=di
             print(f"Wrote (empty) BOD file for {sym} -> {out_bod}")
 
     # consolidated all events
-    if event_rows:
-        all_df = pd.DataFrame(event_rows)
-        all_df.to_csv(ALL_BOD_CSV, index=False)
-        print(f"Wrote consolidated BOD CSV -> {ALL_BOD_CSV} ({len(all_df)} rows)")
+    if not events_df.empty:
+        save_dataset(events_df, "bod", OUTPUT_FOLDER)
+        print(f"Wrote consolidated BOD dataset -> {ALL_BOD_CSV} ({len(events_df)} rows)")
     else:
-        pd.DataFrame().to_csv(ALL_BOD_CSV, index=False)
+        save_dataset(pd.DataFrame(), "bod", OUTPUT_FOLDER)
         print(f"No BOD events generated; wrote empty {ALL_BOD_CSV}")
+    save_dataset(dip_days, "dipdays", OUTPUT_FOLDER)
+    print(f"Wrote BOD dip days -> {csv_path('dipdays', OUTPUT_FOLDER)} ({len(dip_days)} days, {len(events_df)} fills)")
 
 
 # =============================
 # MAIN
 # =============================
-def main():
+def main(incremental=False, stream=False, excel=False):
     print("ETL v2 starting")
-    combined_raw = fetch_all_history(etf_list)
-    if combined_raw.empty:
-        print("No raw data, aborting.")
-        return
-    proc = process_combined(combined_raw)
+    if incremental and dataset_exists("raw", OUTPUT_FOLDER) and dataset_exists("proc", OUTPUT_FOLDER):
+        combined_raw, updates = update_raw_history(etf_list)
+        if combined_raw.empty:
+            print("No raw data, aborting.")
+            return
+        proc = process_incremental(combined_raw, updates)
+    else:
+        if incremental:
+            print("No existing raw/processed store; running a full fetch")
+        combined_raw = fetch_all_history(etf_list)
+        if combined_raw.empty:
+            print("No raw data, aborting.")
+            return
+        if stream:
+            del combined_raw
+            process_streaming()
+            proc = load_dataset("proc", OUTPUT_FOLDER)
+        else:
+            proc = process_combined(combined_raw)
     symbols = write_per_ticker_files(proc)
     generate_bod_events(proc, symbols)
+    write_data_manifest(OUTPUT_FOLDER)
+    if excel:
+        export_workbooks(EXCEL_DATASETS, folder=OUTPUT_FOLDER, out_folder=os.path.join(OUTPUT_FOLDER, "excel"))
     print("ETL v2 complete")
 
 
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="ETL v2: fetch, process and write per-ticker / buy-on-dip files")
+    parser.add_argument("--incremental", action="store_true", help="only fetch bars newer than the stored raw data")
+    parser.add_argument("--stream", action="store_true", help="derive the processed table one symbol at a time")
+    parser.add_argument("--offline", action="store_true", help="replay cached downloads only (no network)")
+    parser.add_argument("--excel", action="store_true", help="also write the Excel copies (data/excel/; off by default)")
+    args = parser.parse_args()
+    PRICE_SOURCE.offline = args.offline
+    main(incremental=args.incremental, stream=args.stream, excel=args.excel)
 
 
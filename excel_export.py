@@ -0,0 +1,159 @@
+import argparse
+import hashlib
+import json
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pandas as pd
+
+from storage import DATA_FOLDER, DATASETS, dataset_exists, dataset_symbols, iter_dataset
+
+try:
+    from openpyxl import Workbook
+    HAVE_OPENPYXL = True
+except ImportError:
+    HAVE_OPENPYXL = False
+
+# =============================
+# EXCEL EXPORT STAGE (runs after the CSV / parquet outputs are written)
+#  - one .xlsx per consolidated dataset (all_buy_on_dip.xlsx, ...) and optionally one per
+#    symbol (<sym>_<dataset>.xlsx), under data/excel/
+#  - workbooks are openpyxl write-only workbooks: rows stream to disk one symbol at a time
+#    instead of building a cell object per value the way DataFrame.to_excel does
+#  - every workbook is built in its own worker process (openpyxl is pure Python and CPU bound)
+#  - data/excel/manifest.json keeps a hash of the rows behind each workbook; a workbook is
+#    rebuilt only when that hash changes or the file is missing
+#  - the ETLs run the export only when --excel is passed; without openpyxl it is skipped
+#    with a message
+# =============================
+EXCEL_FOLDER = os.path.join(DATA_FOLDER, "excel")
+EXCEL_MANIFEST = "manifest.json"
+EXCEL_WORKERS = 4  # workbooks built in parallel
+MAX_SHEET_ROWS = 1_048_576  # Excel's per-sheet limit, header row included
+
+
+def workbook_name(name, symbol=None):
+    stem = os.path.splitext(DATASETS[name])[0]
+    return f"{stem}.xlsx" if symbol is None else f"{str(symbol).lower()}_{name}.xlsx"
+
+
+def _pieces(name, folder, symbol):
+    for _, piece in iter_dataset(name, folder, symbols=None if symbol is None else [symbol]):
+        yield piece
+
+
+def source_hash(name, folder=DATA_FOLDER, symbol=None):
+    """sha256 over the rows (and column names) a workbook is built from."""
+    h = hashlib.sha256()
+    for i, piece in enumerate(_pieces(name, folder, symbol)):
+        if i == 0:
+            h.update(",".join(map(str, piece.columns)).encode())
+        h.update(pd.util.hash_pandas_object(piece, index=False).to_numpy().tobytes())
+    return h.hexdigest()
+
+
+def _rows(piece):
+    # native Python values, NaN / NA -> empty cell
+    values = piece.astype(object)
+    return values.where(piece.notna(), None).to_numpy().tolist()
+
+
+def write_workbook(path, name, folder=DATA_FOLDER, symbol=None):
+    """Stream a dataset (or one symbol of it) into a write-only workbook; returns the row count.
+
+    Rows past Excel's sheet limit continue on "<sheet> (2)", "<sheet> (3)", ...
+    """
+    wb = Workbook(write_only=True)
+    title = str(symbol) if symbol is not None else name
+    ws, sheets, used, rows = None, 0, 0, 0
+    for piece in _pieces(name, folder, symbol):
+        for row in _rows(piece):
+            if ws is None or used == MAX_SHEET_ROWS:
+                sheets += 1
+                ws = wb.create_sheet(title if sheets == 1 else f"{title} ({sheets})")
+                ws.append([str(c) for c in piece.columns])
+                used = 1
+            ws.append(row)
+            used += 1
+            rows += 1
+    if ws is None:
+        wb.create_sheet(title)
+    # save beside the target and swap, so an interrupted export never leaves a truncated .xlsx
+    tmp = path + ".tmp"
+    wb.save(tmp)
+    os.replace(tmp, path)
+    return rows
+
+
+def _export_job(job):
+    """Worker: rebuild one workbook unless its source hash matches the previous run."""
+    path, name, folder, symbol, previous = job
+    digest = source_hash(name, folder, symbol)
+    if previous is not None and previous.get("input_sha256") == digest and os.path.exists(path):
+        return previous, False
+    rows = write_workbook(path, name, folder, symbol)
+    entry = {"dataset": name, "rows": int(rows), "input_sha256": digest}
+    if symbol is not None:
+        entry["symbol"] = str(symbol)
+    return entry, True
+
+
+def load_excel_manifest(out_folder=EXCEL_FOLDER):
+    path = os.path.join(out_folder, EXCEL_MANIFEST)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def export_workbooks(datasets, per_symbol=(), folder=DATA_FOLDER, out_folder=EXCEL_FOLDER, workers=EXCEL_WORKERS, force=False):
+    """Write the Excel copies of `datasets` (whole) and `per_symbol` (one workbook per symbol).
+
+    Datasets that do not exist are skipped. Workbooks from an earlier run that are no
+    longer produced (e.g. a symbol left the ticker list) are removed. Returns the manifest.
+    """
+    if not HAVE_OPENPYXL:
+        print("openpyxl not installed; skipping the Excel export")
+        return {}
+    os.makedirs(out_folder, exist_ok=True)
+    previous = {} if force else load_excel_manifest(out_folder)
+
+    jobs = []
+    for name in datasets:
+        if dataset_exists(name, folder):
+            jobs.append((workbook_name(name), name, None))
+    for name in per_symbol:
+        if not dataset_exists(name, folder):
+            continue
+        symbols = dataset_symbols(name, folder)
+        if symbols is None:
+            symbols = list(dict.fromkeys(sym for sym, _ in iter_dataset(name, folder, columns=["Symbol"])))
+        jobs.extend((workbook_name(name, sym), name, sym) for sym in symbols)
+
+    manifest, written = {}, 0
+    if jobs:
+        # largest workbooks (whole datasets) start first
+        work = [(os.path.join(out_folder, file), name, folder, sym, previous.get(file)) for file, name, sym in jobs]
+        with ProcessPoolExecutor(max_workers=max(1, min(workers, len(work)))) as pool:
+            for (file, _, _), (entry, rebuilt) in zip(jobs, pool.map(_export_job, work)):
+                manifest[file] = entry
+                written += rebuilt
+
+    for file in set(previous) - set(manifest):
+        path = os.path.join(out_folder, file)
+        if os.path.exists(path):
+            os.remove(path)
+    with open(os.path.join(out_folder, EXCEL_MANIFEST), "w") as f:
+        json.dump(manifest, f, indent=2, sort_keys=True)
+    print(f"Excel export: {written} workbooks written, {len(manifest) - written} unchanged -> {out_folder}/")
+    return manifest
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Write the Excel copies of the stored datasets (data/excel/)")
+    parser.add_argument("datasets", nargs="*", default=["history", "bod"], help=f"datasets to export ({', '.join(DATASETS)})")
+    parser.add_argument("--per-symbol", nargs="*", default=[], metavar="DATASET", help="also write one workbook per symbol")
+    parser.add_argument("--workers", type=int, default=EXCEL_WORKERS)
+    parser.add_argument("--force", action="store_true", help="rebuild every workbook")
+    args = parser.parse_args()
+    export_workbooks(args.datasets, args.per_symbol, workers=args.workers, force=args.force)
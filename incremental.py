@@ -0,0 +1,128 @@
+import pandas as pd
+
+from price_source import fetch_histories
+
+# =============================
+# INCREMENTAL (DELTA) FETCH
+#  - for each symbol already in the store, refetch from its second-to-last stored
+#    date: that bar is final, so it must match the stored Close exactly
+#  - the last stored bar is replaced by the fresh one (it may have been a partial day)
+#  - a mismatch on the overlap bar, or a split/dividend in the new bars, means Yahoo
+#    re-adjusted the history -> that symbol alone falls back to a full refetch
+# =============================
+
+# relative tolerance when comparing the overlap Close against the stored value
+ADJUSTMENT_TOLERANCE = 1e-6
+
+
+def _ymd(values):
+    """Normalize a Date column (Timestamp, tz-aware Timestamp or string) to YYYY-MM-DD strings."""
+    s = pd.Series(values)
+    if not pd.api.types.is_datetime64_any_dtype(s):
+        s = pd.to_datetime(s, errors="coerce")
+    # tz-aware bars keep their exchange-local calendar date
+    return s.dt.strftime("%Y-%m-%d").to_numpy()
+
+
+def stored_boundaries(stored_df, date_col="Date"):
+    """Map symbol -> (boundary_date, boundary_close) from the existing store.
+
+    The boundary is the second-to-last stored bar; symbols with fewer than two
+    stored bars are left out (they are fetched in full).
+    """
+    df = stored_df[["Symbol", date_col, "Close"]].copy()
+    df["_ymd"] = _ymd(df[date_col])
+    df = df.sort_values(["Symbol", "_ymd"])
+    boundaries = {}
+    for sym, g in df.groupby("Symbol", sort=False):
+        if len(g) < 2:
+            continue
+        row = g.iloc[-2]
+        boundaries[sym] = (row["_ymd"], float(row["Close"]))
+    return boundaries
+
+
+def needs_full_refetch(delta, boundary_date, boundary_close):
+    """True when a delta frame (index reset, Date column) can't be appended safely."""
+    if delta.empty or "Date" not in delta.columns:
+        return True
+    dates = _ymd(delta["Date"])
+    overlap = delta[dates == boundary_date]
+    if overlap.empty:
+        return True
+    close = float(overlap["Close"].iloc[0])
+    if abs(close - boundary_close) > ADJUSTMENT_TOLERANCE * max(abs(boundary_close), 1.0):
+        return True
+    # a split or dividend inside the new bars re-adjusts everything before it
+    new_bars = delta[dates > boundary_date]
+    for col in ("Stock Splits", "Dividends"):
+        if col in new_bars.columns and (pd.to_numeric(new_bars[col], errors="coerce").fillna(0) != 0).any():
+            return True
+    return False
+
+
+def fetch_deltas(source, stored_df, tickers, date_col="Date", max_workers=8, retries=3, backoff=1.0, **history_kwargs):
+    """Fetch only what is missing from the store for each ticker.
+
+    Returns a list of (symbol, frame, boundary_date) in `tickers` order. frame
+    has its index reset (Date column) or is None when the download failed.
+    boundary_date is None for a full history (new symbol or re-adjusted
+    history); otherwise frame holds only bars after boundary_date, which replace
+    every stored bar after that date.
+    """
+    boundaries = stored_boundaries(stored_df, date_col) if not stored_df.empty else {}
+    starts = {sym: boundaries[sym][0] for sym in tickers if sym in boundaries}
+    downloads = dict(
+        fetch_histories(source, tickers, max_workers=max_workers, retries=retries, backoff=backoff, starts=starts, **history_kwargs)
+    )
+
+    results = {}
+    refetch = []
+    for sym in tickers:
+        frame = downloads.get(sym)
+        if frame is not None:
+            frame = frame.reset_index()
+        if sym not in starts or frame is None:
+            results[sym] = (frame, None)
+            continue
+        boundary_date, boundary_close = boundaries[sym]
+        if needs_full_refetch(frame, boundary_date, boundary_close):
+            print(f"  {sym}: history re-adjusted since last run, refetching in full")
+            refetch.append(sym)
+            continue
+        frame = frame[_ymd(frame["Date"]) > boundary_date]
+        results[sym] = (frame, boundary_date)
+
+    if refetch:
+        for sym, frame in fetch_histories(source, refetch, max_workers=max_workers, retries=retries, backoff=backoff, **history_kwargs):
+            results[sym] = (frame.reset_index() if frame is not None else None, None)
+
+    return [(sym,) + results[sym] for sym in tickers]
+
+
+def merge_store(stored_df, updates, date_col="Date"):
+    """Apply fetch_deltas results (already transformed) to the stored frame.
+
+    updates is a list of (symbol, new_rows, boundary_date): stored rows after
+    boundary_date are dropped (all of them when boundary_date is None) and
+    new_rows appended. Symbols whose download failed (new_rows None) keep their
+    stored rows untouched. Output is grouped by symbol in `updates` order.
+    """
+    parts = []
+    if not stored_df.empty:
+        symbols = stored_df["Symbol"].to_numpy()
+        dates = _ymd(stored_df[date_col])
+    for sym, new_rows, boundary_date in updates:
+        if not stored_df.empty:
+            mine = symbols == sym
+            if new_rows is None:
+                parts.append(stored_df[mine])
+                continue
+            if boundary_date is not None:
+                parts.append(stored_df[mine & (dates <= boundary_date)])
+        if new_rows is not None:
+            parts.append(new_rows)
+    parts = [p for p in parts if not p.empty]
+    if not parts:
+        return stored_df.iloc[0:0]
+    return pd.concat(parts, ignore_index=True)
@@ -0,0 +1,100 @@
+// Micro-benchmark: 20Y weekly DCA across all tickers, linear findClosestTradingDay
+// scan vs the binary-search index in trading-days.js.
+//
+//   node js/bench_trading_days.js [path/to/history_tickers.csv]
+//
+// Uses the CSV when given (or data/history_tickers.csv when present), otherwise
+// 20 synthetic tickers with 20 years of weekday bars. Both versions must pick
+// the same trading day for every week.
+const fs = require('fs');
+const path = require('path');
+const TradingDays = require('./trading-days.js');
+
+function loadRows(csvPath) {
+    if (csvPath && fs.existsSync(csvPath)) {
+        const lines = fs.readFileSync(csvPath, 'utf8').split(/\r?\n/).filter(l => l.trim());
+        const headers = lines[0].split(',');
+        return lines.slice(1).map(line => {
+            const values = line.split(',');
+            const obj = {};
+            headers.forEach((h, i) => obj[h] = values[i] ?? '');
+            return obj;
+        });
+    }
+    const rows = [];
+    const start = Date.UTC(2005, 0, 3);
+    for (let t = 0; t < 20; t++) {
+        let price = 50 + t;
+        for (let day = 0; day < 365 * 20 + 5; day++) {
+            const d = new Date(start + day * TradingDays.DAY_MS);
+            if (d.getUTCDay() === 0 || d.getUTCDay() === 6) continue;
+            price *= 1 + Math.sin(day * 0.37 + t) * 0.01;
+            rows.push({ Date_add: d.toISOString().slice(0, 10), Symbol: 'T' + t, Close: price, avg_daily_price: price });
+        }
+    }
+    return rows;
+}
+
+// the implementation the pages used before trading-days.js
+function findClosestLinear(tickerData, targetDate) {
+    const target = new Date(targetDate);
+    let closest = null;
+    let minDiff = Infinity;
+    for (const row of tickerData) {
+        const rowDate = new Date(row.Date_add);
+        const diff = Math.abs(rowDate - target);
+        if (diff < minDiff) {
+            minDiff = diff;
+            closest = row;
+        }
+    }
+    return closest;
+}
+
+// calculateWeeklyDCA from pages/dca.html, parameterized by the lookup
+function weeklyDCA(tickerData, startDate, endDate, findClosest) {
+    const filtered = tickerData
+        .filter(row => { const d = new Date(row.Date_add); return d >= startDate && d <= endDate; })
+        .sort((a, b) => new Date(a.Date_add) - new Date(b.Date_add));
+    const picks = [];
+    let shares = 0;
+    const current = new Date(startDate);
+    while (current.getDay() !== 1) current.setDate(current.getDate() + 1);
+    while (current <= endDate) {
+        const row = findClosest(filtered, current.toISOString().split('T')[0]);
+        if (row) {
+            shares += 25 / parseFloat(row.avg_daily_price);
+            picks.push(row.Date_add);
+        }
+        current.setDate(current.getDate() + 7);
+    }
+    return { picks, shares };
+}
+
+function run(groups, startDate, endDate, findClosest) {
+    const t0 = process.hrtime.bigint();
+    const out = {};
+    for (const [sym, rows] of Object.entries(groups)) out[sym] = weeklyDCA(rows, startDate, endDate, findClosest);
+    return { ms: Number(process.hrtime.bigint() - t0) / 1e6, out };
+}
+
+const csvArg = process.argv[2] || path.join(__dirname, '..', 'data', 'history_tickers.csv');
+const rows = loadRows(csvArg);
+const groups = {};
+rows.forEach(r => (groups[r.Symbol] = groups[r.Symbol] || []).push(r));
+const lastDay = rows.reduce((m, r) => (r.Date_add > m ? r.Date_add : m), '');
+const endDate = new Date(lastDay);
+const startDate = new Date(endDate);
+startDate.setFullYear(endDate.getFullYear() - 20);
+
+console.log(`${Object.keys(groups).length} tickers, ${rows.length} rows, 20Y weekly DCA ending ${lastDay}`);
+const linear = run(groups, startDate, endDate, findClosestLinear);
+const indexed = run(groups, startDate, endDate, TradingDays.findClosest);
+const same = Object.keys(groups).every(sym =>
+    JSON.stringify(linear.out[sym].picks) === JSON.stringify(indexed.out[sym].picks) &&
+    linear.out[sym].shares === indexed.out[sym].shares);
+console.log(`linear scan : ${linear.ms.toFixed(1)} ms`);
+console.log(`binary index: ${indexed.ms.toFixed(1)} ms`);
+console.log(`speedup     : ${(linear.ms / indexed.ms).toFixed(1)}x`);
+console.log(`identical picks: ${same}`);
+process.exit(same ? 0 : 1);
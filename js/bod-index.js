@@ -0,0 +1,147 @@
+// Buy-on-dip prefix-sum index written by the ETL (bod_index.py).
+//
+// data/bod-index/index.json lists every symbol with its file, event-day count n
+// and level count L (at most 10, the deepest level the pages query); a file is
+//   Int32[n]              event days (days since 1970-01-01), ascending
+//   padding               to the next multiple of 8 bytes
+//   Float64[n]            Close, then Previous_Close, of each event day
+//   Float64[(n+1) * L]    invested prefix: row j = dollars (1 share per fill) per level before day j
+//   Int32[(n+1) * L]      fill-count prefix, same layout
+// Totals for any date range and per-level share weights are two binary searches
+// plus O(L) arithmetic. When index.json is missing every loader resolves to null
+// so the page can fall back to all_buy_on_dip.csv / the day-by-day simulation.
+const BodIndex = (() => {
+    const BASE = '../data/bod-index/';
+    const DAY_MS = 86400000;
+    let indexPromise = null;
+    const cache = new Map();
+
+    function loadIndex() {
+        if (!indexPromise) {
+            indexPromise = fetch(BASE + 'index.json', { cache: 'no-cache' })
+                .then(res => (res.ok ? res.json() : null))
+                .catch(() => null);
+        }
+        return indexPromise;
+    }
+
+    function decode(entry, buffer) {
+        const n = entry.days;
+        const levels = entry.levels;
+        const size = (n + 1) * levels;
+        const start = Math.ceil((n * 4) / 8) * 8;
+        return {
+            symbol: entry.symbol,
+            n,
+            levels,
+            days: new Int32Array(buffer, 0, n),
+            close: new Float64Array(buffer, start, n),
+            prevClose: new Float64Array(buffer, start + n * 8, n),
+            invested: new Float64Array(buffer, start + 2 * n * 8, size),
+            counts: new Int32Array(buffer, start + 2 * n * 8 + size * 8, size)
+        };
+    }
+
+    // Decoded index for one symbol, or null when the symbol (or the index) is missing
+    function loadSymbol(symbol) {
+        if (!cache.has(symbol)) {
+            cache.set(symbol, (async () => {
+                const index = await loadIndex();
+                const entry = index && index.symbols.find(e => e.symbol === symbol);
+                if (!entry) return null;
+                const res = await fetch(BASE + entry.file);
+                if (!res.ok) throw new Error(`Failed to fetch BOD index ${entry.file}: ${res.status}`);
+                return decode(entry, await res.arrayBuffer());
+            })());
+        }
+        return cache.get(symbol);
+    }
+
+    // First position whose day is >= day (upper = false) or > day (upper = true)
+    function bound(days, day, upper) {
+        let lo = 0;
+        let hi = days.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >>> 1;
+            if (days[mid] < day || (upper && days[mid] === day)) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    }
+
+    function toDay(date) {
+        if (typeof date === 'number') return date;
+        const d = date instanceof Date ? date : new Date(date);
+        return Math.floor(d.getTime() / DAY_MS);
+    }
+
+    function dayToYMD(day) {
+        return new Date(day * DAY_MS).toISOString().slice(0, 10);
+    }
+
+    // Event-day positions [a, b) inside start..end (inclusive)
+    function span(idx, start, end) {
+        const a = bound(idx.days, toDay(start), false);
+        return [a, Math.max(a, bound(idx.days, toDay(end), true))];
+    }
+
+    // { events, shares, invested, value, lastDate } for weights = { level: shares }
+    function query(idx, start, end, weights) {
+        const [a, b] = span(idx, start, end);
+        let events = 0, shares = 0, invested = 0, last = -1;
+        Object.entries(weights).forEach(([levelRaw, w]) => {
+            const k = Number(levelRaw) - 1;
+            w = Number(w) || 0;
+            if (k < 0 || k >= idx.levels || w === 0) return;
+            const hi = idx.counts[b * idx.levels + k];
+            const fills = hi - idx.counts[a * idx.levels + k];
+            if (fills === 0) return;
+            events += fills;
+            shares += fills * w;
+            invested += (idx.invested[b * idx.levels + k] - idx.invested[a * idx.levels + k]) * w;
+            // last fill at this level: the row where its running count reached `hi`
+            let lo = a, up = b;
+            while (lo < up) {
+                const mid = (lo + up) >>> 1;
+                if (idx.counts[mid * idx.levels + k] < hi) lo = mid + 1;
+                else up = mid;
+            }
+            last = Math.max(last, lo - 1);
+        });
+        return {
+            events,
+            shares,
+            invested,
+            value: last >= 0 ? shares * idx.close[last] : 0,
+            lastDate: last >= 0 ? dayToYMD(idx.days[last]) : null
+        };
+    }
+
+    // Per-level fills and fill prices on each event day inside start..end:
+    // [{ date, close, previousClose, fills: [{ level, count, price }] }]
+    function eventDays(idx, start, end, weights) {
+        const [a, b] = span(idx, start, end);
+        const L = idx.levels;
+        const levels = Object.keys(weights).map(Number).filter(l => l >= 1 && l <= L && Number(weights[l]) > 0);
+        const out = [];
+        for (let j = a; j < b; j++) {
+            const fills = [];
+            levels.forEach(level => {
+                const k = level - 1;
+                const count = idx.counts[(j + 1) * L + k] - idx.counts[j * L + k];
+                if (count > 0) {
+                    const dollars = idx.invested[(j + 1) * L + k] - idx.invested[j * L + k];
+                    fills.push({ level, count, price: dollars / count });
+                }
+            });
+            if (fills.length) {
+                out.push({ date: dayToYMD(idx.days[j]), close: idx.close[j], previousClose: idx.prevClose[j], fills });
+            }
+        }
+        return out;
+    }
+
+    return { loadIndex, loadSymbol, span, query, eventDays };
+})();
+
+if (typeof module !== 'undefined') module.exports = BodIndex;
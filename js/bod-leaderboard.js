@@ -0,0 +1,62 @@
+// Best buy-on-dip share ladders written by the ETL (bod_sweep.py).
+//
+// data/bod-leaderboard.json ranks every 0/1/2-share ladder over the -1%..-10%
+// limit orders by return on invested capital, per symbol x period (YTD..20Y)
+// plus an ALL row set that runs one ladder on every ticker. A ladder is the
+// page's decline inputs as an array: ladder[k - 1] shares at -k%. When the file
+// is missing every loader resolves to null and the page hides its suggestions.
+const BodLeaderboard = (() => {
+    const URL = '../data/bod-leaderboard.json';
+    let boardPromise = null;
+
+    // rows grouped 'symbol|period' -> [row, ...] in rank order
+    function prepare(board) {
+        const byCell = new Map();
+        board.rows.forEach(values => {
+            const row = {};
+            board.columns.forEach((name, i) => row[name] = values[i]);
+            const key = `${row.symbol}|${row.period}`;
+            if (!byCell.has(key)) byCell.set(key, []);
+            byCell.get(key).push(row);
+        });
+        byCell.forEach(rows => rows.sort((a, b) => a.rank - b.rank));
+        return {
+            endDate: board.end_date,
+            periods: board.periods,
+            levels: board.levels,
+            laddersEvaluated: board.ladders_evaluated,
+            minFills: board.min_fills,
+            byCell
+        };
+    }
+
+    // rewritten every ETL run: always revalidate it
+    function load() {
+        if (!boardPromise) {
+            boardPromise = fetch(URL, { cache: 'no-cache' })
+                .then(res => (res.ok ? res.json() : null))
+                .then(board => (board && Array.isArray(board.rows) ? prepare(board) : null))
+                .catch(() => null);
+        }
+        return boardPromise;
+    }
+
+    // Up to n ranked rows ({ rank, ladder, roi_pct, fills, shares, invested, value })
+    // for a symbol (or 'ALL') and period, [] when the cell has none, null without the file.
+    async function top(symbol, period, n = 5) {
+        const board = await load();
+        if (!board) return null;
+        return (board.byCell.get(`${symbol}|${period}`) || []).slice(0, n);
+    }
+
+    // declineSettings object ({ level: shares }) for a ladder array
+    function toSettings(ladder) {
+        const settings = {};
+        ladder.forEach((shares, i) => { if (shares > 0) settings[i + 1] = shares; });
+        return settings;
+    }
+
+    return { load, top, toSettings };
+})();
+
+if (typeof module !== 'undefined') module.exports = BodLeaderboard;
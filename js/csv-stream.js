@@ -0,0 +1,70 @@
+// Chunked CSV loading through PapaParse (download + worker mode).
+//
+// Papa fetches and parses the file in its own worker and hands the page one chunk
+// of rows at a time, so a page can render what it has before the file is done
+// (the ticker grid of pages/bod.html). Rows come back as arrays (header: false);
+// the header row is resolved once into one column position per wanted field (the
+// first spelling present), and every row becomes { field: value } through those
+// positions instead of probing header spellings row by row. Needs Papa on the page.
+const CsvStream = (() => {
+    const CHUNK_BYTES = 512 * 1024;
+
+    // spec { field: [spelling, ...] } + header row -> [[field, position], ...], -1 when absent
+    function resolveColumns(spec, header) {
+        const names = header.map(h => String(h ?? '').trim());
+        return Object.entries(spec).map(([field, spellings]) => {
+            const found = spellings.map(s => names.indexOf(s)).find(i => i >= 0);
+            return [field, found === undefined ? -1 : found];
+        });
+    }
+
+    function toObjects(columns, data, from) {
+        const rows = new Array(Math.max(0, data.length - from));
+        for (let i = from; i < data.length; i++) {
+            const values = data[i];
+            const row = {};
+            for (const [field, pos] of columns) row[field] = pos >= 0 ? values[pos] : null;
+            rows[i - from] = row;
+        }
+        return rows;
+    }
+
+    // Parse `url` chunk by chunk: onRows(rows, bytesRead) gets each chunk's rows as
+    // { field: value } objects (numbers typed, null for empty or missing columns).
+    // Resolves the total row count; rejects when the download or parse fails.
+    function stream(url, spec, onRows) {
+        // Papa's worker is a blob: URL, so relative paths must be made absolute here
+        const href = typeof location !== 'undefined' ? new URL(url, location.href).href : url;
+        return new Promise((resolve, reject) => {
+            let columns = null;
+            let count = 0;
+            Papa.parse(href, {
+                download: true,
+                worker: true,
+                header: false,
+                dynamicTyping: true,
+                skipEmptyLines: true,
+                chunkSize: CHUNK_BYTES,
+                chunk(results) {
+                    if (results.errors && results.errors.length) console.warn('CSV parse warnings:', results.errors);
+                    const data = results.data;
+                    let from = 0;
+                    if (!columns) {
+                        if (!data.length) return;
+                        columns = resolveColumns(spec, data[0]);
+                        from = 1;
+                    }
+                    const rows = toObjects(columns, data, from);
+                    count += rows.length;
+                    onRows(rows, results.meta && results.meta.cursor);
+                },
+                complete: () => resolve(count),
+                error: err => reject(err instanceof Error ? err : new Error('Failed to fetch CSV: ' + (err && err.message || err)))
+            });
+        });
+    }
+
+    return { resolveColumns, stream };
+})();
+
+if (typeof module !== 'undefined') module.exports = CsvStream;
@@ -0,0 +1,174 @@
+// Persistent browser cache of the decoded CSV datasets, keyed by the ETL's content hashes.
+//
+// data/data-manifest.json (data_manifest.py) holds a hash per CSV the pages parse
+// themselves (history_tickers.csv, all_buy_on_dip.csv, bod_dip_days.csv). load()
+// answers from IndexedDB while the stored hash matches the manifest. Otherwise it
+// downloads '<file>?v=<hash>', decodes it and stores the result under the new
+// hash. All pages and js/strategy-worker.js go through here, so moving between
+// bod.html, bod-strat.html, dca.html and dca-strat.html parses a file once per ETL
+// build instead of once per page load. Datasets are kept columnar (table): numeric
+// columns as Float64Array (NaN = empty), the rest as string arrays; rows() turns a
+// table back into row objects (numbers, null for empty, like PriceBundles.toRows).
+// Without IndexedDB or the manifest every load is fetch + decode, cached in memory.
+const DataStore = (() => {
+    const BASE = '../data/';
+    const DB_NAME = 'analysis-stockmarket';
+    const DB_VERSION = 1;
+    const STORE = 'datasets';
+    const NUMBER = /^[-+]?(\d+\.?\d*|\.\d+)([eE][-+]?\d+)?$/;
+    let manifestPromise = null;
+    let dbPromise = null;
+    const memory = new Map();
+    const rowCache = new WeakMap();
+
+    // rewritten every ETL run: always revalidate it
+    function manifest() {
+        if (!manifestPromise) {
+            manifestPromise = fetch(BASE + 'data-manifest.json', { cache: 'no-cache' })
+                .then(res => (res.ok ? res.json() : null))
+                .catch(() => null);
+        }
+        return manifestPromise;
+    }
+
+    // IndexedDB handle, or null where it is unavailable (private modes, file://, old browsers)
+    function openDb() {
+        if (!dbPromise) {
+            dbPromise = new Promise(resolve => {
+                if (typeof indexedDB === 'undefined') return resolve(null);
+                let req;
+                try {
+                    req = indexedDB.open(DB_NAME, DB_VERSION);
+                } catch (e) {
+                    return resolve(null);
+                }
+                req.onupgradeneeded = () => req.result.createObjectStore(STORE, { keyPath: 'key' });
+                req.onsuccess = () => resolve(req.result);
+                req.onerror = () => resolve(null);
+                req.onblocked = () => resolve(null);
+            });
+        }
+        return dbPromise;
+    }
+
+    // One request in its own transaction; resolves its result, null on any failure
+    function request(db, mode, op) {
+        return new Promise(resolve => {
+            try {
+                const tx = db.transaction(STORE, mode);
+                const req = op(tx.objectStore(STORE));
+                tx.oncomplete = () => resolve(req.result ?? null);
+                tx.onerror = () => resolve(null);
+                tx.onabort = () => resolve(null);
+            } catch (e) {
+                resolve(null);
+            }
+        });
+    }
+
+    // `kind` of data/<file> as made by decode(url), from IndexedDB while the manifest hash
+    // matches; decode resolves null for a missing file (nothing is stored then)
+    function load(file, kind, decode) {
+        const key = file + '|' + kind;
+        if (!memory.has(key)) {
+            memory.set(key, (async () => {
+                const m = await manifest();
+                const entry = m && m.files && m.files[file];
+                const db = entry ? await openDb() : null;
+                if (db) {
+                    const hit = await request(db, 'readonly', store => store.get(key));
+                    if (hit && hit.hash === entry.hash) return hit.value;
+                }
+                const value = await decode(BASE + file + (entry ? '?v=' + entry.hash : ''));
+                // put() copies the value right away; no need to wait for the write
+                if (db && value != null) request(db, 'readwrite', store => store.put({ key, file, hash: entry.hash, value }));
+                return value;
+            })().catch(err => {
+                memory.delete(key);
+                throw err;
+            }));
+        }
+        return memory.get(key);
+    }
+
+    // Row objects (all fields) -> table; a column is numeric when every non-empty value is a number
+    function toTable(rows, fields) {
+        const names = fields || (rows.length ? Object.keys(rows[0]) : []);
+        const columns = {};
+        names.forEach(name => {
+            let numeric = true;
+            for (let i = 0; i < rows.length && numeric; i++) {
+                const v = rows[i][name];
+                if (v != null && v !== '' && typeof v !== 'number') numeric = false;
+            }
+            if (numeric) {
+                const col = new Float64Array(rows.length);
+                rows.forEach((row, i) => { const v = row[name]; col[i] = v == null || v === '' ? NaN : v; });
+                columns[name] = col;
+            } else {
+                columns[name] = rows.map(row => (row[name] == null ? '' : String(row[name])));
+            }
+        });
+        return { length: rows.length, columns };
+    }
+
+    // CSV text -> table: trimmed cells, numeric columns typed once per column
+    function parseCsv(text) {
+        const lines = text.replace(/\r\n?/g, '\n').split('\n').filter(l => l.trim().length > 0);
+        if (!lines.length) return { length: 0, columns: {} };
+        const names = lines[0].split(',').map(h => h.trim());
+        const cells = names.map(() => new Array(lines.length - 1));
+        for (let i = 1; i < lines.length; i++) {
+            const values = lines[i].split(',');
+            for (let j = 0; j < names.length; j++) cells[j][i - 1] = (values[j] ?? '').trim();
+        }
+        const columns = {};
+        names.forEach((name, j) => {
+            const col = cells[j];
+            if (col.every(v => v === '' || NUMBER.test(v))) {
+                columns[name] = Float64Array.from(col, v => (v === '' ? NaN : Number(v)));
+            } else {
+                columns[name] = col;
+            }
+        });
+        return { length: lines.length - 1, columns };
+    }
+
+    // Table of data/<file>, or null when the file is missing
+    function table(file) {
+        return load(file, 'table', async url => {
+            const res = await fetch(url);
+            if (!res.ok) return null;
+            return parseCsv(await res.text());
+        });
+    }
+
+    // Table -> row objects (one array per table, reused by later calls)
+    function rows(tbl) {
+        if (!tbl) return null;
+        if (!rowCache.has(tbl)) {
+            const names = Object.keys(tbl.columns);
+            const out = new Array(tbl.length);
+            for (let i = 0; i < tbl.length; i++) {
+                const row = {};
+                for (const name of names) {
+                    const col = tbl.columns[name];
+                    const v = col[i];
+                    row[name] = ArrayBuffer.isView(col) ? (Number.isNaN(v) ? null : v) : v;
+                }
+                out[i] = row;
+            }
+            rowCache.set(tbl, out);
+        }
+        return rowCache.get(tbl);
+    }
+
+    // Row objects of data/<file>, or null when the file is missing
+    async function csvRows(file) {
+        return rows(await table(file));
+    }
+
+    return { manifest, load, table, rows, csvRows, toTable, parseCsv };
+})();
+
+if (typeof module !== 'undefined') module.exports = DataStore;
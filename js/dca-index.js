@@ -0,0 +1,229 @@
+// DCA schedule index written by the ETL (dca_index.py).
+//
+// data/dca-index/index.json lists the weekdays (MON..FRI), the monthly schedules
+// ('M-MON'..'M-FRI', first such weekday of the month) and every symbol with its
+// file, trading-day count n, week count K, the Monday of week 0 and the monthly
+// target counts m_s; a file is
+//   Int32[n]                 trading days (days since 1970-01-01), ascending
+//   Int32[K * 5]             weekly grid: row bought by the target on weekday w of week k, -1 = none
+//   Int32[m_s], Int32[m_s]   target days, then the row each one buys, per monthly schedule
+//   padding                  to the next multiple of 8 bytes
+//   Float64[n]               avg_daily_price (buy price), then Close, of each day
+//   Float64[(K + 1) * 5]     weekly shares-per-dollar prefix (row k = weeks 0 .. k - 1)
+//   Float64[m_s + 1]         shares-per-dollar prefix, per monthly schedule
+// A window's buys are the targets inside it, each at its nearest trading day
+// inside the window. Weekly totals for any range x amount are O(1) after the
+// trading-day lookup, for all five weekdays at once (queryWeekdays). When
+// index.json is missing every loader resolves to null so the pages fall back
+// to their day-by-day loops.
+const DcaIndex = (() => {
+    const BASE = '../data/dca-index/';
+    const DAY_MS = 86400000;
+    const JS_WEEKDAYS = ['SUN', 'MON', 'TUE', 'WED', 'THU', 'FRI', 'SAT'];
+    let indexPromise = null;
+    const cache = new Map();
+
+    function loadIndex() {
+        if (!indexPromise) {
+            indexPromise = fetch(BASE + 'index.json', { cache: 'no-cache' })
+                .then(res => (res.ok ? res.json() : null))
+                .catch(() => null);
+        }
+        return indexPromise;
+    }
+
+    function decode(index, entry, buffer) {
+        const n = entry.days;
+        const K = entry.weeks;
+        const W = index.weekdays.length;
+        const ints = n + K * W + 2 * entry.targets.reduce((a, m) => a + m, 0);
+        let intPos = (n + K * W) * 4;
+        let floatPos = Math.ceil((ints * 4) / 8) * 8;
+        const idx = {
+            symbol: entry.symbol,
+            n,
+            weeks: K,
+            weekdays: index.weekdays,
+            week0: toDay(entry.week0),
+            days: new Int32Array(buffer, 0, n),
+            weekRows: new Int32Array(buffer, n * 4, K * W),
+            price: new Float64Array(buffer, floatPos, n),
+            close: new Float64Array(buffer, floatPos + n * 8, n),
+            weekPrefix: new Float64Array(buffer, floatPos + 2 * n * 8, (K + 1) * W),
+            monthly: {}
+        };
+        floatPos += 2 * n * 8 + (K + 1) * W * 8;
+        index.monthly.forEach((key, s) => {
+            const m = entry.targets[s];
+            idx.monthly[key] = {
+                targets: new Int32Array(buffer, intPos, m),
+                rows: new Int32Array(buffer, intPos + m * 4, m),
+                perDollar: new Float64Array(buffer, floatPos, m + 1)
+            };
+            intPos += 2 * m * 4;
+            floatPos += (m + 1) * 8;
+        });
+        // each weekday's targets are one run of weeks [firstWeek, lastWeek]
+        idx.firstWeek = index.weekdays.map((_, w) => {
+            let k = 0;
+            while (k < K && idx.weekRows[k * W + w] < 0) k++;
+            return k;
+        });
+        idx.lastWeek = index.weekdays.map((_, w) => {
+            let k = K - 1;
+            while (k >= 0 && idx.weekRows[k * W + w] < 0) k--;
+            return k;
+        });
+        return idx;
+    }
+
+    // Decoded index for one symbol, or null when the symbol (or the index) is missing
+    function loadSymbol(symbol) {
+        if (!cache.has(symbol)) {
+            cache.set(symbol, (async () => {
+                const index = await loadIndex();
+                const entry = index && index.symbols.find(e => e.symbol === symbol);
+                if (!entry) return null;
+                const res = await fetch(BASE + entry.file);
+                if (!res.ok) throw new Error(`Failed to fetch DCA index ${entry.file}: ${res.status}`);
+                return decode(index, entry, await res.arrayBuffer());
+            })());
+        }
+        return cache.get(symbol);
+    }
+
+    // First position whose value is >= day (upper = false) or > day (upper = true)
+    function bound(values, day, upper) {
+        let lo = 0;
+        let hi = values.length;
+        while (lo < hi) {
+            const mid = (lo + hi) >>> 1;
+            if (values[mid] < day || (upper && values[mid] === day)) lo = mid + 1;
+            else hi = mid;
+        }
+        return lo;
+    }
+
+    function toDay(date) {
+        if (typeof date === 'number') return date;
+        const d = date instanceof Date ? date : new Date(date);
+        return Math.floor(d.getTime() / DAY_MS);
+    }
+
+    function dayToYMD(day) {
+        return new Date(day * DAY_MS).toISOString().slice(0, 10);
+    }
+
+    // 'W-MON' for a JS weekday (Date.getDay(): 1 = Monday) and cadence 'W' / 'M'
+    function scheduleKey(weekday, cadence = 'W') {
+        return `${cadence}-${JS_WEEKDAYS[weekday]}`;
+    }
+
+    // Target days, bought rows and shares-per-dollar prefix of one schedule, with
+    // row(j) / prefix(j) accessors so weekly columns need no copying
+    function scheduleView(idx, schedule) {
+        if (schedule.startsWith('M-')) {
+            const s = idx.monthly[schedule];
+            return { length: s.targets.length, target: j => s.targets[j], row: j => s.rows[j], prefix: j => s.perDollar[j] };
+        }
+        const W = idx.weekdays.length;
+        const w = idx.weekdays.indexOf(schedule.slice(2));
+        const k0 = idx.firstWeek[w];
+        return {
+            length: Math.max(0, idx.lastWeek[w] - k0 + 1),
+            target: j => idx.week0 + 7 * (k0 + j) + w,
+            row: j => idx.weekRows[(k0 + j) * W + w],
+            prefix: j => idx.weekPrefix[(k0 + j) * W + w]
+        };
+    }
+
+    // Targets [a, b) inside start..end and the window's trading rows [lo, hi]
+    function windowSpan(idx, view, first, last) {
+        const lo = bound(idx.days, first, false);
+        const hi = bound(idx.days, last, true) - 1;
+        let a;
+        let b;
+        if (view.length === 0) {
+            a = b = 0;
+        } else {
+            // targets ascend: binary search through the accessor
+            let l = 0, h = view.length;
+            while (l < h) { const mid = (l + h) >>> 1; if (view.target(mid) < first) l = mid + 1; else h = mid; }
+            a = l;
+            h = view.length;
+            while (l < h) { const mid = (l + h) >>> 1; if (view.target(mid) <= last) l = mid + 1; else h = mid; }
+            b = l;
+        }
+        if (hi < lo) b = a; // no trading day inside the window
+        return { a, b, lo, hi };
+    }
+
+    function summarize(idx, view, a, b, lo, hi, amount) {
+        if (b === a) return { buys: 0, shares: 0, invested: 0, value: 0, lastDate: null };
+        let perDollar = view.prefix(b) - view.prefix(a);
+        // only targets at the window's edges can have their nearest day outside it
+        for (let j = a; j < b && view.row(j) < lo; j++) perDollar += 1 / idx.price[lo] - 1 / idx.price[view.row(j)];
+        for (let j = b - 1; j >= a && view.row(j) > hi; j--) perDollar += 1 / idx.price[hi] - 1 / idx.price[view.row(j)];
+        const last = Math.min(Math.max(view.row(b - 1), lo), hi);
+        const shares = amount * perDollar;
+        return { buys: b - a, shares, invested: amount * (b - a), value: shares * idx.close[last], lastDate: dayToYMD(idx.days[last]) };
+    }
+
+    // { buys, shares, invested, value, lastDate } for `amount` per target
+    function query(idx, schedule, start, end, amount) {
+        if (schedule.startsWith('W-')) return queryWeekdays(idx, start, end, amount)[schedule.slice(2)];
+        const view = scheduleView(idx, schedule);
+        const { a, b, lo, hi } = windowSpan(idx, view, toDay(start), toDay(end));
+        return summarize(idx, view, a, b, lo, hi, amount);
+    }
+
+    // { MON: result, ..., FRI: result } for weekly buys of `amount`: the week span of
+    // the range is plain arithmetic, the same in every weekday column
+    function queryWeekdays(idx, start, end, amount) {
+        const first = toDay(start);
+        const last = toDay(end);
+        const lo = bound(idx.days, first, false);
+        const hi = bound(idx.days, last, true) - 1;
+        const out = {};
+        idx.weekdays.forEach((name, w) => {
+            const view = scheduleView(idx, 'W-' + name);
+            const k0 = idx.firstWeek[w];
+            const offset = idx.week0 + w;
+            // weeks whose target is inside start..end, relative to the column's first week
+            const a = Math.min(view.length, Math.max(0, Math.ceil((first - offset) / 7) - k0));
+            const b = hi < lo ? a : Math.max(a, Math.min(view.length, Math.floor((last - offset) / 7) - k0 + 1));
+            out[name] = summarize(idx, view, a, b, lo, hi, amount);
+        });
+        return out;
+    }
+
+    // One row per buy inside start..end with running totals:
+    // [{ target, date, price, close, shares, invested, cumulativeShares, cumulativeInvested, cumulativeValue }]
+    function purchases(idx, schedule, start, end, amount) {
+        const view = scheduleView(idx, schedule);
+        const { a, b, lo, hi } = windowSpan(idx, view, toDay(start), toDay(end));
+        const out = [];
+        let cumulativeShares = 0;
+        for (let j = a; j < b; j++) {
+            const row = Math.min(Math.max(view.row(j), lo), hi);
+            const shares = amount / idx.price[row];
+            cumulativeShares += shares;
+            out.push({
+                target: dayToYMD(view.target(j)),
+                date: dayToYMD(idx.days[row]),
+                price: idx.price[row],
+                close: idx.close[row],
+                shares,
+                invested: amount,
+                cumulativeShares,
+                cumulativeInvested: amount * (j - a + 1),
+                cumulativeValue: cumulativeShares * idx.close[row]
+            });
+        }
+        return out;
+    }
+
+    return { loadIndex, loadSymbol, scheduleKey, query, queryWeekdays, purchases, dayToYMD };
+})();
+
+if (typeof module !== 'undefined') module.exports = DcaIndex;
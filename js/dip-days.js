@@ -0,0 +1,123 @@
+// Compact buy-on-dip days written by the ETL (bod_engine.build_dip_days).
+//
+// data/bod_dip_days.csv holds one row per symbol and day with at least one fill:
+//   Date, Symbol, Previous_Close, Low, Close, Max_Level
+// A fill at level k implies fills at every shallower level, so the event rows of
+// all_buy_on_dip.csv (one per filled level) are expanded here, per symbol and only
+// when a page asks for them. The file is read through js/data-store.js (parsed once
+// per ETL build; pages/bod.html streams it in). When it is missing every loader
+// resolves to null so the page can fall back to all_buy_on_dip.csv.
+const DipDays = (() => {
+    const FILE = 'bod_dip_days.csv';
+    const WEEKDAYS = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'];
+    let daysPromise = null;
+    const eventCache = new Map();
+
+    // Python's round(v, places): the nearest decimal, exact ties to even (toFixed breaks
+    // ties upwards); positive values only
+    function pyRound(v, places) {
+        const exact = v.toFixed(100);
+        const cut = exact.indexOf('.') + places + 1;
+        if (/^50*$/.test(exact.slice(cut)) && Number(exact[cut - 1]) % 2 === 0) return Number(exact.slice(0, cut));
+        return Number(v.toFixed(places));
+    }
+
+    // pandas Series.round(places): numpy's rint(v * 10^places) / 10^places, halves to even
+    function npRound(v, places) {
+        const f = 10 ** places;
+        const scaled = v * f;
+        let r = Math.round(scaled);
+        if (r - scaled === 0.5 && r % 2 !== 0) r -= 1;
+        return r / f;
+    }
+
+    // Map symbol -> [{ date, prevClose, low, close, maxLevel }] in file (date) order
+    function fromTable(table) {
+        const { Date: date, Symbol: symbol, Previous_Close: prevClose, Low: low, Close: close, Max_Level: maxLevel } = table.columns;
+        const bySymbol = new Map();
+        for (let i = 0; i < table.length; i++) {
+            if (!bySymbol.has(symbol[i])) bySymbol.set(symbol[i], []);
+            bySymbol.get(symbol[i]).push({
+                date: date[i].slice(0, 10),
+                prevClose: prevClose[i],
+                low: low[i],
+                close: close[i],
+                maxLevel: maxLevel[i]
+            });
+        }
+        return bySymbol;
+    }
+
+    // decode(url) (optional) replaces the plain fetch + parse on a cache miss, e.g. the
+    // chunked PapaParse stream of pages/bod.html; it resolves the same table (or null)
+    function load(decode) {
+        if (!daysPromise) {
+            daysPromise = (decode ? DataStore.load(FILE, 'table', decode) : DataStore.table(FILE))
+                .then(table => (table ? fromTable(table) : null))
+                .catch(() => null);
+        }
+        return daysPromise;
+    }
+
+    async function symbols() {
+        const days = await load();
+        return days ? Array.from(days.keys()).sort((a, b) => a.localeCompare(b)) : null;
+    }
+
+    // One row per filled level with the values all_buy_on_dip.csv holds (1 share per fill).
+    // The ETL rounds the limit price to 6 decimals (bod_engine) and writes prices and
+    // Executed_Level with 2 (round_history_bod); the same steps here keep the pages'
+    // totals equal to the CSV's and to summary-cube.json.
+    function expand(symbol, days, step) {
+        const rows = [];
+        days.forEach(d => {
+            const weekday = WEEKDAYS[new Date(d.date + 'T00:00:00Z').getUTCDay()];
+            const close = npRound(d.close, 2);
+            const prevClose = npRound(d.prevClose, 2);
+            for (let level = 1; level <= d.maxLevel; level += step) {
+                const limit = d.prevClose * (1 - level / 100);
+                const price = npRound(pyRound(limit, 6), 2);
+                rows.push({
+                    Date_add: d.date,
+                    Weekday: weekday,
+                    Symbol: symbol,
+                    Strategy: 'Buy_on_Dip',
+                    Buy_Level: level + '%',
+                    Executed_Level: npRound(pyRound((1 - limit / d.prevClose) * 100, 2), 2),
+                    Buy_Price: price,
+                    Executed_Price: price,
+                    'Shares Purchased': 1,
+                    'Dollars Invested': price,
+                    Low: d.low,
+                    Close: close,
+                    Previous_Close: prevClose
+                });
+            }
+        });
+        return rows;
+    }
+
+    // Event rows for one symbol ([] when it never dipped), or null without the file
+    async function events(symbol, step = 1) {
+        const days = await load();
+        if (!days) return null;
+        const key = symbol + '|' + step;
+        if (!eventCache.has(key)) eventCache.set(key, expand(symbol, days.get(symbol) || [], step));
+        return eventCache.get(key);
+    }
+
+    // Event rows for every symbol, grouped by symbol
+    async function allEvents(step = 1) {
+        const list = await symbols();
+        if (!list) return null;
+        const out = [];
+        for (const symbol of list) {
+            (await events(symbol, step)).forEach(row => out.push(row));
+        }
+        return out;
+    }
+
+    return { load, symbols, events, allEvents };
+})();
+
+if (typeof module !== 'undefined') module.exports = DipDays;
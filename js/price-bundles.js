@@ -0,0 +1,103 @@
+// Per-symbol binary price bundles written by the ETL (price_bundles.py).
+//
+// data/bundles/index.json lists every symbol with its bundle file; a bundle is
+//   Int32[rows]        trading days (days since 1970-01-01), ascending
+//   padding            to the next multiple of 8 bytes
+//   Float64[rows] x N  one block per index.columns entry (NaN = missing)
+// Pages fetch only the symbols they show. When index.json is missing every
+// loader resolves to null so the page can fall back to history_tickers.csv.
+const PriceBundles = (() => {
+    const BASE = '../data/bundles/';
+    const DAY_MS = 86400000;
+    const WEEKDAYS = ['Sunday', 'Monday', 'Tuesday', 'Wednesday', 'Thursday', 'Friday', 'Saturday'];
+    let indexPromise = null;
+    const bundleCache = new Map();
+    const rowCache = new Map();
+
+    // index.json is small and changes every ETL run: always revalidate it
+    function loadIndex() {
+        if (!indexPromise) {
+            indexPromise = fetch(BASE + 'index.json', { cache: 'no-cache' })
+                .then(res => (res.ok ? res.json() : null))
+                .catch(() => null);
+        }
+        return indexPromise;
+    }
+
+    async function symbols() {
+        const index = await loadIndex();
+        return index ? index.symbols.map(e => e.symbol) : null;
+    }
+
+    // Latest trading day over all symbols (YYYY-MM-DD)
+    async function lastDate() {
+        const index = await loadIndex();
+        if (!index || !index.symbols.length) return null;
+        return index.symbols.reduce((m, e) => (e.last_date > m ? e.last_date : m), index.symbols[0].last_date);
+    }
+
+    function decode(entry, columnNames, buffer) {
+        const rows = entry.rows;
+        const days = new Int32Array(buffer, 0, rows);
+        const start = Math.ceil((rows * 4) / 8) * 8;
+        const columns = {};
+        columnNames.forEach((name, i) => {
+            columns[name] = new Float64Array(buffer, start + i * rows * 8, rows);
+        });
+        return { symbol: entry.symbol, rows, days, columns };
+    }
+
+    // { symbol, rows, days: Int32Array, columns: { Close: Float64Array, ... } } or null
+    function loadSymbol(symbol) {
+        if (!bundleCache.has(symbol)) {
+            bundleCache.set(symbol, (async () => {
+                const index = await loadIndex();
+                const entry = index && index.symbols.find(e => e.symbol === symbol);
+                if (!entry) return null;
+                // file names carry a content hash, so the HTTP cache can keep them
+                const res = await fetch(BASE + entry.file);
+                if (!res.ok) throw new Error(`Failed to fetch bundle ${entry.file}: ${res.status}`);
+                return decode(entry, index.columns, await res.arrayBuffer());
+            })());
+        }
+        return bundleCache.get(symbol);
+    }
+
+    function dayToYMD(day) {
+        return new Date(day * DAY_MS).toISOString().slice(0, 10);
+    }
+
+    // Row objects shaped like history_tickers.csv rows (numbers, null for missing)
+    function toRows(bundle) {
+        const names = Object.keys(bundle.columns);
+        const rows = new Array(bundle.rows);
+        for (let i = 0; i < bundle.rows; i++) {
+            const day = bundle.days[i];
+            const row = {
+                Date_add: dayToYMD(day),
+                Weekday: WEEKDAYS[(day + 4) % 7], // 1970-01-01 was a Thursday
+                Symbol: bundle.symbol
+            };
+            for (const name of names) {
+                const v = bundle.columns[name][i];
+                row[name] = Number.isNaN(v) ? null : v;
+            }
+            rows[i] = row;
+        }
+        return rows;
+    }
+
+    // Rows for the given symbols (all symbols when omitted), or null without bundles
+    async function loadRows(symbolList) {
+        const wanted = symbolList || (await symbols());
+        if (!wanted) return null;
+        if (!(await loadIndex())) return null;
+        const bundles = await Promise.all(wanted.map(loadSymbol));
+        return bundles.filter(Boolean).flatMap(bundle => {
+            if (!rowCache.has(bundle.symbol)) rowCache.set(bundle.symbol, toRows(bundle));
+            return rowCache.get(bundle.symbol);
+        });
+    }
+
+    return { loadIndex, symbols, lastDate, loadSymbol, toRows, loadRows, dayToYMD };
+})();
@@ -0,0 +1,81 @@
+// Page side of js/strategy-worker.js: one shared worker per page, promise per run.
+//
+// run(kind, params, onProgress) resolves the unpacked { trades, metrics, csv }.
+// Starting a run supersedes the unfinished one of the same kind: the worker is told
+// to cancel it and its promise rejects with { cancelled: true }, so a page only
+// renders the latest inputs. When workers are unavailable (file:// pages, old
+// browsers) or the worker script fails, available() turns false and runs reject
+// with { workerFailed: true }; the pages then run StrategySim on the main thread.
+const StrategyWorker = (() => {
+    const SCRIPT = '../js/strategy-worker.js';
+    let worker = null;
+    let failed = typeof Worker === 'undefined';
+    let nextId = 1;
+    const pending = new Map();  // id -> { resolve, reject, onProgress }
+    const latest = new Map();   // kind -> id of its newest run
+
+    function failAll(reason) {
+        failed = true;
+        if (worker) worker.terminate();
+        worker = null;
+        pending.forEach(p => p.reject({ workerFailed: true, reason }));
+        pending.clear();
+    }
+
+    function onMessage(event) {
+        const msg = event.data;
+        const p = pending.get(msg.id);
+        if (!p) return;
+        if (msg.type === 'progress') {
+            if (p.onProgress) p.onProgress(msg);
+            return;
+        }
+        pending.delete(msg.id);
+        if (msg.type === 'result') p.resolve(StrategySim.unpack(msg.result));
+        else if (msg.type === 'cancelled') p.reject({ cancelled: true });
+        else p.reject(new Error(msg.message));
+    }
+
+    function ensure() {
+        if (!worker && !failed) {
+            try {
+                worker = new Worker(SCRIPT);
+                worker.onmessage = onMessage;
+                worker.onerror = (event) => {
+                    if (event && event.preventDefault) event.preventDefault();
+                    failAll(event && event.message);
+                };
+            } catch (err) {
+                failAll(err && err.message);
+            }
+        }
+        return worker;
+    }
+
+    function available() {
+        return !!ensure();
+    }
+
+    function cancel(id) {
+        const p = pending.get(id);
+        if (!p) return;
+        pending.delete(id);
+        if (worker) worker.postMessage({ type: 'cancel', id });
+        p.reject({ cancelled: true });
+    }
+
+    function run(kind, params, onProgress) {
+        if (!ensure()) return Promise.reject({ workerFailed: true });
+        if (latest.has(kind)) cancel(latest.get(kind));
+        const id = nextId++;
+        latest.set(kind, id);
+        return new Promise((resolve, reject) => {
+            pending.set(id, { resolve, reject, onProgress });
+            worker.postMessage({ type: 'run', id, kind, params });
+        });
+    }
+
+    return { available, run, cancel };
+})();
+
+if (typeof module !== 'undefined') module.exports = StrategyWorker;
@@ -0,0 +1,384 @@
+// Buy-on-dip and DCA simulations shared by the strategy pages and their worker.
+//
+// pages/bod-strat.html and pages/dca-strat.html used to run these loops, the
+// metrics and the CSV export inline on the main thread; js/strategy-worker.js now
+// runs them off the page (js/strategy-client.js), and the pages call them directly
+// only when workers are unavailable. Both simulators take one ticker's rows
+// (history_tickers.csv shape), filter them to start..end by epoch day (dates
+// compare as UTC midnight, like TradingDays) and await tick(done, total, stage)
+// every CHUNK steps so the caller can report progress and cancel (tick throws).
+// pack / unpack turn a result into columnar Float64Arrays for a transferable
+// postMessage and back into the row objects the pages render.
+// Needs TradingDays and WeeklyMetrics; BodIndex / DcaIndex only for their fast paths.
+const StrategySim = (() => {
+    const CHUNK = 512;
+    const toDay = TradingDays.toEpochDay;
+    const noTick = () => {};
+
+    function round2(v) {
+        return Math.round((v + Number.EPSILON) * 100) / 100;
+    }
+
+    // Rows of one ticker inside start..end, date-sorted
+    function inRange(rows, start, end) {
+        const first = toDay(start);
+        const last = toDay(end);
+        const keyed = [];
+        rows.forEach(row => {
+            const day = toDay(row.Date_add);
+            if (day >= first && day <= last) keyed.push([day, row]);
+        });
+        keyed.sort((a, b) => a[0] - b[0]);
+        return keyed.map(k => k[1]);
+    }
+
+    function bodRow(date, row, close, previousClose, dayInvested, dayShares, totals, tradesExecuted) {
+        const portfolioValue = round2(totals.shares * close);
+        return {
+            date,
+            open: Number(row.Open || 0),
+            high: Number(row.High || 0),
+            low: Number(row.Low || 0),
+            close,
+            previousClose,
+            dayInvested,
+            dayShares,
+            totalShares: totals.shares,
+            totalInvested: totals.invested,
+            portfolioValue,
+            gain: round2(portfolioValue - totals.invested),
+            gainPercent: totals.invested > 0 ? round2((portfolioValue - totals.invested) / totals.invested * 100) : 0,
+            tradesExecuted,
+            totalTrades: totals.trades
+        };
+    }
+
+    // Buy-on-dip limit orders: opts = { start, end, declineSettings, bodIndex?, events? }.
+    // Uses the prefix-sum index when it has event days in the window, else precomputed
+    // event rows (DipDays / all_buy_on_dip.csv), else the day-by-day walk.
+    // Resolves { trades, metrics } (trades = [] and noData set when the window is empty).
+    async function bod(rows, opts, tick = noTick) {
+        const { start, end, declineSettings, bodIndex = null, events = null } = opts;
+        const tickerData = inRange(rows, start, end);
+        const results = [];
+        const totals = { shares: 0, invested: 0, trades: 0 };
+
+        const indexedDays = bodIndex ? BodIndex.eventDays(bodIndex, start, end, declineSettings) : [];
+        const eventRows = indexedDays.length || !events ? [] : inRange(events, start, end);
+
+        if (indexedDays.length > 0) {
+            const rowsByDate = new Map(tickerData.map(row => [row.Date_add, row]));
+            for (let i = 0; i < indexedDays.length; i++) {
+                if (i % CHUNK === 0) await tick(i, indexedDays.length, 'Simulating');
+                const day = indexedDays[i];
+                const tradesExecuted = [];
+                let dayInvested = 0;
+                let dayShares = 0;
+                day.fills.forEach(fill => {
+                    const shares = Number(declineSettings[fill.level]) || 0;
+                    for (let c = 0; c < fill.count; c++) {
+                        const cost = round2(shares * fill.price);
+                        totals.shares += shares;
+                        totals.invested = round2(totals.invested + cost);
+                        dayInvested = round2(dayInvested + cost);
+                        dayShares += shares;
+                        totals.trades++;
+                        tradesExecuted.push({ declinePercent: fill.level, purchasePrice: fill.price, shares, cost, actualDecline: fill.level });
+                    }
+                });
+                results.push(bodRow(day.date, rowsByDate.get(day.date) || {}, day.close, day.previousClose, dayInvested, dayShares, totals, tradesExecuted));
+            }
+        } else if (eventRows.length > 0) {
+            // events carry their executed price and decline level; apply the user's settings
+            for (let i = 0; i < eventRows.length; i++) {
+                if (i % CHUNK === 0) await tick(i, eventRows.length, 'Simulating');
+                const ev = eventRows[i];
+                const declineLevel = Number(ev.Executed_Level || ev.Buy_Level || ev.Level || ev.Decline_Level || ev.DeclinePercent || ev['Executed Level'] || ev['Buy Level'] || '') || 0;
+                const shares = Number(declineSettings[declineLevel]) || 0;
+                if (shares <= 0) continue;
+
+                const purchasePrice = Number(ev.Executed_Price || ev.Buy_Price || ev.purchasePrice || ev.Purchase_Price || ev.BuyPrice || ev['Executed Price']) || 0;
+                const cost = round2(shares * purchasePrice);
+                totals.shares += shares;
+                totals.invested = round2(totals.invested + cost);
+                totals.trades++;
+
+                const close = Number(ev.Close || ev.Close_Price || ev.ClosePrice || ev.close || ev.LastClose || 0);
+                const previousClose = Number(ev.Previous_Close || ev.PreviousClose || ev.Previous || 0);
+                results.push(bodRow(ev.Date_add, ev, close, previousClose, cost, shares, totals,
+                    [{ declinePercent: declineLevel, purchasePrice, shares, cost, actualDecline: declineLevel }]));
+            }
+        } else {
+            if (tickerData.length === 0) return { trades: [], metrics: {}, noData: true };
+            const levels = Object.entries(declineSettings).map(([pct, shares]) => [Number(pct), Number(shares) || 0]);
+            for (let i = 1; i < tickerData.length; i++) {
+                if (i % CHUNK === 0) await tick(i, tickerData.length, 'Simulating');
+                const currentDay = tickerData[i];
+                const previousClose = Number(tickerData[i - 1].Close);
+                const currentLow = Number(currentDay.Low);
+                const currentClose = Number(currentDay.Close);
+
+                let dayInvested = 0;
+                let dayShares = 0;
+                const tradesExecuted = [];
+                levels.forEach(([declinePercent, shares]) => {
+                    const limitOrderPrice = previousClose * (1 - declinePercent / 100);
+                    // limit orders fill at the limit price once the day's low reaches it
+                    if (currentLow <= limitOrderPrice) {
+                        const purchasePrice = round2(limitOrderPrice);
+                        const cost = round2(shares * purchasePrice);
+                        dayInvested = round2(dayInvested + cost);
+                        dayShares += shares;
+                        totals.trades++;
+                        tradesExecuted.push({
+                            declinePercent,
+                            targetPrice: limitOrderPrice,
+                            purchasePrice,
+                            shares,
+                            cost,
+                            actualDecline: round2(((previousClose - purchasePrice) / previousClose) * 100)
+                        });
+                    }
+                });
+
+                totals.shares = round2(totals.shares + dayShares);
+                totals.invested = round2(totals.invested + dayInvested);
+                results.push(bodRow(currentDay.Date_add, currentDay, currentClose, previousClose, dayInvested, dayShares, totals, tradesExecuted));
+            }
+        }
+
+        await tick(1, 1, 'Metrics');
+        return { trades: results, metrics: bodMetrics(tickerData, results) };
+    }
+
+    // Weekly DCA on a JS weekday (0 = Sunday): opts = { start, end, amount, targetDay, dcaIndex? }.
+    // Each week's target buys at its nearest trading day inside the window, at
+    // avg_daily_price. Resolves { trades, metrics } (trades = [] and noData set when
+    // the window is empty).
+    async function dca(rows, opts, tick = noTick) {
+        const { start, end, amount, targetDay, dcaIndex = null } = opts;
+        const tickerData = inRange(rows, start, end);
+        if (tickerData.length === 0) return { trades: [], metrics: {}, noData: true };
+        const results = [];
+
+        if (dcaIndex) {
+            // buys precomputed by the ETL (data/dca-index/): read the window instead of walking the weeks
+            const byDate = new Map(tickerData.map(row => [row.Date_add, row]));
+            const buys = DcaIndex.purchases(dcaIndex, DcaIndex.scheduleKey(targetDay), start, end, amount);
+            for (let i = 0; i < buys.length; i++) {
+                if (i % CHUNK === 0) await tick(i, buys.length, 'Simulating');
+                const buy = buys[i];
+                const day = byDate.get(buy.date) || {};
+                const portfolioValue = buy.cumulativeValue;
+                results.push({
+                    date: buy.target,
+                    actualDate: buy.date,
+                    open: parseFloat(day.Open),
+                    high: parseFloat(day.High),
+                    low: parseFloat(day.Low),
+                    close: buy.close,
+                    purchasePrice: buy.price,
+                    invested: amount,
+                    shares: buy.shares,
+                    totalShares: buy.cumulativeShares,
+                    totalInvested: buy.cumulativeInvested,
+                    portfolioValue,
+                    gain: portfolioValue - buy.cumulativeInvested,
+                    gainPercent: (portfolioValue - buy.cumulativeInvested) / buy.cumulativeInvested * 100
+                });
+            }
+        } else {
+            const first = Math.floor(toDay(start));
+            const last = toDay(end);
+            // 1970-01-01 (day 0) was a Thursday (JS weekday 4)
+            const firstTarget = first + ((targetDay - (first + 4)) % 7 + 7) % 7;
+            const weeks = Math.max(0, Math.floor((last - firstTarget) / 7) + 1);
+            const index = TradingDays.indexFor(tickerData);
+            let totalShares = 0;
+            let totalInvested = 0;
+            for (let w = 0; w < weeks; w++) {
+                if (w % CHUNK === 0) await tick(w, weeks, 'Simulating');
+                const dateStr = TradingDays.fromEpochDay(firstTarget + 7 * w);
+                const closestData = index.nearest(dateStr);
+                if (!closestData) continue;
+                const purchasePrice = parseFloat(closestData.avg_daily_price);
+                const closingPrice = parseFloat(closestData.Close);
+                const shares = amount / purchasePrice;
+                totalShares += shares;
+                totalInvested += amount;
+                const portfolioValue = totalShares * closingPrice;
+                results.push({
+                    date: dateStr,
+                    actualDate: closestData.Date_add,
+                    open: parseFloat(closestData.Open),
+                    high: parseFloat(closestData.High),
+                    low: parseFloat(closestData.Low),
+                    close: closingPrice,
+                    purchasePrice,
+                    invested: amount,
+                    shares,
+                    totalShares,
+                    totalInvested,
+                    portfolioValue,
+                    gain: portfolioValue - totalInvested,
+                    gainPercent: (portfolioValue - totalInvested) / totalInvested * 100
+                });
+            }
+        }
+
+        await tick(1, 1, 'Metrics');
+        // up/down days, Monday→Friday and week-over-week success (js/weekly-metrics.js)
+        return { trades: results, metrics: WeeklyMetrics.compute(tickerData) };
+    }
+
+    // Weekly metrics plus a one-week-later check of every executed buy
+    function bodMetrics(tickerData, tradeResults) {
+        const weekly = WeeklyMetrics.compute(tickerData);
+        const index = TradingDays.indexFor(tickerData);
+        let success = 0;
+        let total = 0;
+        tradeResults.forEach(trade => {
+            if (!trade.tradesExecuted || trade.tradesExecuted.length === 0) return;
+            const laterData = index.nearest(Math.floor(toDay(trade.date)) + 7);
+            if (!laterData) return;
+            const laterClose = parseFloat(laterData.Close);
+            trade.tradesExecuted.forEach(executed => {
+                total++;
+                if (laterClose > executed.purchasePrice) success++;
+            });
+        });
+        return {
+            upDays: weekly.upDays,
+            downDays: weekly.downDays,
+            mondayFriday: weekly.mondayFriday,
+            tradeWeek: { success, total, percent: total > 0 ? (success / total * 100).toFixed(1) : 0 }
+        };
+    }
+
+    function bodCsv(trades) {
+        const headers = [
+            'Date', 'Open', 'High', 'Low', 'Close', 'Previous Close',
+            'Day Invested', 'Day Shares', 'Total Shares', 'Total Invested',
+            'Portfolio Value', 'Gain', 'Gain %', 'Trades Executed'
+        ];
+        const lines = [headers.join(',')];
+        trades.forEach(row => {
+            const tradesDesc = row.tradesExecuted ? row.tradesExecuted.map(t =>
+                `${t.shares}@$${t.purchasePrice.toFixed(2)}(-${t.actualDecline.toFixed(1)}%)`
+            ).join(';') : '';
+            lines.push([
+                row.date,
+                row.open.toFixed(2),
+                row.high.toFixed(2),
+                row.low.toFixed(2),
+                row.close.toFixed(2),
+                row.previousClose.toFixed(2),
+                row.dayInvested.toFixed(2),
+                row.dayShares.toFixed(6),
+                row.totalShares.toFixed(6),
+                row.totalInvested.toFixed(2),
+                row.portfolioValue.toFixed(2),
+                row.gain.toFixed(2),
+                row.gainPercent.toFixed(2),
+                `"${tradesDesc}"`
+            ].join(','));
+        });
+        return lines.join('\n') + '\n';
+    }
+
+    function dcaCsv(trades) {
+        const headers = [
+            'Date', 'Actual Date', 'Open', 'High', 'Low', 'Close', 'Purchase Price',
+            'Invested', 'Shares', 'Total Shares', 'Total Invested',
+            'Portfolio Value', 'Gain', 'Gain %'
+        ];
+        const lines = [headers.join(',')];
+        trades.forEach(row => {
+            lines.push([
+                row.date,
+                row.actualDate,
+                row.open.toFixed(2),
+                row.high.toFixed(2),
+                row.low.toFixed(2),
+                row.close.toFixed(2),
+                row.purchasePrice.toFixed(2),
+                row.invested.toFixed(2),
+                row.shares.toFixed(6),
+                row.totalShares.toFixed(6),
+                row.totalInvested.toFixed(2),
+                row.portfolioValue.toFixed(2),
+                row.gain.toFixed(2),
+                row.gainPercent.toFixed(2)
+            ].join(','));
+        });
+        return lines.join('\n') + '\n';
+    }
+
+    // Columns of row objects: dates (strings) as epoch days, numbers as-is, NaN = missing
+    function toColumns(rows, keys) {
+        const cols = {};
+        keys.forEach(([key, isDate]) => {
+            const col = new Float64Array(rows.length);
+            rows.forEach((row, i) => {
+                const v = row[key];
+                col[i] = v == null || v === '' ? NaN : isDate ? toDay(v) : Number(v);
+            });
+            cols[key] = col;
+        });
+        return cols;
+    }
+
+    function keysOf(row, skip) {
+        return row ? Object.keys(row).filter(k => k !== skip).map(k => [k, typeof row[k] === 'string']) : [];
+    }
+
+    // { trades, metrics, ... } -> [packed, transfer list]: trade rows as columns, their
+    // tradesExecuted flattened behind an offsets column
+    function pack(result) {
+        const trades = result.trades || [];
+        const nested = trades.flatMap(row => row.tradesExecuted || []);
+        const nestedKeys = [...new Set(nested.flatMap(Object.keys))].map(k => [k, false]);
+        const offsets = new Int32Array(trades.length + 1);
+        trades.forEach((row, i) => { offsets[i + 1] = offsets[i] + (row.tradesExecuted ? row.tradesExecuted.length : 0); });
+        const packed = {
+            ...result,
+            trades: undefined,
+            length: trades.length,
+            keys: keysOf(trades[0], 'tradesExecuted'),
+            nestedKeys,
+            hasNested: trades.length > 0 && 'tradesExecuted' in trades[0],
+            offsets
+        };
+        packed.columns = toColumns(trades, packed.keys);
+        packed.nested = toColumns(nested, nestedKeys);
+        const transfer = [offsets.buffer, ...Object.values(packed.columns).map(c => c.buffer), ...Object.values(packed.nested).map(c => c.buffer)];
+        return [packed, transfer];
+    }
+
+    function unpack(packed) {
+        const trades = new Array(packed.length);
+        for (let i = 0; i < packed.length; i++) {
+            const row = {};
+            packed.keys.forEach(([key, isDate]) => {
+                const v = packed.columns[key][i];
+                row[key] = isDate ? (Number.isNaN(v) ? '' : TradingDays.fromEpochDay(v)) : v;
+            });
+            if (packed.hasNested) {
+                row.tradesExecuted = [];
+                for (let j = packed.offsets[i]; j < packed.offsets[i + 1]; j++) {
+                    const t = {};
+                    // a fill without a field (targetPrice off the day-by-day path) stays without it
+                    packed.nestedKeys.forEach(([key]) => { if (!Number.isNaN(packed.nested[key][j])) t[key] = packed.nested[key][j]; });
+                    row.tradesExecuted.push(t);
+                }
+            }
+            trades[i] = row;
+        }
+        const { columns, nested, keys, nestedKeys, hasNested, offsets, length, ...rest } = packed;
+        return { ...rest, trades };
+    }
+
+    return { CHUNK, round2, inRange, bod, dca, bodMetrics, bodCsv, dcaCsv, pack, unpack };
+})();
+
+if (typeof module !== 'undefined') module.exports = StrategySim;
@@ -0,0 +1,78 @@
+// Web Worker behind js/strategy-client.js: loads a ticker's prices and runs the
+// buy-on-dip / DCA simulation, metrics and CSV export off the page's main thread.
+//
+// Messages in:  { type: 'run', id, kind: 'bod' | 'dca', params }   params as StrategySim opts
+//                                                                  plus ticker, dates 'YYYY-MM-DD'
+//               { type: 'cancel', id }
+// Messages out: { type: 'progress', id, done, total, stage }
+//               { type: 'result', id, result }   StrategySim.pack'd, columns transferred
+//               { type: 'cancelled', id } | { type: 'error', id, message }
+// The simulation yields to the event loop between chunks (StrategySim.CHUNK steps),
+// so a cancel from a newer run lands mid-simulation and stops it at the next chunk.
+importScripts('price-bundles.js', 'data-store.js', 'trading-days.js', 'weekly-metrics.js', 'bod-index.js', 'dip-days.js', 'dca-index.js', 'strategy-sim.js');
+
+const cancelled = new Set();
+let csvRows = null; // history_tickers.csv grouped by symbol, without price bundles
+
+class Cancelled extends Error {}
+
+// history_tickers.csv rows (js/data-store.js: parsed once per ETL build) by symbol
+async function loadCsvRows() {
+    const rows = await DataStore.csvRows('history_tickers.csv');
+    if (!rows) throw new Error('Failed to fetch ../data/history_tickers.csv');
+    const bySymbol = new Map();
+    rows.forEach(row => {
+        if (!bySymbol.has(row.Symbol)) bySymbol.set(row.Symbol, []);
+        bySymbol.get(row.Symbol).push(row);
+    });
+    return bySymbol;
+}
+
+// One ticker's rows from its price bundle, else from the parsed CSV (kept for later runs)
+async function tickerRows(ticker) {
+    const rows = await PriceBundles.loadRows([ticker]);
+    if (rows) return rows;
+    if (!csvRows) csvRows = loadCsvRows();
+    return (await csvRows).get(ticker) || [];
+}
+
+async function run(id, kind, params) {
+    const tick = async (done, total, stage) => {
+        self.postMessage({ type: 'progress', id, done, total, stage });
+        await new Promise(resolve => setTimeout(resolve, 0)); // let a pending cancel in
+        if (cancelled.has(id)) throw new Cancelled();
+    };
+    await tick(0, 1, 'Loading prices');
+    const rows = await tickerRows(params.ticker);
+    let result;
+    if (kind === 'bod') {
+        const bodIndex = await BodIndex.loadSymbol(params.ticker).catch(() => null);
+        const events = bodIndex ? null : await DipDays.events(params.ticker).catch(() => null);
+        result = await StrategySim.bod(rows, { ...params, bodIndex, events }, tick);
+        result.csv = StrategySim.bodCsv(result.trades);
+    } else {
+        const dcaIndex = await DcaIndex.loadSymbol(params.ticker).catch(() => null);
+        result = await StrategySim.dca(rows, { ...params, dcaIndex }, tick);
+        result.csv = StrategySim.dcaCsv(result.trades);
+    }
+    await tick(1, 1, 'Sending');
+    const [packed, transfer] = StrategySim.pack(result);
+    self.postMessage({ type: 'result', id, result: packed }, transfer);
+}
+
+self.onmessage = async (event) => {
+    const msg = event.data;
+    if (msg.type === 'cancel') {
+        cancelled.add(msg.id);
+        return;
+    }
+    if (msg.type !== 'run') return;
+    try {
+        await run(msg.id, msg.kind, msg.params);
+    } catch (err) {
+        if (err instanceof Cancelled) self.postMessage({ type: 'cancelled', id: msg.id });
+        else self.postMessage({ type: 'error', id: msg.id, message: String(err && err.message || err) });
+    } finally {
+        cancelled.delete(msg.id);
+    }
+};
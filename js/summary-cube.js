@@ -0,0 +1,67 @@
+// Precomputed period summaries written by the ETL (summary_cube.py).
+//
+// data/summary-cube.json holds one row per symbol x strategy (BOD / DCA) x period
+// (YTD..20Y) x dip level with events, shares, invested, value and gain %. The
+// overview grids and ALL metrics read these rows instead of simulating every
+// ticker on each period click; full simulations only run when a ticker is
+// opened. When the file is missing every loader resolves to null and the pages
+// fall back to simulating in the browser.
+const SummaryCube = (() => {
+    const URL = '../data/summary-cube.json';
+    let cubePromise = null;
+
+    // rows keyed 'symbol|strategy|period|level' for direct lookups
+    function prepare(cube) {
+        const byKey = new Map();
+        const symbols = new Set();
+        cube.rows.forEach(values => {
+            const row = {};
+            cube.columns.forEach((name, i) => row[name] = values[i]);
+            byKey.set([row.symbol, row.strategy, row.period, row.level ?? ''].join('|'), row);
+            if (row.symbol !== 'ALL') symbols.add(row.symbol);
+        });
+        return {
+            endDate: cube.end_date,
+            periods: cube.periods,
+            symbols: Array.from(symbols).sort((a, b) => a.localeCompare(b)),
+            rows: Array.from(byKey.values()),
+            byKey
+        };
+    }
+
+    // the cube changes every ETL run: always revalidate it
+    function load() {
+        if (!cubePromise) {
+            cubePromise = fetch(URL, { cache: 'no-cache' })
+                .then(res => (res.ok ? res.json() : null))
+                .then(cube => (cube && Array.isArray(cube.rows) ? prepare(cube) : null))
+                .catch(() => null);
+        }
+        return cubePromise;
+    }
+
+    // One cell ({ symbol, events, shares, invested, value, gain_pct, ... }) or null.
+    // BOD levels are 1, 2, ... or 'ALL'; DCA rows have no level.
+    async function cell(symbol, strategy, period, level = strategy === 'BOD' ? 'ALL' : null) {
+        const cube = await load();
+        return cube ? cube.byKey.get([symbol, strategy, period, level ?? ''].join('|')) || null : null;
+    }
+
+    // Per-symbol cells for one strategy / period / level (the ALL aggregate excluded)
+    async function cells(strategy, period, level = strategy === 'BOD' ? 'ALL' : null) {
+        const cube = await load();
+        if (!cube) return null;
+        return cube.symbols
+            .map(symbol => cube.byKey.get([symbol, strategy, period, level ?? ''].join('|')))
+            .filter(Boolean);
+    }
+
+    async function symbols() {
+        const cube = await load();
+        return cube ? cube.symbols : null;
+    }
+
+    return { load, cell, cells, symbols };
+})();
+
+if (typeof module !== 'undefined') module.exports = SummaryCube;
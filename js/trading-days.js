@@ -0,0 +1,109 @@
+// Sorted trading-day index for a ticker's rows (epoch-day numbers, binary search).
+//
+// Replaces the per-page findClosestTradingDay loops, which built a Date for every
+// row on every lookup (O(weeks x days) for a weekly DCA run). The index is built
+// once per rows array (cached in a WeakMap) and answers nearest / next / previous
+// trading day in O(log n). Semantics match the old linear scan: dates compare as
+// UTC midnight (new Date('YYYY-MM-DD')), and on a tie the earlier row wins.
+const TradingDays = (() => {
+    const DAY_MS = 86400000;
+    const YMD = /^(\d{4})-(\d{2})-(\d{2})$/;
+    const indexCache = new WeakMap();
+
+    // 'YYYY-MM-DD' / Date / timestamp -> days since 1970-01-01 (NaN when unparseable)
+    function toEpochDay(value) {
+        if (typeof value === 'number') return value;
+        if (value instanceof Date) return value.getTime() / DAY_MS;
+        const s = String(value ?? '');
+        const m = YMD.exec(s);
+        if (m) return Date.UTC(+m[1], +m[2] - 1, +m[3]) / DAY_MS;
+        return new Date(s).getTime() / DAY_MS;
+    }
+
+    function fromEpochDay(day) {
+        return new Date(day * DAY_MS).toISOString().slice(0, 10);
+    }
+
+    class TradingDayIndex {
+        constructor(rows, dateKey = 'Date_add') {
+            const order = [];
+            const days = [];
+            rows.forEach((row, i) => {
+                const day = toEpochDay(row[dateKey]);
+                if (!Number.isNaN(day)) { order.push(i); days.push(day); }
+            });
+            // callers pass date-sorted rows; sort (stable) only when they are not
+            let sorted = true;
+            for (let i = 1; i < days.length; i++) if (days[i] < days[i - 1]) { sorted = false; break; }
+            if (!sorted) {
+                const perm = days.map((_, i) => i).sort((a, b) => days[a] - days[b] || a - b);
+                this.rows = perm.map(i => rows[order[i]]);
+                this.days = Float64Array.from(perm, i => days[i]);
+            } else {
+                this.rows = order.map(i => rows[i]);
+                this.days = Float64Array.from(days);
+            }
+        }
+
+        get length() { return this.days.length; }
+
+        // first position whose day is >= day
+        lowerBound(day) {
+            let lo = 0, hi = this.days.length;
+            while (lo < hi) {
+                const mid = (lo + hi) >>> 1;
+                if (this.days[mid] < day) lo = mid + 1; else hi = mid;
+            }
+            return lo;
+        }
+
+        // row closest to the target date (earlier row on a tie), null when empty
+        nearest(target) {
+            const day = toEpochDay(target);
+            if (!this.days.length || Number.isNaN(day)) return null;
+            const i = this.lowerBound(day);
+            if (i === 0) return this.rows[0];
+            if (i === this.days.length) return this.rows[this.lowerBound(this.days[i - 1])];
+            // an exact hit is at i; otherwise compare the neighbours on either side
+            const before = this.lowerBound(this.days[i - 1]);
+            return (day - this.days[i - 1]) <= (this.days[i] - day) ? this.rows[before] : this.rows[i];
+        }
+
+        // first row on/after the target (strictly after when inclusive is false)
+        next(target, inclusive = true) {
+            const day = toEpochDay(target);
+            let i = this.lowerBound(day);
+            if (!inclusive) while (i < this.days.length && this.days[i] === day) i++;
+            return i < this.days.length ? this.rows[i] : null;
+        }
+
+        // last row on/before the target (strictly before when inclusive is false)
+        previous(target, inclusive = true) {
+            const day = toEpochDay(target);
+            let i = this.lowerBound(day);
+            if (inclusive && i < this.days.length && this.days[i] === day) {
+                while (i + 1 < this.days.length && this.days[i + 1] === day) i++;
+                return this.rows[i];
+            }
+            return i > 0 ? this.rows[i - 1] : null;
+        }
+    }
+
+    // Index for a rows array, built on first use and reused for later lookups
+    function indexFor(rows, dateKey = 'Date_add') {
+        let index = indexCache.get(rows);
+        if (!index) {
+            index = new TradingDayIndex(rows, dateKey);
+            indexCache.set(rows, index);
+        }
+        return index;
+    }
+
+    function findClosest(rows, targetDate) {
+        return indexFor(rows).nearest(targetDate);
+    }
+
+    return { DAY_MS, toEpochDay, fromEpochDay, TradingDayIndex, indexFor, findClosest };
+})();
+
+if (typeof module !== 'undefined') module.exports = TradingDays;
@@ -0,0 +1,85 @@
+// Single-pass weekly statistics for a ticker's date-sorted rows.
+//
+// Rows are bucketed by an integer week id (Monday-start weeks counted from the
+// epoch) while walking them once, which replaces the Monday x Friday nested scan
+// and the toISOString-keyed week Map in the strategy pages. Produces:
+//   upDays / downDays   Close above / below Open
+//   mondayFriday        weeks holding both a Monday and a Friday row: Friday Close > Monday Close
+//   weekOverWeek        consecutive weeks present in the data: last Close of the week rises
+// weekly_metrics.py computes the same numbers in the ETL.
+const WeeklyMetrics = (() => {
+    const DAY_MS = 86400000;
+    const YMD = /^(\d{4})-(\d{2})-(\d{2})$/;
+
+    function epochDay(value) {
+        const m = YMD.exec(String(value ?? ''));
+        if (m) return Date.UTC(+m[1], +m[2] - 1, +m[3]) / DAY_MS;
+        return Math.floor(new Date(value).getTime() / DAY_MS);
+    }
+
+    // Monday-start week number: 1970-01-05 (epoch day 4) opens week 1
+    function weekId(day) {
+        return Math.floor((day + 3) / 7);
+    }
+
+    function percent(success, total) {
+        return total > 0 ? (success / total * 100).toFixed(1) : 0;
+    }
+
+    function compute(rows, dateKey = 'Date_add') {
+        let upDays = 0, downDays = 0;
+        let mfSuccess = 0, mfTotal = 0;
+        let wowSuccess = 0, wowTotal = 0;
+
+        let week = null;          // current week id
+        let weekLastClose = null; // Close of the latest row seen in the current week
+        let prevWeekClose = null; // last Close of the previous week present in the data
+        let mondayClose = null, fridayClose = null;
+
+        const closeWeek = () => {
+            if (week === null) return;
+            if (mondayClose !== null && fridayClose !== null) {
+                mfTotal++;
+                if (fridayClose > mondayClose) mfSuccess++;
+            }
+            if (prevWeekClose !== null) {
+                wowTotal++;
+                if (weekLastClose > prevWeekClose) wowSuccess++;
+            }
+            prevWeekClose = weekLastClose;
+        };
+
+        for (const row of rows) {
+            const open = parseFloat(row.Open);
+            const close = parseFloat(row.Close);
+            if (close > open) upDays++;
+            else if (close < open) downDays++;
+
+            const day = epochDay(row[dateKey]);
+            if (Number.isNaN(day)) continue;
+            const id = weekId(day);
+            if (id !== week) {
+                closeWeek();
+                week = id;
+                mondayClose = null;
+                fridayClose = null;
+            }
+            weekLastClose = close;
+            if (row.Weekday === 'Monday' && mondayClose === null) mondayClose = close;
+            else if (row.Weekday === 'Friday' && fridayClose === null) fridayClose = close;
+        }
+        closeWeek();
+
+        const totalDays = upDays + downDays;
+        return {
+            upDays: { count: upDays, percent: percent(upDays, totalDays) },
+            downDays: { count: downDays, percent: percent(downDays, totalDays) },
+            mondayFriday: { success: mfSuccess, total: mfTotal, percent: percent(mfSuccess, mfTotal) },
+            weekOverWeek: { success: wowSuccess, total: wowTotal, percent: percent(wowSuccess, wowTotal) }
+        };
+    }
+
+    return { weekId, epochDay, compute };
+})();
+
+if (typeof module !== 'undefined') module.exports = WeeklyMetrics;
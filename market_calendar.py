@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+
+# =============================
+# CALENDAR COLUMNS
+#  - Year / Month / Week / Weekday derived with datetime64 arithmetic (no per-row Python)
+#  - week numbering conventions (see scripts/financial_weeks.py):
+#      financial  Monday start, days before the year's first Monday are week 1, capped at 52
+#                 (etl-market-data.py / history_tickers.csv)
+#      iso        ISO 8601 week (Monday start, 1..53; etlv2 / etl-data-proc.csv)
+#      us         strftime %U (Sunday start, days before the first Sunday are week 0)
+#      simple     (day of year - 1) // 7 + 1, capped at 52
+#  - tz-aware dates use their exchange-local wall-clock date
+#  - PERIODS / period_start mirror the pages' period buttons (pages/bod.html getPeriodRange)
+# =============================
+
+WEEK_CONVENTIONS = ("financial", "iso", "us", "simple")
+PERIODS = ("YTD", "5Y", "10Y", "15Y", "20Y")
+
+# year -> first Monday of that year (datetime64[D]), filled on demand
+_FIRST_MONDAY = {}
+
+
+def first_monday(year):
+    """First Monday on or after Jan 1 of `year`, cached."""
+    if year not in _FIRST_MONDAY:
+        jan_1 = np.datetime64(f"{year:04d}-01-01", "D")
+        # 1970-01-01 was a Thursday: weekday (Mon=0) of day n is (n + 3) % 7
+        weekday = (jan_1.astype(np.int64) + 3) % 7
+        _FIRST_MONDAY[year] = jan_1 + np.timedelta64((7 - weekday) % 7, "D")
+    return _FIRST_MONDAY[year]
+
+
+def first_monday_table(first_year, last_year):
+    """First Mondays for first_year..last_year (inclusive) as a datetime64[D] array."""
+    return np.array([first_monday(y) for y in range(first_year, last_year + 1)], dtype="datetime64[D]")
+
+
+def to_local_dates(dates):
+    """Naive, midnight-normalized datetime64 Series (tz dropped, local wall time kept)."""
+    s = pd.Series(dates)
+    if not pd.api.types.is_datetime64_any_dtype(s):
+        s = pd.to_datetime(s, errors="coerce")
+    if s.dt.tz is not None:
+        s = s.dt.tz_localize(None)
+    return s.dt.normalize()
+
+
+def week_numbers(dates, convention="financial"):
+    """Week number of each date under the named convention (NaT -> NA)."""
+    if convention not in WEEK_CONVENTIONS:
+        raise ValueError(f"unknown week convention {convention!r}; expected one of {WEEK_CONVENTIONS}")
+    d = to_local_dates(dates)
+    if convention == "iso":
+        return d.dt.isocalendar().week
+
+    valid = d.notna().to_numpy()
+    days = d.to_numpy(dtype="datetime64[D]")
+    years = d.dt.year.to_numpy()
+    weeks = np.zeros(len(d), dtype=np.int64)
+    if valid.any():
+        yrs = years[valid].astype(np.int64)
+        day = days[valid]
+        if convention == "financial":
+            table = first_monday_table(int(yrs.min()), int(yrs.max()))
+            since = (day - table[yrs - yrs.min()]).astype(np.int64)
+            weeks[valid] = np.where(since >= 0, np.minimum(52, since // 7 + 1), 1)
+        else:
+            yday = (day - day.astype("datetime64[Y]").astype("datetime64[D]")).astype(np.int64)
+            if convention == "us":
+                # %U: (yday + 7 - weekday with Sunday=0) // 7
+                sunday0 = (day.astype(np.int64) + 4) % 7
+                weeks[valid] = (yday + 7 - sunday0) // 7
+            else:
+                weeks[valid] = np.minimum(52, yday // 7 + 1)
+    if valid.all():
+        return pd.Series(weeks, index=d.index)
+    return pd.Series(weeks, index=d.index, dtype="Int64").mask(~valid)
+
+
+def calendar_columns(dates, convention="financial"):
+    """Year, Month, Week (per `convention`) and Weekday name for each date (index kept)."""
+    d = to_local_dates(dates)
+    cols = pd.DataFrame(
+        {
+            "Year": d.dt.year,
+            "Month": d.dt.month,
+            "Week": week_numbers(d, convention),
+            "Weekday": d.dt.day_name(),
+        }
+    )
+    if d.notna().all():
+        cols["Year"] = cols["Year"].astype(np.int64)
+        cols["Month"] = cols["Month"].astype(np.int64)
+    return cols
+
+
+def date_strings(dates):
+    """YYYY-MM-DD strings (local calendar date for tz-aware values)."""
+    s = pd.Series(dates)
+    if pd.api.types.is_datetime64_any_dtype(s):
+        # datetime64[D] -> str is ISO 'YYYY-MM-DD' (much faster than .dt.strftime); NaT -> NaN
+        d = to_local_dates(s)
+        out = pd.Series(d.to_numpy(dtype="datetime64[D]").astype(str).astype(object), index=s.index)
+        return out.mask(d.isna())
+    # mixed / already-string columns (e.g. after merging with the stored CSV)
+    return s.apply(lambda x: x.strftime("%Y-%m-%d") if hasattr(x, "strftime") else str(x))
+
+
+def period_start(end, period):
+    """First day of a period ending at `end` (pages/bod.html getPeriodRange rules)."""
+    end = pd.Timestamp(end)
+    if period == "YTD":
+        return pd.Timestamp(end.year, 1, 1)
+    years = int(period.rstrip("Y"))
+    # Date.setFullYear rolls Feb 29 into Mar 1 in non-leap years
+    try:
+        return end.replace(year=end.year - years)
+    except ValueError:
+        return pd.Timestamp(end.year - years, 3, 1)
+
+
+# US equity session close; weekends are skipped, exchange holidays are not modelled
+# (a holiday only makes a cached download look stale one day early)
+MARKET_TZ = "America/New_York"
+MARKET_CLOSE_HOUR = 16
+
+
+def last_market_close(now=None):
+    """Most recent weekday 16:00 New York time at or before `now` (naive values are UTC)."""
+    now = pd.Timestamp.now(tz=MARKET_TZ) if now is None else pd.Timestamp(now)
+    now = now.tz_localize("UTC").tz_convert(MARKET_TZ) if now.tz is None else now.tz_convert(MARKET_TZ)
+    day = now.date() if now.hour >= MARKET_CLOSE_HOUR else now.date() - pd.Timedelta(days=1)
+    while day.weekday() >= 5:
+        day -= pd.Timedelta(days=1)
+    return pd.Timestamp(day.year, day.month, day.day, MARKET_CLOSE_HOUR, tz=MARKET_TZ)
@@ -0,0 +1,314 @@
+import argparse
+import hashlib
+import json
+import os
+import time
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+
+import pandas as pd
+
+import dca_engine
+import etlv2
+import bod_sweep
+from bod_engine import BOD_WORKERS, build_dip_days, build_history_bod_events, round_history_bod
+from bod_index import BOD_INDEX_FILE, BOD_INDEX_FOLDER, build_prefix_indexes, write_bod_index
+from dca_index import DCA_INDEX_FILE, DCA_INDEX_FOLDER, build_dca_indexes, write_dca_index
+from data_manifest import DATA_MANIFEST, write_data_manifest
+from derived_metrics import PERCENT_COLUMNS
+from excel_export import EXCEL_MANIFEST, export_workbooks
+from market_calendar import calendar_columns, last_market_close
+from price_bundles import BUNDLE_FOLDER, BUNDLE_INDEX, write_price_bundles
+from storage import csv_path, dataset_exists, load_dataset, save_dataset
+from summary_cube import CUBE_JSON, write_summary_cube
+from weekly_metrics import WEEKLY_SUMMARY_JSON, write_weekly_summary
+
+# =============================
+# ETL PIPELINE (one entry point over the etlv2 steps and the summary writers)
+#  - every stage declares the files it reads and writes; a stage depends on whichever
+#    stage writes one of its inputs, and stages whose inputs are ready run in parallel:
+#
+#      fetch -> process -+-> tickers (per-ticker raw + weekly DCA files)
+#                        +-> sweep (bod-leaderboard.json)
+#                        +-> history (history_tickers.csv) -+-> bundles, weekly, dca_index
+#                                                           +-> bod (all_buy_on_dip + dip days) -> bod_index
+#                                                           +-> cube, manifest (data-manifest.json; after bod as well)
+#                        +-> excel (--excel only; after bod as well)
+#
+#  - the files the pages read (history_tickers.csv, all_buy_on_dip.csv, bod_dip_days.csv)
+#    come out in etl-market-data.py's format, for the tickers in etlv2.etf_list
+#  - stages that start a process pool (bod, excel) run on the main thread once no other
+#    stage is running and the stage threads are shut down, so nothing forks from a
+#    multi-threaded process
+#  - a stage's fingerprint is a sha256 over its parameters (etf_list, dip_max_pct, ...)
+#    and the bytes of its input files; data/pipeline-state.json keeps the fingerprint of
+#    the last successful run and the stage is skipped while it matches and its outputs
+#    exist. A rerun that writes identical bytes therefore also skips everything after it
+#  - fetch has no input files: it runs again once a market close has passed (the newest
+#    close is one of its parameters) or when the ticker list changes
+#  - code changes are not fingerprinted: use --force after editing a stage
+# =============================
+PIPELINE_STATE = os.path.join(etlv2.OUTPUT_FOLDER, "pipeline-state.json")
+STAGE_WORKERS = 4  # stages run at the same time when their inputs are ready
+# history_tickers.csv column order (etl-market-data.add_derived_columns)
+HISTORY_LEADING_COLUMNS = ["Date_add", "Weekday", "Symbol", "Open", "High", "Low", "Close", "Previous_Close"] + PERCENT_COLUMNS
+HISTORY_WEEK_CONVENTION = "financial"  # etl-market-data.WEEK_CONVENTION (etlv2 numbers ISO weeks)
+
+
+class Stage:
+    """One pipeline step: run() reads `inputs` and writes `outputs` (file paths).
+
+    processes marks a stage that starts its own process pool; it runs alone on the
+    main thread instead of on a stage thread.
+    """
+
+    def __init__(self, name, run, inputs=(), outputs=(), params=None, processes=False):
+        self.name = name
+        self.run = run
+        self.inputs = list(inputs)
+        self.outputs = list(outputs)
+        self.params = params or (lambda: {})
+        self.processes = processes
+
+
+def file_sha256(path, block=1 << 20):
+    h = hashlib.sha256()
+    with open(path, "rb") as f:
+        for chunk in iter(lambda: f.read(block), b""):
+            h.update(chunk)
+    return h.hexdigest()
+
+
+def fingerprint(stage):
+    """sha256 over the stage name, its parameters and the contents of its input files."""
+    inputs = {path: file_sha256(path) if os.path.exists(path) else None for path in stage.inputs}
+    payload = json.dumps({"stage": stage.name, "params": stage.params(), "inputs": inputs}, sort_keys=True, default=str)
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_state(path=PIPELINE_STATE):
+    if not os.path.exists(path):
+        return {}
+    with open(path) as f:
+        return json.load(f)
+
+
+def save_state(state, path=PIPELINE_STATE):
+    with open(path + ".tmp", "w") as f:
+        json.dump(state, f, indent=2, sort_keys=True)
+    os.replace(path + ".tmp", path)
+
+
+def dependencies(stages):
+    """stage name -> names of the stages that write its inputs."""
+    producers = {out: s.name for s in stages for out in s.outputs}
+    return {s.name: {producers[path] for path in s.inputs if path in producers} for s in stages}
+
+
+def run_stage(stage, previous, force=False):
+    """Run one stage unless its fingerprint matches the last run (or force); returns (state entry, ran)."""
+    digest = fingerprint(stage)
+    if not force and previous is not None and previous.get("fingerprint") == digest and all(os.path.exists(p) for p in stage.outputs):
+        print(f"[pipeline] {stage.name}: unchanged, skipped")
+        return previous, False
+    print(f"[pipeline] {stage.name}: running")
+    t0 = time.perf_counter()
+    stage.run()
+    missing = [p for p in stage.outputs if not os.path.exists(p)]
+    if missing:
+        raise RuntimeError(f"stage {stage.name} did not write {', '.join(missing)}")
+    seconds = time.perf_counter() - t0
+    print(f"[pipeline] {stage.name}: done in {seconds:.1f}s")
+    return {"fingerprint": digest, "seconds": round(seconds, 2), "finished_at": time.strftime("%Y-%m-%dT%H:%M:%S")}, True
+
+
+def run_pipeline(stages, state_path=PIPELINE_STATE, force=False, workers=STAGE_WORKERS):
+    """Run `stages` in dependency order, independent ones in parallel.
+
+    force is True (run everything) or a collection of stage names to run regardless
+    of their fingerprint; stages after them still skip when their inputs come out the same.
+    Stage.processes stages wait for the running stages, then run on this thread with
+    the stage thread pool shut down.
+
+    The state file is updated after every stage, so a failure keeps the stages that
+    finished; the exception is raised once the stages already running have ended.
+    Returns the names of the stages that ran.
+    """
+    deps = dependencies(stages)
+    pending = {s.name: s for s in stages}
+    state = load_state(state_path)
+    done, ran, running = set(), [], {}
+    pool = None
+
+    def forced(name):
+        return force is True or name in (force or ())
+
+    def finish(name, result):
+        state[name], did_run = result
+        done.add(name)
+        if did_run:
+            ran.append(name)
+        save_state(state, state_path)
+
+    try:
+        while pending or running:
+            ready = [n for n in pending if deps[n] <= done]
+            solo = next((n for n in ready if pending[n].processes), None)
+            if solo is not None:
+                # no new stage threads until the process-pool stage is done
+                if not running:
+                    if pool is not None:
+                        pool.shutdown()
+                        pool = None
+                    finish(solo, run_stage(pending.pop(solo), state.get(solo), forced(solo)))
+                    continue
+            else:
+                for name in ready:
+                    pool = pool or ThreadPoolExecutor(max_workers=max(1, workers))
+                    running[pool.submit(run_stage, pending.pop(name), state.get(name), forced(name))] = name
+            if not running:
+                raise RuntimeError(f"stages with unmet inputs: {', '.join(sorted(pending))}")
+            finished, _ = wait(running, return_when=FIRST_COMPLETED)
+            for future in finished:
+                name = running.pop(future)
+                try:
+                    result = future.result()
+                except Exception:
+                    pending.clear()  # nothing new starts; running stages finish first
+                    raise
+                finish(name, result)
+    finally:
+        if pool is not None:
+            pool.shutdown()
+    return ran
+
+
+# =============================
+# STAGES
+# =============================
+def write_history():
+    """history_tickers.csv for the pages: the processed table in etl-market-data's layout."""
+    proc = load_dataset("proc", etlv2.OUTPUT_FOLDER)
+    history = proc.assign(Date_add=proc["Date"])
+    # etl-market-data's calendar fields and unrounded average (proc rounds it to 4 decimals)
+    history[["Year", "Month", "Week", "Weekday"]] = calendar_columns(pd.to_datetime(history["Date_add"]), HISTORY_WEEK_CONVENTION)
+    history["avg_daily_price"] = history[["Open", "High", "Low", "Close"]].mean(axis=1)
+    # etl-market-data's dtypes, not proc's compact schema (schema.PROC_SCHEMA)
+    history["Symbol"] = history["Symbol"].astype(str)
+    history[PERCENT_COLUMNS] = history[PERCENT_COLUMNS].astype("float64").round(2)
+    history["Volume"] = history["Volume"].astype("float64" if history["Volume"].isna().any() else "int64")
+    order = HISTORY_LEADING_COLUMNS + [c for c in history.columns if c not in HISTORY_LEADING_COLUMNS]
+    save_dataset(history[order], "history", etlv2.OUTPUT_FOLDER)
+
+
+def write_bod(dip_max, step):
+    """all_buy_on_dip.csv and bod_dip_days.csv from history_tickers.csv, as etl-market-data.py writes them."""
+    folder = etlv2.OUTPUT_FOLDER
+    history = load_dataset("history", folder)
+    events = build_history_bod_events(history, dip_max, step, workers=BOD_WORKERS)
+    save_dataset(round_history_bod(events), "bod", folder)
+    symbols = sorted(history["Symbol"].dropna().unique())
+    save_dataset(build_dip_days(history, symbols, dip_max, step, date_col="Date_add"), "dipdays", folder)
+
+
+def fetch(full=False):
+    if not full and dataset_exists("raw", etlv2.OUTPUT_FOLDER):
+        combined, _ = etlv2.update_raw_history(etlv2.etf_list)
+    else:
+        combined = etlv2.fetch_all_history(etlv2.etf_list)
+    if combined.empty:
+        raise RuntimeError("no raw data downloaded")
+
+
+def build_stages(full=False, excel=False):
+    folder = etlv2.OUTPUT_FOLDER
+    raw, proc, history, bod, dipdays = (csv_path(name, folder) for name in ("raw", "proc", "history", "bod", "dipdays"))
+    stages = [
+        Stage(
+            "fetch",
+            lambda: fetch(full),
+            outputs=[raw],
+            params=lambda: {"etf_list": etlv2.etf_list, "market_close": last_market_close().isoformat()},
+        ),
+        Stage("process", etlv2.process_streaming, inputs=[raw], outputs=[proc]),
+        Stage(
+            "tickers",
+            etlv2.write_per_ticker_files,
+            inputs=[proc],
+            outputs=[etlv2.PER_TICKER_MANIFEST],
+            params=lambda: {"weekly_investment": dca_engine.WEEKLY_INVESTMENT, "dca_schedule": dca_engine.DCA_WEEKLY_SCHEDULE},
+        ),
+        Stage("history", write_history, inputs=[proc], outputs=[history]),
+        Stage(
+            "bod",
+            lambda: write_bod(etlv2.dip_max_pct, etlv2.dip_step_pct),
+            inputs=[history],
+            outputs=[bod, dipdays],
+            params=lambda: {"dip_max_pct": etlv2.dip_max_pct, "dip_step_pct": etlv2.dip_step_pct},
+            processes=True,
+        ),
+        Stage(
+            "bod_index",
+            lambda: write_bod_index(build_prefix_indexes(load_dataset("bod", folder))),
+            inputs=[bod],
+            outputs=[os.path.join(BOD_INDEX_FOLDER, BOD_INDEX_FILE)],
+        ),
+        Stage(
+            "bundles",
+            lambda: write_price_bundles(load_dataset("history", folder)),
+            inputs=[history],
+            outputs=[os.path.join(BUNDLE_FOLDER, BUNDLE_INDEX)],
+        ),
+        Stage(
+            "sweep",
+            lambda: bod_sweep.write_leaderboard(load_dataset("proc", folder)),
+            inputs=[proc],
+            outputs=[bod_sweep.LEADERBOARD_JSON],
+            params=lambda: {"levels": bod_sweep.SWEEP_LEVELS, "shares": bod_sweep.SWEEP_SHARES, "min_fills": bod_sweep.MIN_FILLS, "top_n": bod_sweep.TOP_N},
+        ),
+        Stage(
+            "dca_index",
+            lambda: write_dca_index(build_dca_indexes(load_dataset("history", folder), date_col="Date_add")),
+            inputs=[history],
+            outputs=[os.path.join(DCA_INDEX_FOLDER, DCA_INDEX_FILE)],
+        ),
+        Stage("weekly", lambda: write_weekly_summary(load_dataset("history", folder)), inputs=[history], outputs=[WEEKLY_SUMMARY_JSON]),
+        Stage(
+            "manifest",
+            lambda: write_data_manifest(folder),
+            inputs=[history, bod, dipdays],
+            outputs=[DATA_MANIFEST],
+        ),
+        Stage(
+            "cube",
+            lambda: write_summary_cube(load_dataset("history", folder), load_dataset("bod", folder)),
+            inputs=[history, bod],
+            outputs=[CUBE_JSON],
+            params=lambda: {"weekly_investment": dca_engine.WEEKLY_INVESTMENT},
+        ),
+    ]
+    if excel:
+        stages.append(
+            Stage(
+                "excel",
+                lambda: export_workbooks(etlv2.EXCEL_DATASETS, folder=folder, out_folder=os.path.join(folder, "excel")),
+                inputs=[proc, bod],
+                outputs=[os.path.join(folder, "excel", EXCEL_MANIFEST)],
+                processes=True,
+            )
+        )
+    return stages
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the ETL as a stage DAG, skipping stages whose inputs did not change")
+    parser.add_argument("--full", action="store_true", help="refetch the full history instead of only new bars")
+    parser.add_argument("--offline", action="store_true", help="replay cached downloads only (no network)")
+    parser.add_argument("--force", action="store_true", help="run every stage")
+    parser.add_argument("--excel", action="store_true", help="also write the Excel copies (data/excel/; off by default)")
+    parser.add_argument("--workers", type=int, default=STAGE_WORKERS)
+    args = parser.parse_args()
+    etlv2.PRICE_SOURCE.offline = args.offline
+    # --full always refetches; later stages still skip if the download comes back identical
+    force = True if args.force else ({"fetch"} if args.full else ())
+    ran = run_pipeline(build_stages(full=args.full, excel=args.excel), force=force, workers=args.workers)
+    print(f"Pipeline complete: {len(ran)} stage(s) ran ({', '.join(ran) or 'none'})")
@@ -0,0 +1,100 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+# =============================
+# PER-SYMBOL PRICE BUNDLES (for the browser pages)
+#  - data/bundles/<SYMBOL>.<hash>.bin, little-endian:
+#      int32[rows]            trading days as days since 1970-01-01, ascending
+#      zero padding           up to the next multiple of 8 bytes
+#      float64[rows] x N      one block per BUNDLE_COLUMNS entry, in that order (NaN = missing)
+#  - data/bundles/index.json lists every symbol with its file name, row count and
+#    first/last date; the file name carries a content hash so browsers may cache
+#    bundles forever and only index.json needs revalidating
+#  - js/price-bundles.js decodes these straight into typed arrays
+# =============================
+BUNDLE_FOLDER = os.path.join("data", "bundles")
+BUNDLE_INDEX = "index.json"
+BUNDLE_VERSION = 1
+BUNDLE_COLUMNS = ["Open", "High", "Low", "Close", "Previous_Close", "avg_daily_price"]
+MISSING_DAY = np.iinfo(np.int32).min  # epoch_days() of a missing or unparseable date
+
+
+def epoch_days(dates):
+    """YYYY-MM-DD strings (or datetimes) -> int32 days since 1970-01-01 (MISSING_DAY for NaT)."""
+    d = pd.to_datetime(pd.Series(dates), errors="coerce")
+    if d.dt.tz is not None:
+        d = d.dt.tz_localize(None)
+    d = d.to_numpy(dtype="datetime64[D]")
+    days = d.astype(np.int64)
+    days[np.isnat(d)] = MISSING_DAY  # NaT's int64 would wrap to 0 (1970-01-01) in int32
+    return days.astype(np.int32)
+
+
+def encode_bundle(days, columns):
+    """Pack the date index and the float64 column blocks into one bytes object."""
+    date_block = np.ascontiguousarray(days, dtype="<i4").tobytes()
+    date_block += b"\0" * (-len(date_block) % 8)
+    return date_block + b"".join(np.ascontiguousarray(c, dtype="<f8").tobytes() for c in columns)
+
+
+def write_price_bundles(history_df, folder=BUNDLE_FOLDER, date_col="Date_add"):
+    """Write one bundle per symbol of history_df plus index.json; returns the index.
+
+    Bundles whose content did not change keep their file (same hash, no write);
+    bundles no longer referenced by the index are removed.
+    """
+    os.makedirs(folder, exist_ok=True)
+    entries = []
+    for sym, g in history_df.groupby("Symbol", sort=True):
+        g = g.assign(_day=epoch_days(g[date_col]))
+        g = g[g["_day"] != MISSING_DAY].sort_values("_day", kind="stable")
+        if g.empty:
+            continue
+        cols = [pd.to_numeric(g[c], errors="coerce").to_numpy(dtype=float) if c in g.columns else np.full(len(g), np.nan) for c in BUNDLE_COLUMNS]
+        data = encode_bundle(g["_day"].to_numpy(), cols)
+        name = f"{sym}.{hashlib.sha256(data).hexdigest()[:12]}.bin"
+        path = os.path.join(folder, name)
+        if not os.path.exists(path):
+            with open(path, "wb") as f:
+                f.write(data)
+        day = g["_day"].to_numpy()
+        entries.append(
+            {
+                "symbol": str(sym),
+                "file": name,
+                "rows": int(len(g)),
+                "bytes": len(data),
+                "first_date": str(np.datetime64(int(day[0]), "D")),
+                "last_date": str(np.datetime64(int(day[-1]), "D")),
+            }
+        )
+
+    index = {"version": BUNDLE_VERSION, "columns": BUNDLE_COLUMNS, "symbols": entries}
+    with open(os.path.join(folder, BUNDLE_INDEX), "w") as f:
+        json.dump(index, f, indent=1)
+
+    keep = {e["file"] for e in entries} | {BUNDLE_INDEX}
+    for name in os.listdir(folder):
+        if name.endswith(".bin") and name not in keep:
+            os.remove(os.path.join(folder, name))
+    return index
+
+
+def read_price_bundle(symbol, folder=BUNDLE_FOLDER):
+    """Decode one bundle back into a frame (Date_add + BUNDLE_COLUMNS); mirrors the JS reader."""
+    with open(os.path.join(folder, BUNDLE_INDEX)) as f:
+        index = json.load(f)
+    entry = next(e for e in index["symbols"] if e["symbol"] == symbol)
+    with open(os.path.join(folder, entry["file"]), "rb") as f:
+        data = f.read()
+    rows = entry["rows"]
+    days = np.frombuffer(data, dtype="<i4", count=rows)
+    offset = rows * 4 + (-(rows * 4) % 8)
+    out = {"Date_add": days.astype("datetime64[D]").astype(str)}
+    for i, col in enumerate(index["columns"]):
+        out[col] = np.frombuffer(data, dtype="<f8", count=rows, offset=offset + i * rows * 8)
+    return pd.DataFrame(out)
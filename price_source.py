@@ -0,0 +1,252 @@
+import hashlib
+import io
+import json
+import os
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+
+from market_calendar import last_market_close
+
+# =============================
+# PRICE SOURCES
+#  - PriceSource.history() mirrors yf.Ticker(sym).history(): a frame indexed by Date
+#    with Open/High/Low/Close/Volume columns (empty frame when there is no data)
+#  - `start` (YYYY-MM-DD, inclusive) takes precedence over `period` for delta fetches
+#  - YahooPriceSource is the production source; CsvDirPriceSource replays a folder
+#    of {SYMBOL}.csv files so the ETL can run without the network (tests, local dev)
+#  - CachedPriceSource wraps any source with an on-disk cache (see below); --offline on
+#    the ETLs replays it without touching the network
+# =============================
+class PriceSource:
+    """Interface for anything that can return daily OHLCV history for a symbol."""
+
+    def history(self, symbol, period="20y", interval="1d", auto_adjust=True, start=None):
+        raise NotImplementedError
+
+
+class YahooPriceSource(PriceSource):
+    """Yahoo Finance via yfinance."""
+
+    def history(self, symbol, period="20y", interval="1d", auto_adjust=True, start=None):
+        import yfinance as yf
+
+        if start is not None:
+            return yf.Ticker(symbol).history(start=start, interval=interval, auto_adjust=auto_adjust)
+        return yf.Ticker(symbol).history(period=period, interval=interval, auto_adjust=auto_adjust)
+
+
+class CsvDirPriceSource(PriceSource):
+    """Local stand-in for Yahoo: reads {folder}/{SYMBOL}.csv (Date + OHLCV columns).
+
+    period/interval/auto_adjust are accepted for interface compatibility; the
+    file is returned as stored (from `start` onward when given).
+    """
+
+    def __init__(self, folder):
+        self.folder = folder
+
+    def history(self, symbol, period="20y", interval="1d", auto_adjust=True, start=None):
+        path = os.path.join(self.folder, f"{symbol}.csv")
+        if not os.path.exists(path):
+            return pd.DataFrame()
+        df = pd.read_csv(path)
+        df["Date"] = pd.to_datetime(df["Date"])
+        if start is not None:
+            df = df[df["Date"] >= pd.Timestamp(start)]
+        return df.set_index("Date")
+
+
+# =============================
+# DOWNLOAD CACHE (.cache/prices/)
+#  - kept outside data/ (the daily workflow commits data/) and gitignored: local state only
+#  - index.json maps a request key (symbol, period, interval, auto_adjust, start) to the
+#    sha256 of the response; responses live once under objects/<sha256>.parquet, so
+#    requests that returned the same frame share one file
+#  - an entry is fresh while it is younger than the TTL and no market close (16:00 New
+#    York, market_calendar.last_market_close) has passed since it was fetched
+#  - offline mode returns cached entries whatever their age and raises CacheMiss for the
+#    rest; a delta request (start=...) can be answered from a cached full history
+#  - errors are never cached (the exception reaches fetch_with_retry as before)
+# =============================
+PRICE_CACHE_FOLDER = os.path.join(".cache", "prices")
+PRICE_CACHE_TTL_HOURS = 12
+PRICE_CACHE_INDEX = "index.json"
+
+
+class CacheMiss(LookupError):
+    """Offline request with nothing cached for it (not retried)."""
+
+
+class CachedPriceSource(PriceSource):
+    """Content-addressed on-disk cache in front of another PriceSource."""
+
+    def __init__(self, source, folder=PRICE_CACHE_FOLDER, ttl_hours=PRICE_CACHE_TTL_HOURS, offline=False):
+        self.source = source
+        self.folder = folder
+        self.ttl = pd.Timedelta(hours=ttl_hours)
+        self.offline = offline
+        self.hits = 0
+        self.misses = 0
+        self._lock = threading.Lock()
+        self._index = None
+
+    @staticmethod
+    def request_key(symbol, period, interval, auto_adjust, start):
+        fields = {"symbol": symbol, "period": None if start is not None else period, "interval": interval, "auto_adjust": bool(auto_adjust), "start": start}
+        return json.dumps(fields, sort_keys=True)
+
+    @staticmethod
+    def _same_series(key, request):
+        k = json.loads(key)
+        return k["symbol"] == request["symbol"] and k["interval"] == request["interval"] and k["auto_adjust"] == request["auto_adjust"]
+
+    def _object_path(self, digest):
+        return os.path.join(self.folder, "objects", f"{digest}.parquet")
+
+    def _load_index(self):
+        if self._index is None:
+            path = os.path.join(self.folder, PRICE_CACHE_INDEX)
+            self._index = {}
+            if os.path.exists(path):
+                with open(path) as f:
+                    self._index = json.load(f)
+        return self._index
+
+    def _save_index(self):
+        os.makedirs(self.folder, exist_ok=True)
+        path = os.path.join(self.folder, PRICE_CACHE_INDEX)
+        with open(path + ".tmp", "w") as f:
+            json.dump(self._index, f, indent=2, sort_keys=True)
+        os.replace(path + ".tmp", path)
+
+    def is_fresh(self, entry, now=None):
+        now = pd.Timestamp.now(tz="UTC") if now is None else pd.Timestamp(now)
+        fetched = pd.Timestamp(entry["fetched_at"])
+        return now - fetched < self.ttl and fetched >= last_market_close(now)
+
+    def _read(self, entry):
+        try:
+            return pd.read_parquet(self._object_path(entry["sha256"]))
+        except (OSError, ValueError, EOFError, ImportError):
+            return None  # missing or unreadable object: treat as a miss
+
+    def _write(self, key, df):
+        buf = io.BytesIO()
+        df.to_parquet(buf)
+        data = buf.getvalue()
+        digest = hashlib.sha256(data).hexdigest()
+        path = self._object_path(digest)
+        with self._lock:
+            if not os.path.exists(path):
+                os.makedirs(os.path.dirname(path), exist_ok=True)
+                with open(path + ".tmp", "wb") as f:
+                    f.write(data)
+                os.replace(path + ".tmp", path)
+            index = self._load_index()
+            replaced = [index.pop(key)] if key in index else []
+            # a delta request supersedes the symbol's older delta requests (their start moved on)
+            request = json.loads(key)
+            if request["start"] is not None:
+                for other in [k for k in index if self._same_series(k, request) and json.loads(k)["start"] is not None]:
+                    replaced.append(index.pop(other))
+            index[key] = {"sha256": digest, "fetched_at": pd.Timestamp.now(tz="UTC").isoformat(), "rows": int(len(df))}
+            # drop responses nothing refers to any more
+            live = {e["sha256"] for e in index.values()}
+            for stale in {e["sha256"] for e in replaced} - live:
+                try:
+                    os.remove(self._object_path(stale))
+                except OSError:
+                    pass
+            self._save_index()
+
+    def _offline_fallback(self, symbol, interval, auto_adjust, start):
+        """Newest cached full-history response for the symbol, from `start` onward."""
+        request = {"symbol": symbol, "interval": interval, "auto_adjust": bool(auto_adjust)}
+        with self._lock:
+            candidates = [
+                (entry["fetched_at"], entry)
+                for key, entry in self._load_index().items()
+                if self._same_series(key, request) and json.loads(key)["start"] is None
+            ]
+        for _, entry in sorted(candidates, key=lambda c: c[0], reverse=True):
+            df = self._read(entry)
+            if df is not None:
+                if df.empty:
+                    return df
+                dates = df.index.tz_localize(None) if getattr(df.index, "tz", None) is not None else df.index
+                return df[dates.normalize() >= pd.Timestamp(start)]
+        return None
+
+    def history(self, symbol, period="20y", interval="1d", auto_adjust=True, start=None):
+        key = self.request_key(symbol, period, interval, auto_adjust, start)
+        with self._lock:
+            entry = self._load_index().get(key)
+        if entry is not None and (self.offline or self.is_fresh(entry)):
+            df = self._read(entry)
+            if df is not None:
+                self.hits += 1
+                return df
+        if self.offline:
+            df = self._offline_fallback(symbol, interval, auto_adjust, start) if start is not None else None
+            if df is not None:
+                self.hits += 1
+                return df
+            raise CacheMiss(f"{symbol} is not in the download cache ({self.folder}); run once online first")
+        self.misses += 1
+        df = self.source.history(symbol, period=period, interval=interval, auto_adjust=auto_adjust, start=start)
+        self._write(key, df)
+        return df
+
+
+# =============================
+# CONCURRENT FETCH
+# =============================
+def fetch_with_retry(source, symbol, retries=3, backoff=1.0, **history_kwargs):
+    """Call source.history() for one symbol, retrying errors with exponential backoff.
+
+    An empty frame is a valid answer (no data for the symbol) and is not retried.
+    The last exception is re-raised once all attempts are used up; CacheMiss
+    (offline replay) is raised at once.
+    """
+    for attempt in range(retries + 1):
+        try:
+            return source.history(symbol, **history_kwargs)
+        except CacheMiss:
+            raise
+        except Exception as e:
+            if attempt == retries:
+                raise
+            wait = backoff * (2 ** attempt)
+            print(f"  retry {symbol} in {wait:.1f}s ({e})")
+            time.sleep(wait)
+
+
+def fetch_histories(source, tickers, max_workers=8, retries=3, backoff=1.0, starts=None, **history_kwargs):
+    """Download every ticker on a bounded thread pool.
+
+    `starts` optionally maps symbol -> first date to fetch (delta mode); other
+    symbols use `history_kwargs` as given. Returns a list of (symbol, frame) in
+    the same order as `tickers`; frame is None when the symbol still failed
+    after all retries.
+    """
+    starts = starts or {}
+
+    def fetch_one(sym):
+        kwargs = dict(history_kwargs)
+        if sym in starts:
+            kwargs["start"] = starts[sym]
+            print(f"[fetch] {sym} from {starts[sym]}")
+        else:
+            print(f"[fetch] {sym}")
+        try:
+            return fetch_with_retry(source, sym, retries=retries, backoff=backoff, **kwargs)
+        except Exception as e:
+            print(f"  error fetching {sym}: {e}")
+            return None
+
+    with ThreadPoolExecutor(max_workers=max(1, min(max_workers, len(tickers)))) as pool:
+        frames = list(pool.map(fetch_one, tickers))
+    return list(zip(tickers, frames))
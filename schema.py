@@ -0,0 +1,73 @@
+import pandas as pd
+
+# =============================
+# COMPACT DTYPES FOR THE PROCESSED PRICE TABLE (etl-data-proc)
+#  - Symbol / Weekday are categoricals (one small int code per row instead of a Python str)
+#  - Year int16, Month / Week int8; the nullable Int16 / Int8 only when a date did not parse
+#  - prices stay float64: buy-on-dip limits compare Low against Previous_Close * (1 - k%),
+#    and float32 would move fills at the boundary
+#  - the percent columns are rounded to 2 decimals, so float32 holds them with room to
+#    spare (and writes the same CSV text); Volume is a nullable Int64
+#  - applied at the end of etlv2.derive_proc_columns and by storage.load_dataset("proc")
+# =============================
+WEEKDAYS = ["Monday", "Tuesday", "Wednesday", "Thursday", "Friday", "Saturday", "Sunday"]
+
+PROC_SCHEMA = {
+    "Open": "float64",
+    "High": "float64",
+    "Low": "float64",
+    "Close": "float64",
+    "Volume": "Int64",
+    "Symbol": "category",
+    "Year": "int16",
+    "Month": "int8",
+    "Week": "int8",
+    "Weekday": pd.CategoricalDtype(WEEKDAYS),
+    "avg_daily_price": "float64",
+    "Previous_Close": "float64",
+    "Daily_Gain_Loss_Pct": "float32",
+    "Open_vs_PrevClose_Pct": "float32",
+    "Low_vs_PrevClose_Pct": "float32",
+    "Close_vs_PrevClose_Pct": "float32",
+    "mx_percent_decline": "float32",
+}
+
+# dataset name (storage.DATASETS) -> schema
+DATASET_SCHEMAS = {"proc": PROC_SCHEMA}
+
+
+def _cast(col, dtype):
+    if isinstance(dtype, pd.CategoricalDtype) or dtype == "category":
+        return col.astype(dtype)
+    values = pd.to_numeric(col, errors="coerce")
+    if dtype.startswith("int") and values.isna().any():
+        dtype = dtype.capitalize()  # nullable when a date did not parse
+    return values.astype(dtype)
+
+
+def apply_schema(df, schema=PROC_SCHEMA):
+    """Return df with every schema column cast; other columns are left alone.
+
+    Casts that would lose data (text in a numeric column, fractional counts) keep
+    the original column.
+    """
+    out = df.copy()
+    for name, dtype in schema.items():
+        if name not in out.columns or out[name].dtype == dtype:
+            continue
+        try:
+            cast = _cast(out[name], dtype)
+        except (TypeError, ValueError):
+            continue
+        # text that to_numeric turned into NaN stays as it was
+        if cast.isna().sum() > out[name].isna().sum():
+            continue
+        out[name] = cast
+    return out
+
+
+def memory_per_million(df):
+    """Deep memory footprint of df scaled to one million rows, in MB."""
+    if len(df) == 0:
+        return 0.0
+    return df.memory_usage(deep=True, index=False).sum() / len(df) * 1_000_000 / 2**20
@@ -1,8 +1,16 @@
 import pandas as pd
+import os
+import sys
 
-BOD='data/all_buy_on_dip.csv'
-print('Loading', BOD)
-df = pd.read_csv(BOD)
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import csv_path, dataset_columns, load_dataset  # noqa: E402
+
+BOD='bod'
+print('Loading', csv_path(BOD))
+# only the columns the aggregates need (either spelling of shares / dollars)
+wanted = ['Date','Symbol','Shares_Purchased','Shares Purchased','Executed_Price','Dollars_Invested','Dollars Invested']
+df = load_dataset(BOD, columns=[c for c in wanted if c in dataset_columns(BOD)])
 # normalize columns
 for c in ['Shares_Purchased','Shares Purchased']:
     if c in df.columns:
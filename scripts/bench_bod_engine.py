@@ -0,0 +1,118 @@
+#!/usr/bin/env python3
+"""Benchmark the vectorized buy-on-dip engine against the legacy iterrows loop.
+
+Builds the processed table from data/etl-data-raw.csv in memory (nothing under
+data/ is written), runs both implementations and checks that every per-ticker
+CSV and the consolidated CSV come out byte-identical.
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import etlv2  # noqa: E402
+from bod_engine import build_bod_events  # noqa: E402
+
+RAW = 'data/etl-data-raw.csv'
+DIP_MAX = 30
+STEP = 1
+REPEAT = 3
+
+
+def legacy_bod_events(proc_df, symbols, dip_max=DIP_MAX, step=STEP):
+    """The pre-vectorization generate_bod_events loop, returning rows instead of writing."""
+    round2 = etlv2.round2
+    per_symbol = {}
+    event_rows = []
+    for sym in symbols:
+        ticker_df = proc_df[proc_df["Symbol"] == sym].sort_values("Date")
+        ticker_df["Previous_Close"] = pd.to_numeric(ticker_df["Previous_Close"], errors="coerce")
+        ticker_df["Low"] = pd.to_numeric(ticker_df["Low"], errors="coerce")
+        ticker_df["Close"] = pd.to_numeric(ticker_df["Close"], errors="coerce")
+        bod_rows = []
+        cumulative_shares = 0
+        cumulative_invested = 0.0
+        for _, row in ticker_df.iterrows():
+            prev_close = row.get("Previous_Close")
+            if pd.isna(prev_close) or prev_close == 0:
+                continue
+            day_low = row.get("Low")
+            day_date = row.get("Date")
+            day_close = row.get("Close")
+            try:
+                weekday = pd.to_datetime(day_date).day_name()
+            except Exception:
+                weekday = ''
+            for level in range(1, dip_max + 1, step):
+                limit_price = prev_close * (1 - (level / 100.0))
+                if pd.isna(day_low):
+                    continue
+                if day_low <= limit_price:
+                    executed_price = round2(limit_price)
+                    shares = 1
+                    cost = round2(executed_price * shares)
+                    cumulative_shares += shares
+                    cumulative_invested += cost
+                    cumulative_value = round2((cumulative_shares * day_close) if not pd.isna(day_close) else None)
+                    event = {
+                        "Date": day_date,
+                        "Date_add": day_date,
+                        "Weekday": weekday,
+                        "Symbol": sym,
+                        "Strategy": "Buy_on_Dip",
+                        "Buy_Level": level,
+                        "Buy_Price": round2(limit_price),
+                        "Buy Price": round2(limit_price),
+                        "Executed": True,
+                        "Executed_Price": executed_price,
+                        "Shares_Purchased": shares,
+                        "Shares Purchased": shares,
+                        "Dollars_Invested": cost,
+                        "Dollars Invested": cost,
+                        "Cumulative Shares": cumulative_shares,
+                        "Cumulative Invested": round2(cumulative_invested),
+                        "Cumulative Value": cumulative_value,
+                        "Close": round2(day_close) if not pd.isna(day_close) else None,
+                        "Previous_Close": round2(prev_close) if not pd.isna(prev_close) else None,
+                    }
+                    bod_rows.append(event)
+                    event_rows.append(event)
+        per_symbol[sym] = pd.DataFrame(bod_rows)
+    return pd.DataFrame(event_rows), per_symbol
+
+
+def best_of(repeat, fn, *args):
+    best = None
+    result = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        result = fn(*args)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best, result
+
+
+if __name__ == '__main__':
+    print('Loading', RAW)
+    raw = pd.read_csv(RAW)
+    proc = etlv2.derive_proc_columns(raw)
+    symbols = sorted(proc['Symbol'].dropna().unique())
+    print(f'rows={len(proc)} symbols={len(symbols)} levels={len(range(1, DIP_MAX + 1, STEP))}')
+
+    t_old, (old_all, old_per) = best_of(1, legacy_bod_events, proc, symbols)
+    t_new, (new_all, new_per) = best_of(REPEAT, build_bod_events, proc, symbols, DIP_MAX, STEP)
+
+    mismatched = [s for s in symbols if old_per[s].to_csv(index=False) != new_per[s].to_csv(index=False)]
+    all_match = old_all.to_csv(index=False) == new_all.to_csv(index=False)
+
+    print(f'\nlegacy loop : {t_old:8.3f}s ({len(old_all)} events)')
+    print(f'vectorized  : {t_new:8.3f}s ({len(new_all)} events)')
+    print(f'speedup     : {t_old / t_new:8.1f}x')
+    print(f'\nall_buy_on_dip.csv identical: {all_match}')
+    print(f'per-ticker CSVs identical: {len(symbols) - len(mismatched)}/{len(symbols)}')
+    if mismatched:
+        print('mismatched symbols:', ', '.join(mismatched))
@@ -0,0 +1,113 @@
+#!/usr/bin/env python3
+"""Scaling of the process-pool buy-on-dip builders with the worker count.
+
+Reads the stored history (etl-market-data) and proc (etlv2) datasets, optionally
+repeated under new symbol names to mimic a bigger ticker list, and times
+
+  history  bod_engine.build_history_bod_events (etl-market-data all_buy_on_dip.csv)
+  proc     bod_engine.build_bod_tables         (etlv2 all_buy_on_dip.csv + dip days)
+
+for 1, 2, 4, ... workers up to the core count. Every run must produce the same CSV
+bytes as the single-process run; the history output is also checked against the
+original per-row loop (--legacy, slow). Nothing under data/ is written.
+
+    python scripts/bench_bod_parallel.py [copies] [--legacy]
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import bod_engine  # noqa: E402
+import storage  # noqa: E402
+
+DIP_MAX = 30
+STEP = 1
+
+
+def legacy_history_bod(historical_data, dip_max=DIP_MAX, step=STEP):
+    """The original etl-market-data.transform_buy_on_dip_from_historical loop."""
+    all_bod = []
+    for ticker_symbol in historical_data['Symbol'].unique():
+        ticker_data = historical_data[historical_data['Symbol'] == ticker_symbol].copy()
+        ticker_data = ticker_data.sort_values('Date_add')
+        purchased_list = []
+        for _, row in ticker_data.iterrows():
+            previous_close = row['Previous_Close']
+            if pd.isna(previous_close):
+                continue
+            for pct in range(step, dip_max + 1, step):
+                target_price = previous_close * (1.0 - (pct / 100.0))
+                if row['Low'] <= target_price:
+                    executed_level = round((1.0 - (target_price / previous_close)) * 100, 2) if previous_close and previous_close != 0 else None
+                    purchased_list.append({
+                        'Date_add': row['Date_add'], 'Weekday': row['Weekday'], 'Symbol': row['Symbol'],
+                        'Strategy': 'Buy_on_Dip', 'Buy_Price': round(target_price, 6), 'Buy_Level': f"{pct}%",
+                        'Executed_Price': round(target_price, 6), 'Executed_Level': executed_level,
+                        'Shares Purchased': 1, 'Dollars Invested': round(target_price, 6),
+                        'Close': row['Close'], 'Previous_Close': previous_close,
+                    })
+        if not purchased_list:
+            continue
+        df_bod = pd.DataFrame(purchased_list)
+        df_bod = df_bod.sort_values(['Date_add', 'Buy_Price'], ascending=[True, False]).reset_index(drop=True)
+        df_bod['Cumulative Shares'] = df_bod['Shares Purchased'].cumsum()
+        df_bod['Cumulative Invested'] = df_bod['Dollars Invested'].cumsum()
+        df_bod['Cumulative Value'] = (df_bod['Cumulative Shares'] * df_bod['Close']).round(2)
+        all_bod.append(df_bod[bod_engine.HISTORY_BOD_COLUMNS])
+    return pd.concat(all_bod, ignore_index=True) if all_bod else pd.DataFrame()
+
+
+def repeat(df, copies):
+    if copies <= 1:
+        return df
+    sym = df['Symbol'].astype(str)
+    return pd.concat([df.assign(Symbol=sym + str(i)) for i in range(copies)], ignore_index=True)
+
+
+def worker_counts():
+    counts, n = [], 1
+    while n < (os.cpu_count() or 1):
+        counts.append(n)
+        n *= 2
+    return counts + [os.cpu_count() or 1]
+
+
+def timed(fn, *args, **kwargs):
+    t0 = time.perf_counter()
+    result = fn(*args, **kwargs)
+    return time.perf_counter() - t0, result
+
+
+if __name__ == '__main__':
+    args = [a for a in sys.argv[1:] if a != '--legacy']
+    copies = int(args[0]) if args else 1
+    bod_engine.PARALLEL_MIN_ROWS = 0  # time the pool at every size
+    history = repeat(storage.load_dataset('history'), copies)
+    proc = repeat(storage.load_dataset('proc'), copies)
+    symbols = sorted(proc['Symbol'].dropna().unique())
+    print(f'history: {len(history)} rows, proc: {len(proc)} rows, {len(symbols)} symbols, {os.cpu_count()} cores')
+
+    ok = True
+    base = {}
+    print(f'{"workers":>8}{"history":>10}{"speedup":>9}{"proc":>10}{"speedup":>9}  identical')
+    for workers in worker_counts():
+        t_hist, hist = timed(bod_engine.build_history_bod_events, history, DIP_MAX, STEP, workers=workers)
+        t_proc, (dip_days, events, _) = timed(bod_engine.build_bod_tables, proc, symbols, DIP_MAX, STEP, workers=workers)
+        out = (hist.to_csv(index=False), events.to_csv(index=False), dip_days.to_csv(index=False))
+        if workers == 1:
+            base = {'out': out, 'hist': t_hist, 'proc': t_proc}
+        same = out == base['out']
+        ok &= same
+        print(f'{workers:>8}{t_hist:>9.2f}s{base["hist"] / t_hist:>8.1f}x{t_proc:>9.2f}s{base["proc"] / t_proc:>8.1f}x  {same}')
+
+    if '--legacy' in sys.argv:
+        t_old, old = timed(legacy_history_bod, history)
+        same = old.to_csv(index=False) == base['out'][0]
+        ok &= same
+        print(f'per-row loop: {t_old:.2f}s ({t_old / base["hist"]:.0f}x the 1-worker time), identical: {same}')
+    sys.exit(0 if ok else 1)
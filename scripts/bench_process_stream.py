@@ -0,0 +1,103 @@
+#!/usr/bin/env python3
+"""Peak memory of etlv2.process_combined vs the streaming process_streaming.
+
+Copies the stored raw dataset (optionally repeated under new symbol names to
+mimic a bigger ticker list) into two temporary folders, runs each mode in its
+own child process and reports the child's peak RSS. The two etl-data-proc.csv
+exports must hold the same rows, byte for byte. Nothing under data/ is written.
+
+    python scripts/bench_process_stream.py [copies] [--csv]
+
+--csv removes the parquet store from the copies so streaming reads the CSV in
+chunks (the carry across chunk boundaries is exercised). Unix only (resource).
+"""
+
+import os
+import resource
+import shutil
+import subprocess
+import sys
+import tempfile
+import time
+
+import pandas as pd
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+import storage  # noqa: E402
+
+MODES = ('combined', 'streaming')
+
+
+def peak_rss_mb():
+    # VmHWM restarts at exec; ru_maxrss on Linux keeps the parent's peak across it
+    try:
+        with open('/proc/self/status') as f:
+            for line in f:
+                if line.startswith('VmHWM:'):
+                    return int(line.split()[1]) / 1024
+    except OSError:
+        pass
+    peak = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return peak / (1024 * 1024) if sys.platform == 'darwin' else peak / 1024
+
+
+def child(mode, folder, csv_only):
+    import etlv2
+    storage.HAVE_PARQUET = storage.HAVE_PARQUET and not csv_only
+    etlv2.OUTPUT_FOLDER = folder
+    etlv2.PROC_COMBINED_CSV = storage.csv_path('proc', folder)
+    base = peak_rss_mb()
+    t0 = time.perf_counter()
+    if mode == 'combined':
+        etlv2.process_combined()
+    else:
+        # small chunks so the CSV fallback splits symbols across reads
+        etlv2.process_streaming(chunk_rows=1000 if csv_only else storage.CSV_CHUNK_ROWS)
+    print(f'RESULT {peak_rss_mb():.1f} {base:.1f} {time.perf_counter() - t0:.2f}')
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1 and sys.argv[1] == '--child':
+        child(sys.argv[2], sys.argv[3], sys.argv[4] == '1')
+        sys.exit(0)
+
+    args = [a for a in sys.argv[1:] if a != '--csv']
+    csv_only = '--csv' in sys.argv
+    copies = int(args[0]) if args else 1
+    raw = storage.load_dataset('raw')
+    if copies > 1:
+        raw = pd.concat([raw.assign(Symbol=raw['Symbol'] + str(i)) for i in range(copies)], ignore_index=True)
+    print(f"{raw['Symbol'].nunique()} symbols, {len(raw)} raw rows" + (' (CSV only)' if csv_only else ''))
+
+    tmp = tempfile.mkdtemp(prefix='bench_stream_')
+    try:
+        results = {}
+        for mode in MODES:
+            folder = os.path.join(tmp, mode)
+            os.makedirs(folder)
+            storage.save_dataset(raw, 'raw', folder)
+            if csv_only:
+                shutil.rmtree(storage.dataset_path('raw', folder), ignore_errors=True)
+            out = subprocess.run(
+                [sys.executable, os.path.abspath(__file__), '--child', mode, folder, '1' if csv_only else '0'],
+                cwd=tmp, capture_output=True, text=True, check=True,
+            ).stdout
+            peak, base, secs = map(float, out.strip().splitlines()[-1].split()[1:])
+            results[mode] = peak
+            print(f'{mode:10} peak RSS {peak:8.1f} MB (after imports {base:.1f} MB, +{peak - base:.1f} MB) in {secs:.2f}s')
+
+        print(f"peak RSS reduction: {1 - results['streaming'] / results['combined']:.0%}")
+        # the CSV fallback streams symbols in file order; compare symbol by symbol
+        exports = [
+            pd.read_csv(storage.csv_path('proc', os.path.join(tmp, mode)), dtype=str, keep_default_na=False)
+            .sort_values('Symbol', kind='stable')
+            .to_csv(index=False)
+            for mode in MODES
+        ]
+        same = exports[0] == exports[1]
+        print(f'etl-data-proc.csv identical: {same}')
+    finally:
+        shutil.rmtree(tmp, ignore_errors=True)
+    sys.exit(0 if same else 1)
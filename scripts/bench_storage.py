@@ -0,0 +1,49 @@
+#!/usr/bin/env python3
+"""Compare the CSV exports against the parquet store: disk size and load time.
+
+Needs the ETL to have run with pyarrow installed (data/store/ populated).
+"""
+
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+
+REPEAT = 3
+
+
+def dir_size(path):
+    return sum(os.path.getsize(os.path.join(path, f)) for f in os.listdir(path))
+
+
+def best_of(repeat, fn, *args, **kwargs):
+    best = None
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        fn(*args, **kwargs)
+        elapsed = time.perf_counter() - t0
+        best = elapsed if best is None else min(best, elapsed)
+    return best
+
+
+if __name__ == '__main__':
+    if not storage.HAVE_PARQUET:
+        sys.exit('pyarrow is not installed; nothing to compare')
+
+    print(f"{'dataset':<12}{'csv MB':>10}{'store MB':>10}{'csv s':>10}{'store s':>10}{'1 sym s':>10}")
+    for name in storage.DATASETS:
+        manifest = storage.read_manifest(name)
+        csv = storage.csv_path(name)
+        if manifest is None or not os.path.exists(csv):
+            continue
+        csv_mb = os.path.getsize(csv) / 1e6
+        store_mb = dir_size(storage.dataset_path(name)) / 1e6
+        t_csv = best_of(REPEAT, pd.read_csv, csv, float_precision='round_trip')
+        t_store = best_of(REPEAT, storage.load_dataset, name)
+        t_one = best_of(REPEAT, storage.load_dataset, name, symbols=manifest['symbols'][:1])
+        print(f"{name:<12}{csv_mb:>10.2f}{store_mb:>10.2f}{t_csv:>10.3f}{t_store:>10.3f}{t_one:>10.3f}")
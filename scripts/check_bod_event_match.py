@@ -1,17 +1,25 @@
 import pandas as pd
 import math
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import csv_path, dataset_columns, load_dataset  # noqa: E402
 
 # Config
-HIST = 'data/history_tickers.csv'   # legacy
-V2_BOD = 'data/all_buy_on_dip.csv'  # v2 events
+HIST = 'history'   # legacy (data/history_tickers.csv)
+V2_BOD = 'bod'     # v2 events (data/all_buy_on_dip.csv)
 LEVEL_MIN = 5
 LEVEL_MAX = 30
 LEVEL_STEP = 1
 
-print('Loading legacy history:', HIST)
-df_hist = pd.read_csv(HIST)
-print('Loading v2 BOD events:', V2_BOD)
-df_v2 = pd.read_csv(V2_BOD)
+HIST_COLS = ['Date', 'Date_add', 'Symbol', 'Low', 'Close', 'Previous_Close']
+V2_COLS = ['Date', 'Date_add', 'Symbol', 'Buy_Level', 'Executed_Price']
+print('Loading legacy history:', csv_path(HIST))
+df_hist = load_dataset(HIST, columns=[c for c in HIST_COLS if c in dataset_columns(HIST)])
+print('Loading v2 BOD events:', csv_path(V2_BOD))
+df_v2 = load_dataset(V2_BOD, columns=[c for c in V2_COLS if c in dataset_columns(V2_BOD)])
 print('legacy rows=', len(df_hist), 'v2 rows=', len(df_v2))
 
 # Normalize dates and numeric
@@ -1,15 +1,22 @@
 import pandas as pd
 import numpy as np
+import os
+import sys
 
-HIST='data/history_tickers.csv'
-V2='data/all_buy_on_dip.csv'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import dataset_columns, load_dataset  # noqa: E402
+
+HIST='history'  # data/history_tickers.csv
+V2='bod'  # data/all_buy_on_dip.csv
 SYMS=['SPLG','QQQ']
 LEVEL_MIN=5
 LEVEL_MAX=30
 
 print('Loading files...')
-dfh = pd.read_csv(HIST)
-dfv = pd.read_csv(V2)
+# only the compared symbols/columns are read (pushed down to the store)
+dfh = load_dataset(HIST, symbols=SYMS, columns=[c for c in ['Date','Date_add','Symbol','Low','Close','Previous_Close'] if c in dataset_columns(HIST)])
+dfv = load_dataset(V2, symbols=SYMS, columns=[c for c in ['Date','Date_add','Symbol','Buy_Level','Executed_Price'] if c in dataset_columns(V2)])
 print('rows hist=',len(dfh),'v2=',len(dfv))
 
 # normalize Date
@@ -1,10 +1,17 @@
 import pandas as pd
-HIST='data/history_tickers.csv'
-V2='data/all_buy_on_dip.csv'
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import dataset_columns, load_dataset  # noqa: E402
+
+HIST='history'  # data/history_tickers.csv
+V2='bod'  # data/all_buy_on_dip.csv
 LEVEL_MIN=5
 
-h=pd.read_csv(HIST)
-v=pd.read_csv(V2)
+h=load_dataset(HIST, columns=[c for c in ['Date','Date_add','Symbol','Low','Close','Previous_Close'] if c in dataset_columns(HIST)])
+v=load_dataset(V2, columns=[c for c in ['Date','Symbol','Buy_Level'] if c in dataset_columns(V2)])
 print('hist rows',len(h),'v2 rows',len(v))
 if 'Date' not in h.columns and 'Date_add' in h.columns:
     h['Date']=h['Date_add']
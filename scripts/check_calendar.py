@@ -0,0 +1,80 @@
+#!/usr/bin/env python3
+"""Check market_calendar against the per-row week formulas and time both.
+
+Every day from 1990 to 2040 (tz-aware, America/New_York, like yfinance bars)
+goes through the legacy extract_date_components logic from etl-market-data.py
+and the formulas in scripts/financial_weeks.py; market_calendar must agree on
+every row for every convention.
+"""
+
+import os
+import sys
+import time
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from market_calendar import WEEK_CONVENTIONS, calendar_columns, date_strings  # noqa: E402
+
+
+def legacy_components(date_val):
+    """extract_date_components as it was in etl-market-data.py, plus the other conventions."""
+    dt = date_val.to_pydatetime().replace(tzinfo=None)
+    jan_1 = datetime(dt.year, 1, 1)
+    if jan_1.weekday() == 0:
+        first_monday = jan_1
+    else:
+        first_monday = jan_1 + timedelta(days=7 - jan_1.weekday())
+    if dt >= first_monday:
+        financial = min(52, ((dt - first_monday).days // 7) + 1)
+    else:
+        financial = 1
+    return {
+        'year': dt.year,
+        'month': dt.month,
+        'weekday': dt.strftime('%A'),
+        'financial': financial,
+        'iso': dt.isocalendar().week,
+        'us': int(dt.strftime('%U')),
+        'simple': min(52, (dt.timetuple().tm_yday - 1) // 7 + 1),
+    }
+
+
+if __name__ == '__main__':
+    dates = pd.Series(pd.date_range('1990-01-01', '2040-12-31', freq='D', tz='America/New_York'))
+    print(f'{len(dates)} dates')
+
+    legacy = pd.DataFrame(list(dates.apply(legacy_components)))
+    legacy_date_add = dates.apply(lambda x: x.strftime('%Y-%m-%d'))
+
+    ok = True
+    for convention in WEEK_CONVENTIONS:
+        cols = calendar_columns(dates, convention)
+        date_add = date_strings(dates)
+        same = (
+            (cols['Year'].to_numpy() == legacy['year'].to_numpy()).all()
+            and (cols['Month'].to_numpy() == legacy['month'].to_numpy()).all()
+            and (cols['Weekday'].to_numpy() == legacy['weekday'].to_numpy()).all()
+            and (cols['Week'].astype(int).to_numpy() == legacy[convention].astype(int).to_numpy()).all()
+            and (date_add.to_numpy() == legacy_date_add.to_numpy()).all()
+        )
+        ok &= bool(same)
+        print(f'{convention:<10} identical: {same}')
+
+    # timing: the old etl-market-data path (per-row financial week + strftime Date_add) vs the new one
+    t0 = time.perf_counter()
+    comps = dates.apply(legacy_components)
+    [c['financial'] for c in comps]
+    dates.apply(lambda x: x.strftime('%Y-%m-%d'))
+    t_legacy = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    calendar_columns(dates, 'financial')
+    date_strings(dates)
+    t_new = time.perf_counter() - t0
+
+    print(f'\nper-row   : {t_legacy:8.3f}s')
+    print(f'vectorized: {t_new:8.3f}s')
+    print(f'speedup   : {t_legacy / t_new:8.1f}x')
+    sys.exit(0 if ok else 1)
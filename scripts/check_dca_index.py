@@ -0,0 +1,86 @@
+#!/usr/bin/env python3
+"""Check the DCA schedule index against the pages' week-by-week DCA loop.
+
+Builds dca_index for every symbol of the stored history, then replays random date
+windows x schedules x amounts with a port of pages/dca-strat.html calculateDCA
+(first target weekday on/after the start, every 7 days, nearest trading day inside
+the window) and compares buys, shares and value. Monthly schedules use the first
+target weekday of each month. Windows end at most DCA_TARGET_SLACK days past the
+last bar: beyond that the page's loop keeps buying the last bar for every target
+while the index stops (no price for those dates). Also times the index build
+against the loop run once per symbol x schedule over the full history.
+
+    python scripts/check_dca_index.py [windows]
+
+Needs data/history_tickers.csv (run etl-market-data.py).
+"""
+
+import os
+import random
+import sys
+import time
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import dca_engine  # noqa: E402
+import storage  # noqa: E402
+from dca_index import build_dca_indexes  # noqa: E402
+
+
+def page_dca(day, price, close, weekday, start, end, amount, monthly=False):
+    """(buys, shares, value) the page's loop gives for one symbol's priced days."""
+    inside = (day >= start) & (day <= end)
+    day, price, close = day[inside], price[inside], close[inside]
+    if len(day) == 0:
+        return 0, 0.0, 0.0
+    if monthly:
+        targets = dca_engine.target_days(start, end, 'M', weekday)
+    else:
+        first = start + (weekday - (start + 3)) % 7
+        targets = range(first, end + 1, 7)
+    buys, shares, last = 0, 0.0, None
+    for target in targets:
+        last = int(np.argmin(np.abs(day - target)))  # earlier day on a tie
+        shares += amount / price[last]
+        buys += 1
+    return buys, shares, shares * close[last] if last is not None else 0.0
+
+
+if __name__ == '__main__':
+    windows = int(sys.argv[1]) if len(sys.argv) > 1 else 500
+    history = storage.load_dataset('history')
+    t0 = time.perf_counter()
+    indexes = build_dca_indexes(history, date_col='Date_add')
+    t_index = time.perf_counter() - t0
+    days = dca_engine.priced_days(history, date_col='Date_add')
+    per_symbol = {sym: (g['Day'].to_numpy(), g['Buy_Price'].to_numpy(), g['Close'].to_numpy()) for sym, g in days.groupby('Symbol')}
+    schedules = dca_engine.schedule_keys()
+
+    rng = random.Random(0)
+    bad = 0
+    for _ in range(windows):
+        sym = rng.choice(sorted(indexes))
+        schedule = rng.choice(schedules)
+        cadence, weekday = schedule.split('-')
+        index = indexes[sym]
+        start = rng.randint(int(index.days[0]) - 5, int(index.days[-1]))
+        end = min(start + rng.choice([3, 30, 365, 5 * 365, 20 * 365]), int(index.days[-1]) + dca_engine.DCA_TARGET_SLACK)
+        amount = rng.choice([25.0, 100.0, 37.5])
+        got = index.query(schedule, start, end, amount)
+        want = page_dca(*per_symbol[sym], dca_engine.DCA_WEEKDAYS.index(weekday), start, end, amount, cadence == 'M')
+        if got['buys'] != want[0] or not np.isclose(got['shares'], want[1], rtol=1e-10) or not np.isclose(got['value'], want[2], rtol=1e-10):
+            bad += 1
+            print(f'MISMATCH {sym} {schedule} {start}..{end}: index {got} loop {want}')
+
+    t0 = time.perf_counter()
+    for sym, (day, price, close) in per_symbol.items():
+        for schedule in schedules:
+            cadence, weekday = schedule.split('-')
+            page_dca(day, price, close, dca_engine.DCA_WEEKDAYS.index(weekday), int(day[0]), int(day[-1]), 25.0, cadence == 'M')
+    t_loop = time.perf_counter() - t0
+
+    print(f'{len(indexes)} symbols x {len(schedules)} schedules: index build {t_index:.2f}s, week-by-week loop {t_loop:.2f}s')
+    print(f'{windows} random windows, {bad} mismatches')
+    sys.exit(1 if bad else 0)
@@ -0,0 +1,68 @@
+#!/usr/bin/env python3
+"""Memory of the processed table with and without the schema.py dtypes, and a
+check that buy-on-dip results do not move.
+
+    python scripts/check_proc_schema.py
+
+"legacy" is the frame the ETL used to hold: Python str Symbol / Weekday / Date,
+int64 calendar columns and object percent columns (pd.NA + floats). "compact" is
+storage.load_dataset('proc') with schema.PROC_SCHEMA applied. The BOD events
+built from both must agree (prices within 1e-9, everything else exactly) and
+the float32 percent columns must stay within half a cent of the float64 values.
+"""
+
+import os
+import sys
+
+import numpy as np
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from bod_engine import build_bod_events  # noqa: E402
+from schema import PROC_SCHEMA, memory_per_million  # noqa: E402
+
+PCT_COLUMNS = [c for c, t in PROC_SCHEMA.items() if t == 'float32']
+
+
+def legacy_frame(compact):
+    df = pd.DataFrame({c: compact[c] for c in compact.columns})
+    for col in ('Date', 'Symbol', 'Weekday'):
+        df[col] = pd.Series(compact[col].astype(str).to_numpy(dtype=object), index=compact.index, dtype=object)
+    for col in ('Year', 'Month', 'Week'):
+        df[col] = compact[col].astype('int64')
+    df['Volume'] = compact['Volume'].astype('float64')
+    for col in PCT_COLUMNS:
+        values = compact[col].astype('float64').round(2).to_numpy(dtype=object)
+        values[pd.isna(values)] = pd.NA
+        df[col] = pd.Series(values, index=compact.index, dtype=object)
+    return df
+
+
+if __name__ == '__main__':
+    compact = storage.load_dataset('proc')
+    legacy = legacy_frame(compact)
+    before, after = memory_per_million(legacy), memory_per_million(compact)
+    print(f'{len(compact)} rows, {compact["Symbol"].nunique()} symbols')
+    print(f'legacy dtypes : {before:8.1f} MB per million rows')
+    print(f'schema dtypes : {after:8.1f} MB per million rows ({before / after:.1f}x smaller)')
+    for col in compact.columns:
+        print(f'  {col:24}{str(legacy[col].dtype):>10} -> {str(compact[col].dtype)}')
+
+    ok = True
+    for col in PCT_COLUMNS:
+        diff = np.nanmax(np.abs(compact[col].to_numpy(dtype=float) - pd.to_numeric(legacy[col]).to_numpy(dtype=float)))
+        ok &= bool(diff <= 0.005)
+        print(f'{col}: max |float32 - float64| = {diff:.2e}')
+
+    symbols = sorted(compact['Symbol'].dropna().unique())
+    old, _ = build_bod_events(legacy, symbols)
+    new, _ = build_bod_events(compact, symbols)
+    numeric = [c for c in old.columns if pd.api.types.is_float_dtype(old[c])]
+    same_shape = old.shape == new.shape
+    close = same_shape and all(np.allclose(old[c], new[c], rtol=0, atol=1e-9, equal_nan=True) for c in numeric)
+    exact = same_shape and old.drop(columns=numeric).astype(str).equals(new.drop(columns=numeric).astype(str))
+    print(f'BOD events: {len(old)} legacy vs {len(new)} compact, prices within 1e-9: {close}, other columns equal: {exact}')
+    ok &= close and exact
+    sys.exit(0 if ok else 1)
@@ -0,0 +1,58 @@
+#!/usr/bin/env python3
+"""Check that the incremental summary cube update matches a full rebuild.
+
+Builds the cube as of the previous trading day, then moves it to the latest day
+incrementally and compares every row with a from-scratch build.
+
+    python scripts/check_summary_cube.py [copies]
+
+`copies` (default 1) repeats every symbol under new names to time larger universes.
+Needs data/history_tickers.csv and data/all_buy_on_dip.csv (run etl-market-data.py).
+"""
+
+import json
+import os
+import sys
+import time
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from summary_cube import build_summary_cube  # noqa: E402
+
+
+def replicate(df, copies):
+    if copies <= 1:
+        return df
+    return pd.concat([df.assign(Symbol=df['Symbol'] + str(i)) for i in range(copies)], ignore_index=True)
+
+
+if __name__ == '__main__':
+    copies = int(sys.argv[1]) if len(sys.argv) > 1 else 1
+    history = replicate(storage.load_dataset('history'), copies)
+    bod = replicate(storage.load_dataset('bod'), copies)
+    history['Date_add'] = history['Date_add'].astype(str)
+    bod['Date_add'] = bod['Date_add'].astype(str)
+    days = sorted(history['Date_add'].unique())
+    if len(days) < 2:
+        sys.exit('need at least two trading days of history')
+    print(f"{history['Symbol'].nunique()} symbols, {len(history)} history rows, {len(bod)} events")
+
+    previous, _ = build_summary_cube(history[history['Date_add'] <= days[-2]], bod[bod['Date_add'] <= days[-2]])
+    previous = json.loads(json.dumps(previous))  # as read back from data/summary-cube.json
+
+    t0 = time.perf_counter()
+    full, _ = build_summary_cube(history, bod)
+    t_full = time.perf_counter() - t0
+    t0 = time.perf_counter()
+    incremental, stats = build_summary_cube(history, bod, previous=previous)
+    t_inc = time.perf_counter() - t0
+
+    same = full['rows'] == incremental['rows']
+    print(f"{days[-2]} -> {days[-1]}: {len(full['rows'])} rows")
+    print(f"full rebuild {t_full:.3f}s, incremental {t_inc:.3f}s "
+          f"({stats['incremental']} symbols updated, {stats['rebuilt']} rebuilt)")
+    print(f"identical: {same}")
+    sys.exit(0 if same else 1)
@@ -1,13 +1,19 @@
 import pandas as pd
+import os
+import sys
 
-BOD='data/all_buy_on_dip.csv'
-PROC='data/etl-data-proc.csv'
-HIST='data/history_tickers.csv'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import load_dataset  # noqa: E402
+
+BOD='bod'  # data/all_buy_on_dip.csv
+PROC='proc'  # data/etl-data-proc.csv
+HIST='history'  # data/history_tickers.csv
 
 print('Reading files...')
-df_bod = pd.read_csv(BOD)
-df_proc = pd.read_csv(PROC)
-df_hist = pd.read_csv(HIST)
+df_bod = load_dataset(BOD)
+df_proc = load_dataset(PROC)
+df_hist = load_dataset(HIST)
 
 print('\nHeaders:')
 print('all_buy_on_dip.csv:', list(df_bod.columns))
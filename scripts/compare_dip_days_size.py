@@ -0,0 +1,55 @@
+#!/usr/bin/env python3
+"""Compare the compact dip-day store with one row per fill (all_buy_on_dip.csv).
+
+Builds both from the processed dataset in memory, checks that expanding the dip
+days (after a CSV round trip) gives back the same event CSV, and prints raw and
+gzip sizes. Also reports the size of the data/ files written by the last ETL run.
+
+    python scripts/compare_dip_days_size.py
+"""
+
+import gzip
+import io
+import os
+import sys
+
+import pandas as pd
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from bod_engine import build_dip_days, expand_dip_days  # noqa: E402
+
+DIP_MAX = 30
+STEP = 1
+
+
+def sizes(data):
+    return len(data), len(gzip.compress(data))
+
+
+if __name__ == '__main__':
+    proc = storage.load_dataset('proc')
+    symbols = sorted(proc['Symbol'].dropna().unique())
+    dip_days = build_dip_days(proc, symbols, DIP_MAX, STEP)
+    events, _ = expand_dip_days(dip_days, STEP, symbols)
+
+    events_csv = events.to_csv(index=False).encode()
+    days_csv = dip_days.to_csv(index=False).encode()
+    restored = pd.read_csv(io.BytesIO(days_csv), float_precision='round_trip')
+    same = expand_dip_days(restored, STEP, symbols)[0].to_csv(index=False).encode() == events_csv
+
+    print(f'{len(symbols)} symbols, {len(proc)} trading days, {len(dip_days)} dip days, {len(events)} fills '
+          f'({len(events) / max(len(dip_days), 1):.1f} per dip day)')
+    (ev_raw, ev_gz), (dd_raw, dd_gz) = sizes(events_csv), sizes(days_csv)
+    print(f'{"":24}{"csv":>12}{"gzip":>12}')
+    print(f'{"one row per fill":24}{ev_raw:>12,}{ev_gz:>12,}')
+    print(f'{"dip days":24}{dd_raw:>12,}{dd_gz:>12,}')
+    print(f'{"ratio":24}{ev_raw / max(dd_raw, 1):>11.1f}x{ev_gz / max(dd_gz, 1):>11.1f}x')
+
+    for name in ('bod', 'dipdays'):
+        path = storage.csv_path(name)
+        if os.path.exists(path):
+            print(f'{path}: {os.path.getsize(path):,} bytes')
+    print(f'expanded dip days identical: {same}')
+    sys.exit(0 if same else 1)
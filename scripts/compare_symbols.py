@@ -1,12 +1,20 @@
 import pandas as pd
+import os
+import sys
 
-HIST='data/history_tickers.csv'
-HIST_V2='data/history_tickers_v2.csv'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import dataset_columns, load_dataset  # noqa: E402
+
+HIST='history'  # data/history_tickers.csv
+HIST_V2='history_v2'  # data/history_tickers_v2.csv (scripts/make_history_v2.py)
 SYMBOLS=['SPLG','QQQ']
 
 print('Loading files...')
-df1 = pd.read_csv(HIST, dtype=str)
-df2 = pd.read_csv(HIST_V2, dtype=str)
+# typed store: numeric columns come back numeric, only the compared symbols are read
+COLS=['Date','Date_add','Symbol','Open','High','Low','Close','Previous_Close','avg_daily_price']
+df1 = load_dataset(HIST, symbols=SYMBOLS, columns=[c for c in COLS if c in dataset_columns(HIST)])
+df2 = load_dataset(HIST_V2, symbols=SYMBOLS, columns=[c for c in COLS if c in dataset_columns(HIST_V2)])
 
 # normalize Date column
 for df in (df1, df2):
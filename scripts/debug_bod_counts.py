@@ -1,6 +1,13 @@
 import pandas as pd
-v2 = pd.read_csv('data/all_buy_on_dip.csv')
-print('v2 columns:', list(v2.columns))
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import dataset_columns, load_dataset  # noqa: E402
+
+print('v2 columns:', dataset_columns('bod'))
+v2 = load_dataset('bod', columns=[c for c in ['Date','Buy_Level','Executed_Price'] if c in dataset_columns('bod')])
 print('rows:', len(v2))
 if 'Buy_Level' in v2.columns:
     print('Buy_Level dtype:', v2['Buy_Level'].dtype)
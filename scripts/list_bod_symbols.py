@@ -1,6 +1,12 @@
 import pandas as pd
-p='data/all_buy_on_dip.csv'
-df=pd.read_csv(p)
+import os
+import sys
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from storage import load_dataset  # noqa: E402
+
+df=load_dataset('bod', columns=['Symbol'])
 print('rows',len(df))
 syms=sorted(df['Symbol'].unique())
 print(len(syms),'symbols')
@@ -1,10 +1,16 @@
 import pandas as pd
+import os
+import sys
 
-PROC='data/etl-data-proc.csv'
-OUT='data/history_tickers_v2.csv'
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-print('Loading', PROC)
-df = pd.read_csv(PROC, dtype=str)
+from storage import csv_path, load_dataset, save_dataset  # noqa: E402
+
+PROC='proc'  # data/etl-data-proc.csv
+OUT='history_v2'  # data/history_tickers_v2.csv
+
+print('Loading', csv_path(PROC))
+df = load_dataset(PROC)
 # ensure expected columns exist
 # PROC has: Date,Open,High,Low,Close,Volume,Symbol,Year,Month,Week,Weekday,avg_daily_price,Previous_Close,...
 # Target legacy schema:
@@ -42,6 +48,6 @@ out['Month'] = df.get('Month', '')
 out['Week'] = df.get('Week', '')
 out['avg_daily_price'] = df.get('avg_daily_price', '')
 
-print('Writing', OUT)
-out.to_csv(OUT, index=False)
-print('Wrote', OUT, 'rows', len(out))
+print('Writing', csv_path(OUT))
+save_dataset(out, OUT)
+print('Wrote', csv_path(OUT), 'rows', len(out))
@@ -1,7 +1,14 @@
 import csv
+import os
+import sys
 from datetime import datetime
 
-HIST = r"c:\Apps\gh\analysis-stockmarket\data\history_tickers.csv"
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import storage  # noqa: E402
+from bod_index import build_prefix_indexes, events_from_history  # noqa: E402
+
+HIST = storage.csv_path('history')
 
 PERIODS = {
     'YTD': ('2025-01-01', '2025-09-01'),
@@ -72,12 +79,22 @@ def simulate_events(rows, start_date, end_date):
 
 if __name__ == '__main__':
     print('Running BOD history-based simulation for symbols:', ', '.join(SYMBOLS))
+    # Prefix-sum index over the same fills: each period is two binary searches
+    history = storage.load_dataset('history', symbols=SYMBOLS)
+    history['Date_add'] = history['Date_add'].astype(str)
+    indexes = build_prefix_indexes(events_from_history(history))
     for sym in SYMBOLS:
         print('\nSymbol:', sym)
-        rows = load_history_for_symbol(sym)
-        if not rows:
+        index = indexes.get(sym)
+        if index is None:
             print(' No history rows found for', sym)
             continue
+        rows = load_history_for_symbol(sym) if os.path.exists(HIST) else None
         for pname, (s,e) in PERIODS.items():
-            ev, sh, inv = simulate_events(rows, s, e)
-            print(f" {pname}: events={ev}, shares={sh}, invested={inv:.2f}")
+            q = index.query(s, e)
+            line = f" {pname}: events={q['events']}, shares={q['shares']:.0f}, invested={q['invested']:.2f}"
+            if rows:
+                # cross-check against the row-by-row simulation
+                ev, sh, inv = simulate_events(rows, s, e)
+                line += ' OK' if (ev, sh) == (q['events'], q['shares']) and abs(inv - q['invested']) < 1e-6 else f' MISMATCH (simulated {ev}, {sh}, {inv:.2f})'
+            print(line)
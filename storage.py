@@ -0,0 +1,309 @@
+import json
+import os
+import shutil
+
+import pandas as pd
+
+from schema import DATASET_SCHEMAS, apply_schema
+
+try:
+    import pyarrow  # noqa: F401  (pandas picks it up as the parquet engine)
+    HAVE_PARQUET = True
+except ImportError:
+    HAVE_PARQUET = False
+
+# =============================
+# COLUMNAR STORE
+#  - every dataset is written as typed, zstd-compressed parquet, one file per Symbol:
+#      data/store/<name>/<SYMBOL>.parquet + _manifest.json (symbol order, columns, rows)
+#    rows without a Symbol go to <NO_SYMBOL>.parquet and are read back with the rest
+#  - the legacy CSV (data/<csv>) is still written as a compatibility export; it is what
+#    the repo commits. The store is a local, gitignored copy: the manifest keeps the
+#    CSV's size and mtime, and a store whose CSV changed since (a pull, another ETL)
+#    is ignored in favour of the CSV until the next write
+#  - readers project columns and push Symbol/Date predicates down (Symbol selects
+#    files, Date is filtered inside parquet); without pyarrow they fall back to the CSV
+#  - datasets with a declared schema (schema.DATASET_SCHEMAS) come back with compact dtypes
+#  - iter_dataset / PartitionWriter stream a dataset one symbol at a time so a stage
+#    never holds more than one symbol's rows
+# =============================
+DATA_FOLDER = "data"
+STORE_FOLDER = "store"
+MANIFEST_FILE = "_manifest.json"
+NO_SYMBOL = "_no_symbol"  # partition of the rows without a Symbol (not listed in "symbols")
+COMPRESSION = "zstd"
+CSV_CHUNK_ROWS = 100_000  # rows per read when streaming the CSV fallback
+
+# dataset name -> compatibility CSV file name
+DATASETS = {
+    "raw": "etl-data-raw.csv",
+    "proc": "etl-data-proc.csv",
+    "bod": "all_buy_on_dip.csv",
+    "dipdays": "bod_dip_days.csv",
+    "history": "history_tickers.csv",
+    "history_v2": "history_tickers_v2.csv",
+}
+
+
+def csv_path(name, folder=DATA_FOLDER):
+    return os.path.join(folder, DATASETS[name])
+
+
+def dataset_path(name, folder=DATA_FOLDER):
+    return os.path.join(folder, STORE_FOLDER, name)
+
+
+def _typed(df):
+    """Convert object columns that only hold numbers/NA (e.g. pd.NA-initialized percent columns) to numeric."""
+    df = df.copy()
+    for col in df.columns:
+        if df[col].dtype == object:
+            try:
+                df[col] = pd.to_numeric(df[col])
+            except (ValueError, TypeError):
+                pass
+    return df
+
+
+def _write_partition(path, sym, df):
+    df.to_parquet(os.path.join(path, f"{sym}.parquet"), compression=COMPRESSION, index=False)
+
+
+def _csv_stamp(name, folder):
+    """Size and mtime of the CSV export (None when it does not exist)."""
+    try:
+        st = os.stat(csv_path(name, folder))
+    except OSError:
+        return None
+    return {"bytes": st.st_size, "mtime_ns": st.st_mtime_ns}
+
+
+def _write_manifest(path, manifest, name, folder, wrote_csv):
+    if wrote_csv:
+        manifest["csv"] = _csv_stamp(name, folder)
+    with open(os.path.join(path, MANIFEST_FILE), "w") as f:
+        json.dump(manifest, f, indent=2)
+
+
+def _partitions(manifest, symbols=None):
+    """Partition names to read: the wanted symbols in stored order, plus the rows
+    without a Symbol when reading everything."""
+    if symbols is not None:
+        wanted = set(symbols)
+        return [s for s in manifest["symbols"] if s in wanted]
+    return manifest["symbols"] + ([NO_SYMBOL] if manifest.get("no_symbol_rows") else [])
+
+
+def save_dataset(df, name, folder=DATA_FOLDER, write_csv=True):
+    """Write df to the columnar store (one parquet file per Symbol) and the CSV export."""
+    write_csv = write_csv or not HAVE_PARQUET
+    if write_csv:
+        df.to_csv(csv_path(name, folder), index=False)
+    if HAVE_PARQUET:
+        path = dataset_path(name, folder)
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+        typed = _typed(df)
+        manifest = {"symbols": [], "columns": [str(c) for c in df.columns], "rows": int(len(df))}
+        # one pass over the rows; groups in order of first appearance, rows in file order
+        groups = typed.groupby("Symbol", sort=False, dropna=False, observed=True) if "Symbol" in typed.columns else [(None, typed)]
+        for sym, part in groups:
+            if pd.isna(sym):
+                if len(part):
+                    _write_partition(path, NO_SYMBOL, part)
+                    manifest["no_symbol_rows"] = int(len(part))
+            else:
+                _write_partition(path, sym, part)
+                manifest["symbols"].append(str(sym))
+        _write_manifest(path, manifest, name, folder, write_csv)
+
+
+def read_manifest(name, folder=DATA_FOLDER):
+    """The store's manifest, or None when there is no store or its CSV changed since."""
+    path = os.path.join(dataset_path(name, folder), MANIFEST_FILE)
+    if not os.path.exists(path):
+        return None
+    with open(path) as f:
+        manifest = json.load(f)
+    stamp, current = manifest.get("csv"), _csv_stamp(name, folder)
+    if stamp is not None and current is not None and stamp != current:
+        return None  # the CSV was replaced: the store is stale
+    return manifest
+
+
+def dataset_columns(name, folder=DATA_FOLDER):
+    """Column names of a dataset without loading it (manifest, else the CSV header)."""
+    manifest = read_manifest(name, folder) if HAVE_PARQUET else None
+    if manifest is not None:
+        return manifest["columns"]
+    return list(pd.read_csv(csv_path(name, folder), nrows=0).columns)
+
+
+def dataset_exists(name, folder=DATA_FOLDER):
+    if HAVE_PARQUET and read_manifest(name, folder) is not None:
+        return True
+    return os.path.exists(csv_path(name, folder))
+
+
+def _compact(name, df):
+    schema = DATASET_SCHEMAS.get(name)
+    return apply_schema(df, schema) if schema else df
+
+
+def load_dataset(name, folder=DATA_FOLDER, columns=None, symbols=None, start=None, end=None, date_col="Date"):
+    """Read a dataset with optional column projection and Symbol / date-range predicates.
+
+    start/end are inclusive YYYY-MM-DD strings compared against `date_col`.
+    Rows come back grouped by symbol in the order they were written.
+    """
+    manifest = read_manifest(name, folder) if HAVE_PARQUET else None
+    if manifest is not None:
+        wanted = _partitions(manifest, symbols)
+        filters = []
+        if start is not None:
+            filters.append((date_col, ">=", start))
+        if end is not None:
+            filters.append((date_col, "<=", end))
+        cols = list(columns) if columns is not None else manifest["columns"]
+        read_cols = cols + [date_col] if filters and date_col not in cols else cols
+        parts = [
+            pd.read_parquet(os.path.join(dataset_path(name, folder), f"{sym}.parquet"), columns=read_cols, filters=filters or None)
+            for sym in wanted
+        ]
+        if not parts:
+            return pd.DataFrame(columns=cols)
+        return _compact(name, pd.concat(parts, ignore_index=True)[cols])
+
+    # CSV fallback: same projection / predicates, applied after parsing
+    path = csv_path(name, folder)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{name} dataset not found ({dataset_path(name, folder)} or {path})")
+    usecols = None
+    if columns is not None:
+        usecols = list(columns)
+        for extra in (["Symbol"] if symbols is not None else []) + ([date_col] if start or end else []):
+            if extra not in usecols:
+                usecols.append(extra)
+    df = pd.read_csv(path, usecols=usecols, float_precision="round_trip")
+    if symbols is not None:
+        df = df[df["Symbol"].isin(list(symbols))]
+    if start is not None:
+        df = df[df[date_col].astype(str) >= start]
+    if end is not None:
+        df = df[df[date_col].astype(str) <= end]
+    if columns is not None:
+        df = df[list(columns)]
+    return _compact(name, df.reset_index(drop=True))
+
+
+def dataset_symbols(name, folder=DATA_FOLDER):
+    """Symbols in stored order from the manifest, or None when only the CSV exists."""
+    manifest = read_manifest(name, folder) if HAVE_PARQUET else None
+    return manifest["symbols"] if manifest is not None else None
+
+
+def iter_dataset(name, folder=DATA_FOLDER, columns=None, symbols=None, chunk_rows=CSV_CHUNK_ROWS):
+    """Yield (symbol, rows) one symbol at a time.
+
+    From the store every parquet file is one piece, read in `symbols` order (stored
+    order by default). The CSV fallback reads chunk_rows lines at a time in file
+    order, so one symbol can arrive as several consecutive pieces.
+    """
+    manifest = read_manifest(name, folder) if HAVE_PARQUET else None
+    if manifest is not None:
+        stored = set(manifest["symbols"])
+        for sym in _partitions(manifest) if symbols is None else [s for s in symbols if s in stored]:
+            part = pd.read_parquet(os.path.join(dataset_path(name, folder), f"{sym}.parquet"), columns=columns)
+            yield (float("nan") if sym == NO_SYMBOL else sym), _compact(name, part)
+        return
+
+    path = csv_path(name, folder)
+    if not os.path.exists(path):
+        raise FileNotFoundError(f"{name} dataset not found ({dataset_path(name, folder)} or {path})")
+    usecols = None if columns is None else list(dict.fromkeys(["Symbol"] + list(columns)))
+    wanted = None if symbols is None else set(symbols)
+    for chunk in pd.read_csv(path, usecols=usecols, chunksize=chunk_rows, float_precision="round_trip"):
+        sym_col = chunk["Symbol"].to_numpy()
+        starts = [0] + [i for i in range(1, len(chunk)) if sym_col[i] != sym_col[i - 1]] + [len(chunk)]
+        for lo, hi in zip(starts[:-1], starts[1:]):
+            if wanted is None or sym_col[lo] in wanted:
+                part = chunk.iloc[lo:hi].reset_index(drop=True)
+                yield sym_col[lo], _compact(name, part if columns is None else part[list(columns)])
+
+
+class PartitionWriter:
+    """Write a dataset piece by piece (same layout as save_dataset).
+
+    Consecutive pieces of one symbol are joined into its parquet file when the next
+    symbol starts; the CSV export is appended as pieces arrive. The manifest is
+    only written by close(), so an interrupted run leaves no half-valid store.
+    """
+
+    def __init__(self, name, folder=DATA_FOLDER, write_csv=True):
+        self.name = name
+        self.folder = folder
+        self.write_csv = write_csv or not HAVE_PARQUET
+        self.symbols = []
+        self.columns = None
+        self.rows = 0
+        self._pending = []
+        self._no_symbol = []
+        self._csv = None
+        if HAVE_PARQUET:
+            self.path = dataset_path(name, folder)
+            shutil.rmtree(self.path, ignore_errors=True)
+            os.makedirs(self.path, exist_ok=True)
+
+    def write(self, df):
+        if df.empty:
+            return
+        sym = df["Symbol"].iloc[0]
+        if self.columns is None:
+            self.columns = [str(c) for c in df.columns]
+        if pd.isna(sym):
+            self._no_symbol.append(df)  # written by close()
+        else:
+            if self._pending and self._pending[0]["Symbol"].iloc[0] != sym:
+                self._flush()
+            self._pending.append(df)
+        self.rows += len(df)
+        if self.write_csv:
+            if self._csv is None:
+                self._csv = open(csv_path(self.name, self.folder), "w", newline="")
+                df.to_csv(self._csv, index=False)
+            else:
+                df.to_csv(self._csv, index=False, header=False)
+
+    def _flush(self):
+        if not self._pending:
+            return
+        sym = self._pending[0]["Symbol"].iloc[0]
+        if HAVE_PARQUET:
+            part = self._pending[0] if len(self._pending) == 1 else pd.concat(self._pending, ignore_index=True)
+            _write_partition(self.path, sym, _typed(part))
+        self.symbols.append(str(sym))
+        self._pending = []
+
+    def close(self):
+        self._flush()
+        if self._csv is not None:
+            self._csv.close()
+        elif self.write_csv:
+            pd.DataFrame(columns=self.columns or []).to_csv(csv_path(self.name, self.folder), index=False)
+        if HAVE_PARQUET:
+            manifest = {"symbols": self.symbols, "columns": self.columns or [], "rows": int(self.rows)}
+            if self._no_symbol:
+                part = pd.concat(self._no_symbol, ignore_index=True)
+                _write_partition(self.path, NO_SYMBOL, _typed(part))
+                manifest["no_symbol_rows"] = int(len(part))
+            _write_manifest(self.path, manifest, self.name, self.folder, self.write_csv)
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc, tb):
+        if exc_type is None:
+            self.close()
+        elif self._csv is not None:
+            self._csv.close()
+        return False
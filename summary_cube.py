@@ -0,0 +1,347 @@
+import hashlib
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from dca_engine import WEEKLY_INVESTMENT
+from market_calendar import PERIODS, period_start
+
+# =============================
+# SUMMARY CUBE (symbol x strategy x period x dip level)
+#  - data/summary-cube.json holds invested / shares / value / gain % / event count for
+#    every symbol and period button, so the pages' overview grids need no simulation
+#  - BOD cells sum the all_buy_on_dip events inside the period (same rows the pages'
+#    ALL view filters), one cell per Buy_Level plus an "ALL" level
+#  - DCA cells replay pages/dca.html calculateWeeklyDCA: $25 on the trading day closest
+#    to every Monday of the period (level is null)
+#  - symbol "ALL" rows aggregate every symbol like the pages' ALL metrics
+#  - periods end at the latest history date; when a run only appends days the BOD cells
+#    are updated from the events that left / entered each window instead of re-summed
+# =============================
+CUBE_JSON = os.path.join("data", "summary-cube.json")
+CUBE_VERSION = 1
+ALL = "ALL"
+CUBE_COLUMNS = [
+    "symbol",
+    "strategy",
+    "period",
+    "level",
+    "events",
+    "shares",
+    "invested",
+    "value",
+    "gain_pct",
+    "last_date",
+    "last_close",
+]
+CELL_FIELDS = ["events", "shares", "cents", "last_day", "last_close"]
+
+
+def _epoch_days(dates):
+    """YYYY-MM-DD values -> int64 days since 1970-01-01 (-1 for missing/unparseable)."""
+    values = pd.Series(dates)
+    try:
+        d = pd.to_datetime(values, format="%Y-%m-%d")
+    except (ValueError, TypeError):
+        d = pd.to_datetime(values, errors="coerce")
+    if d.dt.tz is not None:
+        d = d.dt.tz_localize(None)
+    d = d.to_numpy(dtype="datetime64[D]")
+    days = d.astype(np.int64)
+    days[np.isnat(d)] = -1
+    return days
+
+
+def _day_string(day):
+    return str(np.datetime64(int(day), "D"))
+
+
+def _period_bounds(end_day, periods=PERIODS):
+    end = pd.Timestamp(_day_string(end_day))
+    return {p: int(_epoch_days([period_start(end, p)])[0]) for p in periods}
+
+
+def _bod_frame(bod_df):
+    """Event rows as (Symbol, day, level, shares, cents, close), sorted by symbol, day, level."""
+    frame = pd.DataFrame(
+        {
+            "Symbol": bod_df["Symbol"].astype(str).to_numpy(),
+            "day": _epoch_days(bod_df["Date_add"]),
+            "level": pd.to_numeric(bod_df["Buy_Level"].astype(str).str.rstrip("%"), errors="coerce").to_numpy(),
+            "shares": pd.to_numeric(bod_df["Shares Purchased"], errors="coerce").fillna(0).to_numpy(dtype=float),
+            # integer cents keep the incremental sums exact (the CSV rounds dollars to cents)
+            "cents": np.rint(pd.to_numeric(bod_df["Dollars Invested"], errors="coerce").fillna(0).to_numpy() * 100).astype(np.int64),
+            "close": pd.to_numeric(bod_df["Close"], errors="coerce").to_numpy(dtype=float),
+        }
+    )
+    frame = frame[(frame["day"] >= 0) & frame["level"].notna()]
+    frame["level"] = frame["level"].astype(np.int64)
+    return frame.sort_values(["Symbol", "day", "level"], kind="stable").reset_index(drop=True)
+
+
+def _bod_cells(frame, lo, hi):
+    """Per (Symbol, level) sums of the events with lo <= day <= hi."""
+    day = frame["day"].to_numpy()
+    part = frame[(day >= lo) & (day <= hi)]
+    if part.empty:
+        index = pd.MultiIndex.from_arrays([[], []], names=["Symbol", "level"])
+        return pd.DataFrame({c: [] for c in CELL_FIELDS}, index=index)
+    # group rows by (symbol, level) keeping day order inside each group
+    order = np.lexsort((part["day"].to_numpy(), part["level"].to_numpy(), part["Symbol"].to_numpy()))
+    sym, level, day = (part[c].to_numpy()[order] for c in ("Symbol", "level", "day"))
+    starts = np.flatnonzero(np.r_[True, (sym[1:] != sym[:-1]) | (level[1:] != level[:-1])])
+    ends = np.r_[starts[1:], len(order)] - 1
+    return pd.DataFrame(
+        {
+            "events": ends - starts + 1,
+            "shares": np.add.reduceat(part["shares"].to_numpy()[order], starts),
+            "cents": np.add.reduceat(part["cents"].to_numpy()[order], starts),
+            "last_day": day[ends],
+            # value uses the Close of the last event row, as the pages do
+            "last_close": part["close"].to_numpy()[order][ends],
+        },
+        index=pd.MultiIndex.from_arrays([sym[starts], level[starts]], names=["Symbol", "level"]),
+    )
+
+
+def _apply_delta(cells, frame, old_lo, new_lo, old_hi, new_hi):
+    """Move a period window from [old_lo, old_hi] to [new_lo, new_hi] (both edges only move forward)."""
+    removed = _bod_cells(frame, old_lo, new_lo - 1)
+    added = _bod_cells(frame, old_hi + 1, new_hi)
+    index = cells.index.union(removed.index).union(added.index)
+    out = cells.reindex(index)
+    removed = removed.reindex(index)
+    added = added.reindex(index)
+    for col in ("events", "shares", "cents"):
+        out[col] = out[col].fillna(0) - removed[col].fillna(0) + added[col].fillna(0)
+    fresh = added["events"].notna()
+    out.loc[fresh, "last_day"] = added.loc[fresh, "last_day"]
+    out.loc[fresh, "last_close"] = added.loc[fresh, "last_close"]
+    out = out[out["events"] > 0]
+    out["events"] = out["events"].astype(np.int64)
+    out["cents"] = out["cents"].astype(np.int64)
+    out["last_day"] = out["last_day"].astype(np.int64)
+    return out
+
+
+def _fingerprints(frame, end_day):
+    """Symbol -> hash of its events up to end_day (detects rewritten history)."""
+    part = frame[frame["day"] <= end_day]
+    row_hashes = pd.util.hash_pandas_object(part[["day", "level", "shares", "cents", "close"]], index=False).to_numpy()
+    out = {}
+    symbols = part["Symbol"].to_numpy()
+    bounds = np.flatnonzero(np.r_[True, symbols[1:] != symbols[:-1], True]) if len(part) else []
+    for a, b in zip(bounds[:-1], bounds[1:]):
+        out[str(symbols[a])] = hashlib.sha256(row_hashes[a:b].tobytes()).hexdigest()[:16]
+    return out
+
+
+def _cells_from_rows(cube):
+    """Rebuild per-period BOD level cells from a previous cube's rows."""
+    cols = cube["columns"]
+    rows = pd.DataFrame(cube["rows"], columns=cols)
+    rows = rows[(rows["strategy"] == "BOD") & (rows["symbol"] != ALL) & (rows["level"] != ALL)]
+    out = {}
+    for period in cube["periods"]:
+        part = rows[rows["period"] == period]
+        cells = pd.DataFrame(
+            {
+                "events": part["events"].astype(np.int64).to_numpy(),
+                "shares": part["shares"].astype(float).to_numpy(),
+                "cents": np.rint(part["invested"].astype(float).to_numpy() * 100).astype(np.int64),
+                "last_day": _epoch_days(part["last_date"]),
+                "last_close": part["last_close"].astype(float).to_numpy(),
+            },
+            index=pd.MultiIndex.from_arrays([part["symbol"].to_numpy(), part["level"].astype(np.int64).to_numpy()], names=["Symbol", "level"]),
+        )
+        out[period] = cells
+    return out
+
+
+def build_bod_cells(bod_df, end_day, periods=PERIODS, previous=None):
+    """Per-period BOD level cells, updated from `previous` where its events still match.
+
+    Returns (cells_by_period, fingerprints, stats).
+    """
+    frame = _bod_frame(bod_df)
+    bounds = _period_bounds(end_day, periods)
+    prev_state = (previous or {}).get("state", {})
+    prev_end = prev_state.get("end_day")
+    prev_bounds = prev_state.get("starts", {})
+    reusable = set()
+    if previous and prev_end is not None and prev_end <= end_day and set(periods) <= set(prev_bounds) \
+            and all(prev_bounds[p] <= bounds[p] for p in periods):
+        now = _fingerprints(frame, prev_end)
+        reusable = {s for s, h in prev_state.get("fingerprints", {}).items() if now.get(s) == h}
+
+    symbols = sorted(frame["Symbol"].unique())
+    rebuild = [s for s in symbols if s not in reusable]
+    rebuilt = frame[frame["Symbol"].isin(rebuild)]
+    kept = frame[frame["Symbol"].isin(reusable)]
+    prev_cells = _cells_from_rows(previous) if reusable else {}
+
+    cells_by_period = {}
+    for period in periods:
+        parts = [_bod_cells(rebuilt, bounds[period], end_day)]
+        if reusable:
+            old = prev_cells[period]
+            old = old[old.index.get_level_values("Symbol").isin(reusable)]
+            parts.append(_apply_delta(old, kept, prev_bounds[period], bounds[period], prev_end, end_day))
+        cells_by_period[period] = pd.concat(parts).sort_index()
+    stats = {"incremental": len(reusable), "rebuilt": len(rebuild)}
+    return cells_by_period, _fingerprints(frame, end_day), stats
+
+
+def dca_cells(history_df, end_day, periods=PERIODS, weekly_investment=WEEKLY_INVESTMENT):
+    """Weekly DCA totals per symbol and period plus the picked trading days (for the ALL week count)."""
+    cells = []
+    picks_by_period = {p: set() for p in periods}
+    bounds = _period_bounds(end_day, periods)
+    hist = history_df if "_day" in history_df.columns else history_df.assign(_day=_epoch_days(history_df["Date_add"]))
+    hist = hist[hist["_day"] >= 0].sort_values(["Symbol", "_day"], kind="stable")
+    for sym, g in hist.groupby("Symbol", sort=True):
+        days = g["_day"].to_numpy()
+        price = pd.to_numeric(g["avg_daily_price"], errors="coerce").to_numpy(dtype=float)
+        close = pd.to_numeric(g["Close"], errors="coerce").to_numpy(dtype=float)
+        for period in periods:
+            lo = bounds[period]
+            a, b = np.searchsorted(days, lo, side="left"), np.searchsorted(days, end_day, side="right")
+            if a >= b:
+                continue
+            wdays = days[a:b]
+            # Mondays from the first Monday on/after the period start (weekday of day n is (n + 3) % 7, Monday = 0)
+            targets = np.arange(lo + (7 - (lo + 3) % 7) % 7, end_day + 1, 7)
+            if not len(targets):
+                continue
+            # closest trading day, the earlier one on a tie (js/trading-days.js nearest)
+            n = len(wdays)
+            i = np.searchsorted(wdays, targets, side="left")
+            below = np.clip(i - 1, 0, n - 1)
+            above = np.minimum(i, n - 1)
+            before = np.searchsorted(wdays, wdays[below], side="left")
+            take_before = (i == n) | ((i > 0) & ((targets - wdays[below]) <= (wdays[above] - targets)))
+            pick = np.where(take_before, before, above) + a
+            shares = float(np.nansum(weekly_investment / price[pick]))
+            invested = weekly_investment * len(pick)
+            cells.append(
+                {
+                    "symbol": str(sym),
+                    "period": period,
+                    "events": int(len(pick)),
+                    "shares": shares,
+                    "invested": invested,
+                    "value": shares * close[pick[-1]],
+                    "last_day": int(days[pick[-1]]),
+                    "last_close": float(close[pick[-1]]),
+                }
+            )
+            picks_by_period[period].update(days[pick].tolist())
+    return cells, {p: len(v) for p, v in picks_by_period.items()}
+
+
+def _gain(value, invested):
+    return round((value - invested) / invested * 100, 2) if invested > 0 else None
+
+
+def _row(symbol, strategy, period, level, events, shares, invested, value, last_day, last_close):
+    value = None if value is None or np.isnan(value) else float(value)
+    invested = float(invested)
+    return [
+        symbol,
+        strategy,
+        period,
+        level,
+        int(events),
+        round(float(shares), 6),
+        round(invested, 2),
+        None if value is None else round(value, 2),
+        None if value is None else _gain(value, invested),
+        None if last_day is None else _day_string(last_day),
+        None if last_close is None or np.isnan(last_close) else round(float(last_close), 6),
+    ]
+
+
+def _bod_rows(cells, period):
+    """Level rows, per-symbol ALL-level rows and the ALL-symbol row for one period's BOD cells."""
+    if cells.empty:
+        return []
+    sym = cells.index.get_level_values("Symbol").to_numpy()
+    level = cells.index.get_level_values("level").to_numpy()
+    events, shares, cents, last_day, last_close = (cells[c].to_numpy() for c in CELL_FIELDS)
+    rows = [
+        _row(*key)
+        for key in zip(sym, ["BOD"] * len(sym), [period] * len(sym), level.tolist(), events, shares, cents / 100,
+                       shares * last_close, last_day, last_close)
+    ]
+    # ALL level per symbol: totals over levels, valued at the Close of the symbol's latest event
+    starts = np.flatnonzero(np.r_[True, sym[1:] != sym[:-1]])
+    latest = np.lexsort((last_day, np.repeat(np.arange(len(starts)), np.diff(np.r_[starts, len(sym)]))))
+    latest = latest[np.r_[starts[1:], len(sym)] - 1]
+    sym_events = np.add.reduceat(events, starts)
+    sym_shares = np.add.reduceat(shares, starts)
+    sym_invested = np.add.reduceat(cents, starts) / 100
+    sym_value = sym_shares * last_close[latest]
+    for i, s in enumerate(sym[starts]):
+        rows.append(_row(s, "BOD", period, ALL, sym_events[i], sym_shares[i], sym_invested[i], sym_value[i],
+                         last_day[latest[i]], last_close[latest[i]]))
+    rows.append(_row(ALL, "BOD", period, ALL, sym_events.sum(), sym_shares.sum(), sym_invested.sum(),
+                     np.nansum(sym_value), last_day.max(), None))
+    return rows
+
+
+def build_summary_cube(history_df, bod_df, previous=None, periods=PERIODS):
+    """Materialize the summary cube; `previous` (an older cube) enables the incremental BOD path."""
+    history_days = _epoch_days(history_df["Date_add"])
+    end_day = int(history_days.max())
+    if previous and previous.get("version") != CUBE_VERSION:
+        previous = None
+    if bod_df is not None and not bod_df.empty:
+        bod_cells, fingerprints, stats = build_bod_cells(bod_df, end_day, periods, previous)
+    else:
+        bod_cells, fingerprints, stats = {}, {}, {"incremental": 0, "rebuilt": 0}
+    dca, dca_weeks = dca_cells(history_df.assign(_day=history_days), end_day, periods)
+
+    rows = []
+    for period in periods:
+        if period in bod_cells:
+            rows.extend(_bod_rows(bod_cells[period], period))
+        period_dca = [c for c in dca if c["period"] == period]
+        for c in period_dca:
+            rows.append(_row(c["symbol"], "DCA", period, None, c["events"], c["shares"], c["invested"],
+                             c["value"], c["last_day"], c["last_close"]))
+        if period_dca:
+            rows.append(_row(ALL, "DCA", period, None, dca_weeks[period], sum(c["shares"] for c in period_dca),
+                             sum(c["invested"] for c in period_dca), np.nansum([c["value"] for c in period_dca]),
+                             max(c["last_day"] for c in period_dca), None))
+
+    cube = {
+        "version": CUBE_VERSION,
+        "end_date": _day_string(end_day),
+        "periods": list(periods),
+        "weekly_investment": WEEKLY_INVESTMENT,
+        "columns": CUBE_COLUMNS,
+        "rows": rows,
+        "state": {"end_day": end_day, "starts": _period_bounds(end_day, periods), "fingerprints": fingerprints},
+    }
+    return cube, stats
+
+
+def load_summary_cube(path=CUBE_JSON):
+    if not os.path.exists(path):
+        return None
+    try:
+        with open(path) as f:
+            return json.load(f)
+    except (OSError, ValueError):
+        return None
+
+
+def write_summary_cube(history_df, bod_df, path=CUBE_JSON, incremental=True):
+    """Build (incrementally from the cube on disk when possible) and write the summary cube."""
+    previous = load_summary_cube(path) if incremental else None
+    cube, stats = build_summary_cube(history_df, bod_df, previous)
+    with open(path, "w") as f:
+        json.dump(cube, f, separators=(",", ":"))
+    return cube, stats
@@ -0,0 +1,82 @@
+import json
+import os
+
+import numpy as np
+import pandas as pd
+
+from market_calendar import PERIODS, period_start
+
+# =============================
+# WEEKLY METRICS (Python twin of js/weekly-metrics.js)
+#  - rows are bucketed by an integer Monday-start week id: (epoch_day + 3) // 7
+#  - upDays / downDays: Close above / below Open
+#  - mondayFriday: weeks holding both a Monday and a Friday row, success when Friday Close > Monday Close
+#  - weekOverWeek: consecutive weeks present in the data, success when the week's last Close rises
+#  - the ETL precomputes these per symbol and period into data/weekly-metrics-summary.json
+# =============================
+WEEKLY_SUMMARY_JSON = os.path.join("data", "weekly-metrics-summary.json")
+
+
+def week_ids(days):
+    """Monday-start week number for epoch days (1970-01-05 opens week 1)."""
+    return (np.asarray(days, dtype=np.int64) + 3) // 7
+
+
+def _percent(success, total):
+    return round(success / total * 100, 1) if total > 0 else 0
+
+
+def weekly_stats(df, date_col="Date_add"):
+    """Up/down days, Monday->Friday and week-over-week counts for one symbol's rows."""
+    dates = pd.to_datetime(df[date_col], errors="coerce")
+    frame = pd.DataFrame(
+        {
+            "day": dates,
+            "open": pd.to_numeric(df["Open"], errors="coerce").to_numpy(),
+            "close": pd.to_numeric(df["Close"], errors="coerce").to_numpy(),
+            "weekday": df["Weekday"].to_numpy() if "Weekday" in df.columns else dates.dt.day_name().to_numpy(),
+        }
+    )
+    up = int((frame["close"] > frame["open"]).sum())
+    down = int((frame["close"] < frame["open"]).sum())
+
+    frame = frame[frame["day"].notna()].sort_values("day", kind="stable")
+    frame["week"] = week_ids(frame["day"].to_numpy(dtype="datetime64[D]").astype(np.int64))
+
+    mondays = frame[frame["weekday"] == "Monday"].drop_duplicates("week").set_index("week")["close"]
+    fridays = frame[frame["weekday"] == "Friday"].drop_duplicates("week").set_index("week")["close"]
+    both = mondays.index.intersection(fridays.index)
+    mf_total = len(both)
+    mf_success = int((fridays.loc[both].to_numpy() > mondays.loc[both].to_numpy()).sum())
+
+    last_close = frame.drop_duplicates("week", keep="last")["close"].to_numpy()
+    wow_total = max(len(last_close) - 1, 0)
+    wow_success = int((last_close[1:] > last_close[:-1]).sum())
+
+    return {
+        "upDays": {"count": up, "percent": _percent(up, up + down)},
+        "downDays": {"count": down, "percent": _percent(down, up + down)},
+        "mondayFriday": {"success": mf_success, "total": mf_total, "percent": _percent(mf_success, mf_total)},
+        "weekOverWeek": {"success": wow_success, "total": wow_total, "percent": _percent(wow_success, wow_total)},
+    }
+
+
+def build_weekly_summary(history_df, date_col="Date_add", periods=PERIODS):
+    """{symbol: {period: weekly_stats}} with periods ending at the latest date in history_df."""
+    dates = pd.to_datetime(history_df[date_col], errors="coerce")
+    end = dates.max()
+    summary = {"end_date": end.strftime("%Y-%m-%d"), "symbols": {}}
+    for sym, g in history_df.groupby("Symbol", sort=True):
+        g_dates = dates.loc[g.index]
+        summary["symbols"][str(sym)] = {
+            period: weekly_stats(g[(g_dates >= period_start(end, period)) & (g_dates <= end)], date_col)
+            for period in periods
+        }
+    return summary
+
+
+def write_weekly_summary(history_df, path=WEEKLY_SUMMARY_JSON, date_col="Date_add"):
+    summary = build_weekly_summary(history_df, date_col)
+    with open(path, "w") as f:
+        json.dump(summary, f, separators=(",", ":"))
+    return summary